@@ -0,0 +1,132 @@
+"""
+Club-wide shooter averages.
+
+Pure functions — no DB I/O. Score documents are loaded into a pandas
+DataFrame, stages are exploded to one row per stage and classified by exact
+stage name (SF1 is slow fire, SFNMC is the NMC block — never both), and
+per-shooter / per-caliber / per-stage-family means come from groupby rather
+than per-shooter Python accumulators.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .bulletin import NMC_BLOCK_STAGES, RAPID_STAGES, SLOW_STAGES, TIMED_STAGES
+from .core import STANDARD_CALIBER_ORDER_MAP, CaliberType
+
+# Score fields the averages need; use as the Mongo projection.
+AVERAGES_PROJECTION = {
+    "_id": 0,
+    "shooter_id": 1,
+    "caliber": 1,
+    "stages": 1,
+    "total_score": 1,
+    "total_x_count": 1,
+}
+
+STAGE_FAMILIES = ("sf", "tf", "rf", "nmc")
+
+_FAMILY_BY_STAGE = {
+    **{name: "sf" for name in SLOW_STAGES},
+    **{name: "tf" for name in TIMED_STAGES},
+    **{name: "rf" for name in RAPID_STAGES},
+    **{name: "nmc" for name in NMC_BLOCK_STAGES},
+}
+
+AVERAGES_COLUMNS = (
+    "shooter_id",
+    "shooter_name",
+    "caliber",
+    "cards",
+    "total_score_avg",
+    "total_x_count_avg",
+    *(
+        f"{family}_{field}"
+        for family in STAGE_FAMILIES
+        for field in ("stage_count", "score_avg", "x_count_avg")
+    ),
+)
+
+
+def _caliber_rank(caliber: Any) -> int:
+    try:
+        return STANDARD_CALIBER_ORDER_MAP.get(CaliberType(caliber), 99)
+    except ValueError:
+        return 99
+
+
+def club_averages(
+    score_docs: Iterable[Mapping[str, Any]],
+    shooter_names: Mapping[str, Optional[str]],
+) -> List[Dict[str, Any]]:
+    """
+    One row per (shooter, caliber) with card and stage-family averages.
+
+    Cards with a null total are skipped; stages with a null score are not
+    counted. Family columns are None when the shooter fired no stage of that
+    family in the caliber. Rows are ordered by shooter name, then standard
+    caliber order.
+    """
+    import pandas as pd
+
+    cards = pd.DataFrame.from_records(
+        list(score_docs), columns=["shooter_id", "caliber", "stages", "total_score", "total_x_count"]
+    )
+    cards = cards[cards["total_score"].notna()]
+    if cards.empty:
+        return []
+    cards["caliber"] = cards["caliber"].map(lambda c: getattr(c, "value", c))
+    cards["total_x_count"] = cards["total_x_count"].fillna(0)
+
+    keys = ["shooter_id", "caliber"]
+    table = cards.groupby(keys).agg(
+        cards=("total_score", "size"),
+        total_score_avg=("total_score", "mean"),
+        total_x_count_avg=("total_x_count", "mean"),
+    )
+
+    stages = (
+        cards[keys + ["stages"]]
+        .explode("stages")
+        .dropna(subset=["stages"])
+        .reset_index(drop=True)
+    )
+    if not stages.empty:
+        stage_fields = pd.DataFrame.from_records(
+            stages["stages"].tolist(), columns=["name", "score", "x_count"]
+        )
+        stages = stages[keys].join(stage_fields)
+        stages["family"] = stages["name"].map(_FAMILY_BY_STAGE)
+        stages = stages[stages["family"].notna() & stages["score"].notna()]
+        stages["x_count"] = stages["x_count"].fillna(0)
+        by_family = (
+            stages.groupby(keys + ["family"])
+            .agg(
+                stage_count=("score", "size"),
+                score_avg=("score", "mean"),
+                x_count_avg=("x_count", "mean"),
+            )
+            .unstack("family")
+        )
+        by_family.columns = [f"{family}_{field}" for field, family in by_family.columns]
+        table = table.join(by_family)
+
+    table = table.reindex(columns=list(AVERAGES_COLUMNS[3:])).reset_index()
+    avg_cols = [c for c in table.columns if c.endswith("_avg")]
+    table[avg_cols] = table[avg_cols].astype(float).round(2)
+    table["shooter_name"] = table["shooter_id"].map(shooter_names)
+
+    rows = []
+    for record in table.to_dict("records"):
+        row = {}
+        for col in AVERAGES_COLUMNS:
+            value = record.get(col)
+            if value is not None and pd.isna(value):
+                value = None
+            elif col == "cards" or col.endswith("_stage_count"):
+                value = int(value)
+            row[col] = value
+        rows.append(row)
+    rows.sort(key=lambda r: ((r["shooter_name"] or "").casefold(), _caliber_rank(r["caliber"])))
+    return rows
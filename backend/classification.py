@@ -0,0 +1,195 @@
+"""
+Bulk classification from score history.
+
+Pure functions — no DB I/O. Every qualifying card (shot, complete, with a
+known match type) becomes one percentage of get_match_type_max_score; the
+per-shooter and per-(shooter, caliber) mean percentages are computed for the
+whole database at once with numpy grouping, then mapped to Rating bands.
+
+numpy is imported on first use, so importing this module (for the
+constants the server needs at startup) stays cheap.
+
+Shooter.rating stays hand-entered: classify() only reports what the history
+supports next to the current rating, so an admin can review the changes.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .core import BasicMatchType, Rating, get_match_type_max_score
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Score fields classify() reads; use as the Mongo projection.
+CLASSIFICATION_PROJECTION = {
+    "_id": 0,
+    "shooter_id": 1,
+    "match_id": 1,
+    "match_type_instance": 1,
+    "caliber": 1,
+    "stages.score": 1,
+    "total_score": 1,
+    "not_shot": 1,
+}
+
+# Lower bound (percent of possible) for each rating, highest first;
+# anything below the last band is Marksman.
+RATING_BANDS: Tuple[Tuple[Rating, float], ...] = (
+    (Rating.HM, 95.0),
+    (Rating.MA, 90.0),
+    (Rating.EX, 85.0),
+    (Rating.SS, 80.0),
+)
+
+# Fewer qualifying cards than this: no rating is proposed.
+MIN_QUALIFYING_CARDS = 3
+
+_RANK = {r.value: i for i, r in enumerate([Rating.UNC, Rating.MK, Rating.SS, Rating.EX, Rating.MA, Rating.HM])}
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def _max_score(match_type: Any) -> Optional[int]:
+    try:
+        return get_match_type_max_score(BasicMatchType(match_type))
+    except (ValueError, KeyError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _band_arrays() -> Tuple["np.ndarray", "np.ndarray"]:
+    """(ascending lower bounds, labels with Marksman first) for searchsorted."""
+    import numpy as np
+
+    thresholds = np.array([lower for _, lower in reversed(RATING_BANDS)])
+    labels = np.array([Rating.MK.value] + [r.value for r, _ in reversed(RATING_BANDS)])
+    return thresholds, labels
+
+
+def ratings_for_percent(percent: np.ndarray) -> np.ndarray:
+    """Vectorized band lookup: percent array -> rating value array."""
+    import numpy as np
+
+    thresholds, labels = _band_arrays()
+    return labels[np.searchsorted(thresholds, percent, side="right")]
+
+
+def qualifying_cards(
+    score_docs: Iterable[Mapping[str, Any]],
+    match_type_for: Callable[[Mapping[str, Any]], Any],
+) -> Tuple[List[str], List[Any], np.ndarray]:
+    """(shooter_ids, calibers, percent) for shot, complete cards of a known match type."""
+    import numpy as np
+
+    shooter_ids: List[str] = []
+    calibers: List[Any] = []
+    totals: List[int] = []
+    possible: List[int] = []
+    max_by_type: Dict[Any, Optional[int]] = {}
+    for doc in score_docs:
+        total = doc.get("total_score")
+        if total is None or doc.get("not_shot"):
+            continue
+        stages = doc.get("stages") or []
+        if not stages or any(stage.get("score") is None for stage in stages):
+            continue
+        match_type = _enum_value(match_type_for(doc))
+        if match_type not in max_by_type:
+            max_by_type[match_type] = _max_score(match_type)
+        max_score = max_by_type[match_type]
+        if not max_score:
+            continue
+        shooter_ids.append(doc.get("shooter_id"))
+        calibers.append(_enum_value(doc.get("caliber")))
+        totals.append(total)
+        possible.append(max_score)
+    percent = np.asarray(totals, dtype=np.float64) * 100.0 / np.asarray(possible, dtype=np.float64)
+    return shooter_ids, calibers, percent
+
+
+def _group_means(keys: List[Any], percent: np.ndarray) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """Unique keys (first-seen order), card counts and mean percent per key."""
+    import numpy as np
+
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(k, len(index)) for k in keys), dtype=np.intp, count=len(keys))
+    counts = np.bincount(codes, minlength=len(index))
+    sums = np.bincount(codes, weights=percent, minlength=len(index))
+    return list(index), counts, sums / counts
+
+
+def classify(
+    score_docs: Iterable[Mapping[str, Any]],
+    match_type_for: Callable[[Mapping[str, Any]], Any],
+    shooters: Iterable[Mapping[str, Any]],
+    *,
+    min_cards: int = MIN_QUALIFYING_CARDS,
+) -> Dict[str, Any]:
+    """
+    Classification report over all shooters.
+
+    Each shooter row has the mean percent over all qualifying cards (every
+    caliber pooled) and the same per caliber. proposed_rating is None below
+    min_cards. changes lists shooters whose proposed rating differs from the
+    current one, with the direction of the change.
+    """
+    names = {s.get("id"): (s.get("name"), _enum_value(s.get("rating"))) for s in shooters}
+    shooter_ids, calibers, percent = qualifying_cards(score_docs, match_type_for)
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    if shooter_ids:
+        uniq, counts, means = _group_means(shooter_ids, percent)
+        ratings = ratings_for_percent(means)
+        for shooter_id, count, mean, rating in zip(uniq, counts, means, ratings):
+            if shooter_id not in names:
+                continue
+            name, current = names[shooter_id]
+            rows[shooter_id] = {
+                "shooter_id": shooter_id,
+                "shooter_name": name,
+                "current_rating": current,
+                "proposed_rating": str(rating) if count >= min_cards else None,
+                "cards": int(count),
+                "percent": round(float(mean), 2),
+                "calibers": {},
+            }
+
+        uniq, counts, means = _group_means(list(zip(shooter_ids, calibers)), percent)
+        ratings = ratings_for_percent(means)
+        for (shooter_id, caliber), count, mean, rating in zip(uniq, counts, means, ratings):
+            if shooter_id not in rows:
+                continue
+            rows[shooter_id]["calibers"][caliber] = {
+                "cards": int(count),
+                "percent": round(float(mean), 2),
+                "rating": str(rating) if count >= min_cards else None,
+            }
+
+    ordered = sorted(rows.values(), key=lambda r: (r["shooter_name"] or "").casefold())
+    changes = []
+    for row in ordered:
+        proposed, current = row["proposed_rating"], row["current_rating"]
+        if proposed is None or proposed == current:
+            continue
+        changes.append(
+            {
+                "shooter_id": row["shooter_id"],
+                "shooter_name": row["shooter_name"],
+                "current_rating": current,
+                "proposed_rating": proposed,
+                "direction": "up" if _RANK[proposed] > _RANK.get(current, 0) else "down",
+                "cards": row["cards"],
+                "percent": row["percent"],
+            }
+        )
+    return {
+        "min_cards": min_cards,
+        "bands": {rating.value: lower for rating, lower in RATING_BANDS},
+        "shooters": ordered,
+        "changes": changes,
+    }
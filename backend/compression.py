@@ -0,0 +1,332 @@
+"""
+Response compression for the API: brotli or gzip, per Accept-Encoding.
+
+CompressionMiddleware is plain ASGI so it handles both kinds of response:
+
+- a complete body (JSON reports) is compressed in one call when it is at
+  least COMPRESSION_MIN_SIZE bytes; bodies of COMPRESSION_OFFLOAD_SIZE and up
+  are compressed on a worker thread (zlib and brotli release the GIL) so a
+  multi-megabyte report does not stall the event loop;
+- a streamed body (StreamingResponse CSV / Parquet exports) is compressed
+  chunk by chunk as it is sent, without buffering it.
+
+Responses that are already compressed (xlsx is a zip, Parquet pages are
+compressed, images, archives) or that set their own Content-Encoding pass
+through untouched.
+
+Brotli is used when the `brotli` package is installed and the client
+accepts `br`; otherwise gzip. Levels come from COMPRESSION_GZIP_LEVEL and
+COMPRESSION_BROTLI_QUALITY.
+
+A strong ETag on a compressed response gets the encoding appended
+("abc" -> "abc-gzip"), as the compressed bytes are a different
+representation; revisions.if_none_match() strips it again. A 304 carries
+the suffixed tag only when the client sent that one back.
+
+Every compressed response is recorded in `compression_stats` per (route
+template, encoding): responses, bytes in/out and compressor CPU seconds.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get("COMPRESSION_OFFLOAD_SIZE", str(256 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Content types whose payload is already compressed
+SKIP_CONTENT_TYPES = (
+    "application/vnd.openxmlformats-officedocument",  # xlsx / docx
+    "application/vnd.apache.parquet",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    """Encoding -> q value from an Accept-Encoding header."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """"br" or "gzip" (br preferred on equal q), or None for identity."""
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor that tracks its own CPU time."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._obj.process
+            self._finish = self._obj.finish
+        else:
+            # wbits 31: gzip container
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._obj.compress
+            self._finish = self._obj.flush
+        self.cpu_seconds = 0.0
+
+    def _timed(self, fn: Callable[..., bytes], *args: Any) -> bytes:
+        start = time.thread_time()
+        out = fn(*args)
+        self.cpu_seconds += time.thread_time() - start
+        return out
+
+    def compress(self, data: bytes) -> bytes:
+        return self._timed(self._compress, data)
+
+    def finish(self) -> bytes:
+        return self._timed(self._finish)
+
+    def compress_all(self, data: bytes) -> bytes:
+        return self.compress(data) + self.finish()
+
+
+class CompressionStats:
+    """Per (route, encoding) totals for compressed responses."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], list] = {}
+
+    def record(self, route: str, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        with self._lock:
+            totals = self._totals.setdefault((route, encoding), [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += bytes_in
+            totals[2] += bytes_out
+            totals[3] += cpu_seconds
+
+    def snapshot(self) -> list:
+        with self._lock:
+            items = sorted(self._totals.items())
+        return [
+            {
+                "route": route,
+                "encoding": encoding,
+                "responses": responses,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "ratio": round(bytes_in / bytes_out, 3) if bytes_out else None,
+                "cpu_seconds": round(cpu, 6),
+            }
+            for (route, encoding), (responses, bytes_in, bytes_out, cpu) in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+compression_stats = CompressionStats()
+
+
+def _encoded_etag(value: bytes, encoding: str) -> bytes:
+    """A strong ETag names one representation: "abc" -> "abc-gzip"."""
+    if value.startswith(b'"') and value.endswith(b'"'):
+        return value[:-1] + b"-" + encoding.encode("latin-1") + b'"'
+    return value
+
+
+def _requested_etags(scope: Dict[str, Any]) -> set:
+    """Entity tags in the request's If-None-Match, without any W/ prefix."""
+    tags = set()
+    for name, value in scope.get("headers") or ():
+        if name == b"if-none-match":
+            for tag in value.split(b","):
+                tag = tag.strip()
+                tags.add(tag[2:] if tag.startswith(b"W/") else tag)
+    return tags
+
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    # FastAPI puts the matched route on the scope; fall back to the raw path
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        offload_size: int = COMPRESSION_OFFLOAD_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        stats: CompressionStats = compression_stats,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers") or ():
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, scope, send, encoding))
+
+
+class _CompressingSend:
+    """send() wrapper for one response."""
+
+    def __init__(self, config: CompressionMiddleware, scope, send, encoding: str):
+        self.config = config
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[Dict[str, Any]] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _should_skip(self, message: Dict[str, Any]) -> bool:
+        if message.get("status", 200) in (204, 304) or self.scope.get("method") == "HEAD":
+            return True
+        for name, value in message.get("headers") or ():
+            if name == b"content-encoding":
+                return True
+            if name == b"content-type" and value.decode("latin-1").lower().startswith(SKIP_CONTENT_TYPES):
+                return True
+        return False
+
+    def _start_headers(self, content_length: Optional[int]) -> list:
+        headers = [
+            (name, _encoded_etag(value, self.encoding) if name == b"etag" else value)
+            for name, value in self.start.get("headers") or ()
+            if name not in (b"content-length", b"content-encoding")
+        ]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        vary = [value for name, value in headers if name == b"vary"]
+        if not any(b"accept-encoding" in v.lower() for v in vary):
+            headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    def _not_modified_headers(self, message: Dict[str, Any]) -> list:
+        # Name the representation the client holds: the suffixed ETag only if
+        # it sent that one back, i.e. its cached 200 was compressed (bodies
+        # under minimum_size never are and keep the bare tag)
+        requested = _requested_etags(self.scope)
+        headers = []
+        for name, value in message.get("headers") or ():
+            if name == b"etag":
+                encoded = _encoded_etag(value, self.encoding)
+                if encoded in requested:
+                    value = encoded
+            headers.append((name, value))
+        return headers
+
+    def _new_compressor(self) -> _Compressor:
+        return _Compressor(self.encoding, self.config.gzip_level, self.config.brotli_quality)
+
+    def _record(self) -> None:
+        self.config.stats.record(
+            _route_label(self.scope),
+            self.encoding,
+            self.bytes_in,
+            self.bytes_out,
+            self.compressor.cpu_seconds,
+        )
+
+    async def __call__(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = self._should_skip(message)
+            if self.passthrough:
+                if message.get("status") == 304:
+                    message = {**message, "headers": self._not_modified_headers(message)}
+                await self.send(message)
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and not more_body:
+            # Whole body in one message
+            if len(body) < self.config.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = self._new_compressor()
+            if len(body) >= self.config.offload_size:
+                compressed = await anyio.to_thread.run_sync(self.compressor.compress_all, body)
+            else:
+                compressed = self.compressor.compress_all(body)
+            self.bytes_in, self.bytes_out = len(body), len(compressed)
+            await self.send({**self.start, "headers": self._start_headers(len(compressed))})
+            await self.send({"type": "http.response.body", "body": compressed})
+            self._record()
+            return
+
+        if self.compressor is None:
+            # Streaming: headers go out now, without a length
+            self.compressor = self._new_compressor()
+            await self.send({**self.start, "headers": self._start_headers(None)})
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        self.bytes_in += len(body)
+        self.bytes_out += len(chunk)
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body:
+            self._record()
@@ -1,7 +1,10 @@
+import heapq
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any  # Add Dict, Any
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Mapping, Sequence, Tuple, Union
 
 from pydantic import BaseModel, Field
 
@@ -136,65 +139,135 @@ class Score(ScoreBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # --- Helper functions for match configuration ---
-def get_stages_for_match_type(match_type: BasicMatchType) -> Dict[str, Any]:
-    """Return the stage names and subtotal structure for a given match type"""
-    if match_type == BasicMatchType.NMC:
-        return {
-            "entry_stages": ["SF", "TF", "RF"],
-            "subtotal_stages": [],
-            "subtotal_mappings": {},
-            "max_score": 300,
-        }
-    elif match_type == BasicMatchType.SIXHUNDRED:
-        return {
-            "entry_stages": ["SF1", "SF2", "TF1", "TF2", "RF1", "RF2"],
-            "subtotal_stages": [],
-            "subtotal_mappings": {},
-            "max_score": 600,
-        }
-    elif match_type == BasicMatchType.NINEHUNDRED:
-        # Entry order: SF1, SF2, SFNMC, TFNMC, RFNMC, TF1, TF2, RF1, RF2
-        # NMC mid-block is SEPARATE from SF/TF/RF stage totals (not folded into them).
-        return {
-            "entry_stages": ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"],
-            "subtotal_stages": ["SF", "NMC", "TF", "RF"],
-            "subtotal_mappings": {
-                "SF": ["SF1", "SF2"],
-                "NMC": ["SFNMC", "TFNMC", "RFNMC"],
-                "TF": ["TF1", "TF2"],
-                "RF": ["RF1", "RF2"],
-            },
-            "max_score": 900,
-        }
-    elif match_type == BasicMatchType.PRESIDENTS:
-        return {
-            "entry_stages": ["SF1", "SF2", "TF", "RF"],
-            "subtotal_stages": [],
-            "subtotal_mappings": {},
-            "max_score": 400,
-        }
+@dataclass(frozen=True)
+class StageTable:
+    """
+    Precompiled stage layout for one BasicMatchType.
+
+    slot_by_stage maps each entry stage that feeds a subtotal to its index
+    in subtotal_names, so subtotals are a single pass with fixed accumulators.
+    """
+    entry_stages: Tuple[str, ...]
+    subtotal_names: Tuple[str, ...]
+    subtotal_mappings: Mapping[str, Tuple[str, ...]]
+    slot_by_stage: Mapping[str, int]
+    max_score: int
+
+
+def _compile_stage_table(
+    entry_stages: Sequence[str],
+    subtotal_mappings: Mapping[str, Sequence[str]],
+    max_score: int,
+) -> StageTable:
+    subtotal_names = tuple(subtotal_mappings)
+    slot_by_stage = {
+        stage: slot
+        for slot, name in enumerate(subtotal_names)
+        for stage in subtotal_mappings[name]
+    }
+    return StageTable(
+        entry_stages=tuple(entry_stages),
+        subtotal_names=subtotal_names,
+        subtotal_mappings=MappingProxyType(
+            {name: tuple(stages) for name, stages in subtotal_mappings.items()}
+        ),
+        slot_by_stage=MappingProxyType(slot_by_stage),
+        max_score=max_score,
+    )
+
+
+# Entry order for 900: SF1, SF2, SFNMC, TFNMC, RFNMC, TF1, TF2, RF1, RF2
+# NMC mid-block is SEPARATE from SF/TF/RF stage totals (not folded into them).
+MATCH_TYPE_STAGE_TABLES: Mapping[BasicMatchType, StageTable] = MappingProxyType({
+    BasicMatchType.NMC: _compile_stage_table(["SF", "TF", "RF"], {}, 300),
+    BasicMatchType.SIXHUNDRED: _compile_stage_table(
+        ["SF1", "SF2", "TF1", "TF2", "RF1", "RF2"], {}, 600
+    ),
+    BasicMatchType.NINEHUNDRED: _compile_stage_table(
+        ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"],
+        {
+            "SF": ["SF1", "SF2"],
+            "NMC": ["SFNMC", "TFNMC", "RFNMC"],
+            "TF": ["TF1", "TF2"],
+            "RF": ["RF1", "RF2"],
+        },
+        900,
+    ),
+    BasicMatchType.PRESIDENTS: _compile_stage_table(["SF1", "SF2", "TF", "RF"], {}, 400),
+})
+
+_EMPTY_STAGE_TABLE = _compile_stage_table([], {}, 0)
+
+
+def get_stage_table(match_type: BasicMatchType) -> StageTable:
+    """Return the precompiled stage table for a match type (empty if unknown)."""
+    return MATCH_TYPE_STAGE_TABLES.get(match_type, _EMPTY_STAGE_TABLE)
+
+
+def _stage_config_view(table: StageTable) -> Dict[str, Any]:
     return {
-        "entry_stages": [],
-        "subtotal_stages": [],
-        "subtotal_mappings": {},
-        "max_score": 0,
+        "entry_stages": list(table.entry_stages),
+        "subtotal_stages": list(table.subtotal_names),
+        "subtotal_mappings": {
+            name: list(stages) for name, stages in table.subtotal_mappings.items()
+        },
+        "max_score": table.max_score,
     }
 
 
+# JSON-shaped views, built once. Shared between callers — do not mutate.
+_STAGE_CONFIGS: Dict[BasicMatchType, Dict[str, Any]] = {
+    match_type: _stage_config_view(table)
+    for match_type, table in MATCH_TYPE_STAGE_TABLES.items()
+}
+_EMPTY_STAGE_CONFIG = _stage_config_view(_EMPTY_STAGE_TABLE)
+
+
+def get_stages_for_match_type(match_type: BasicMatchType) -> Dict[str, Any]:
+    """Return the stage names and subtotal structure for a given match type"""
+    return _STAGE_CONFIGS.get(match_type, _EMPTY_STAGE_CONFIG)
+
+
 def get_match_type_max_score(match_type: BasicMatchType) -> int:
     """Return the maximum possible score for a match type"""
-    return get_stages_for_match_type(match_type)["max_score"]
+    return get_stage_table(match_type).max_score
 
 # --- More Helper Functions ---
 
+@dataclass(frozen=True)
+class AggregateSpec:
+    """Declarative multigun aggregate: best `count` cards of `base_type` per caliber."""
+    base_type: BasicMatchType
+    count: int
+    label: str
+    sub_fields: Tuple[str, ...]
+
+
+_NINEHUNDRED_SUB_FIELDS = ("SF", "NMC", "TF", "RF", "900")
+
+AGGREGATE_SPECS: Mapping[AggregateType, AggregateSpec] = MappingProxyType({
+    AggregateType.EIGHTEEN_HUNDRED_2X900: AggregateSpec(
+        BasicMatchType.NINEHUNDRED, 2, "1800", _NINEHUNDRED_SUB_FIELDS
+    ),
+    AggregateType.EIGHTEEN_HUNDRED_3X600: AggregateSpec(
+        BasicMatchType.SIXHUNDRED, 3, "1800", ("SF", "TF", "RF", "600")  # No NMC for 600
+    ),
+    AggregateType.TWENTY_SEVEN_HUNDRED: AggregateSpec(
+        BasicMatchType.NINEHUNDRED, 3, "2700", _NINEHUNDRED_SUB_FIELDS
+    ),
+})
+
+
+def instance_type_map(match: Match) -> Dict[str, BasicMatchType]:
+    """instance_name -> BasicMatchType; build once per match and reuse per shooter."""
+    return {mt.instance_name: mt.type for mt in match.match_types}
+
+
 def _get_aggregate_components(aggregate_type: AggregateType) -> tuple[Optional[BasicMatchType], list[str]]:
-    if aggregate_type == AggregateType.TWENTY_SEVEN_HUNDRED:
-        return BasicMatchType.NINEHUNDRED, ["SF", "NMC", "TF", "RF", "900"]
-    elif aggregate_type == AggregateType.EIGHTEEN_HUNDRED_2X900:
-        return BasicMatchType.NINEHUNDRED, ["SF", "NMC", "TF", "RF", "900"]
-    elif aggregate_type == AggregateType.EIGHTEEN_HUNDRED_3X600:
-        return BasicMatchType.SIXHUNDRED, ["SF", "TF", "RF", "600"] # No NMC for 600
-    return None, []
+    spec = AGGREGATE_SPECS.get(aggregate_type)
+    if spec is None:
+        return None, []
+    return spec.base_type, list(spec.sub_fields)
 
 def _get_ordered_calibers_for_aggregate(match_obj: Match, base_match_type_for_agg: BasicMatchType) -> List[CaliberType]:
     present_calibers = set()
@@ -209,122 +282,78 @@ def _get_ordered_calibers_for_aggregate(match_obj: Match, base_match_type_for_ag
     sorted_calibers = sorted(list(present_calibers), key=lambda c: STANDARD_CALIBER_ORDER_MAP.get(c, 99))
     return sorted_calibers
 
-def calculate_aggregates(scores: Dict[str, Any], match: Match) -> Dict[str, Any]:
-    """Calculate aggregate scores based on match configuration"""
-    aggregates = {}
 
-    # 1800 (2x900) Aggregate
-    if match.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_2X900:
-        by_caliber: Dict[CaliberType, List[Dict[str, Any]]] = {}
-        for key, score_data in scores.items():
-            # Ensure score_data["score"] exists and has "total_score"
-            if not score_data.get("score") or score_data["score"].get("total_score") is None:
-                continue
+def _aggregate_cards(
+    scores: Dict[str, Any],
+    spec: AggregateSpec,
+    instance_types: Dict[str, BasicMatchType],
+) -> List[Dict[str, Any]]:
+    """Scored cards whose instance is exactly of the spec's base type."""
+    cards = []
+    for score_data in scores.values():
+        score = score_data.get("score")
+        if not score or score.get("total_score") is None:
+            continue
+        if instance_types.get(score.get("match_type_instance")) == spec.base_type:
+            cards.append(score)
+    return cards
 
-            # Check if the match type instance corresponds to a 900-point match type
-            is_900_type = False
-            for mt in match.match_types:
-                if mt.instance_name in key and mt.type == BasicMatchType.NINEHUNDRED:
-                    is_900_type = True
-                    break
-            
-            if is_900_type:
-                caliber_str = score_data["score"]["caliber"]
-                # Convert caliber_str to CaliberType enum if necessary, or ensure consistency
-                # Assuming caliber_str is a value that can be mapped to CaliberType
-                try:
-                    caliber = CaliberType(caliber_str)
-                    if caliber not in by_caliber:
-                        by_caliber[caliber] = []
-                    by_caliber[caliber].append(score_data["score"])
-                except ValueError:
-                    # Handle cases where caliber_str is not a valid CaliberType
-                    pass # Or log a warning
-
-        for caliber, cal_scores in by_caliber.items():
-            if len(cal_scores) >= 2:
-                cal_scores.sort(key=lambda s: s["total_score"], reverse=True)
-                top_two = cal_scores[:2]
-                total = sum(s["total_score"] for s in top_two)
-                x_count = sum(s.get("total_x_count", 0) or 0 for s in top_two) # Handle None for x_count
-                aggregates[f"1800_{caliber.value}"] = {
-                    "score": total,
-                    "x_count": x_count,
-                    "components": [s["match_type_instance"] for s in top_two],
-                }
-
-    # 1800 (3x600) Aggregate
-    elif match.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_3X600:
-        by_caliber: Dict[CaliberType, List[Dict[str, Any]]] = {}
-        for key, score_data in scores.items():
-            if not score_data.get("score") or score_data["score"].get("total_score") is None:
-                continue
 
-            is_600_type = False
-            for mt in match.match_types:
-                if mt.instance_name in key and mt.type == BasicMatchType.SIXHUNDRED:
-                    is_600_type = True
-                    break
-
-            if is_600_type:
-                caliber_str = score_data["score"]["caliber"]
-                try:
-                    caliber = CaliberType(caliber_str)
-                    if caliber not in by_caliber:
-                        by_caliber[caliber] = []
-                    by_caliber[caliber].append(score_data["score"])
-                except ValueError:
-                    pass
-
-        for caliber, cal_scores in by_caliber.items():
-            if len(cal_scores) >= 3:
-                cal_scores.sort(key=lambda s: s["total_score"], reverse=True)
-                top_three = cal_scores[:3]
-                total = sum(s["total_score"] for s in top_three)
-                x_count = sum(s.get("total_x_count", 0) or 0 for s in top_three)
-                aggregates[f"1800_{caliber.value}"] = {
-                    "score": total,
-                    "x_count": x_count,
-                    "components": [s["match_type_instance"] for s in top_three],
-                }
-
-    # 2700 Aggregate
-    elif match.aggregate_type == AggregateType.TWENTY_SEVEN_HUNDRED:
-        by_caliber: Dict[CaliberType, List[Dict[str, Any]]] = {}
-        for key, score_data in scores.items():
-            if not score_data.get("score") or score_data["score"].get("total_score") is None:
-                continue
-            
-            is_900_type = False
-            for mt in match.match_types:
-                if mt.instance_name in key and mt.type == BasicMatchType.NINEHUNDRED:
-                    is_900_type = True
-                    break
-
-            if is_900_type:
-                caliber_str = score_data["score"]["caliber"]
-                try:
-                    caliber = CaliberType(caliber_str)
-                    if caliber not in by_caliber:
-                        by_caliber[caliber] = []
-                    by_caliber[caliber].append(score_data["score"])
-                except ValueError:
-                    pass
-        
-        for caliber, cal_scores in by_caliber.items():
-            if len(cal_scores) >= 3:
-                cal_scores.sort(key=lambda s: s["total_score"], reverse=True)
-                top_three = cal_scores[:3]
-                total = sum(s["total_score"] for s in top_three)
-                x_count = sum(s.get("total_x_count", 0) or 0 for s in top_three)
-                aggregates[f"2700_{caliber.value}"] = {
-                    "score": total,
-                    "x_count": x_count,
-                    "components": [s["match_type_instance"] for s in top_three],
-                }
+def _best_n(cards: List[Dict[str, Any]], count: int) -> Optional[Dict[str, Any]]:
+    if len(cards) < count:
+        return None
+    top = heapq.nlargest(count, cards, key=lambda s: s["total_score"])
+    return {
+        "score": sum(s["total_score"] for s in top),
+        "x_count": sum(s.get("total_x_count", 0) or 0 for s in top), # Handle None for x_count
+        "components": [s["match_type_instance"] for s in top],
+    }
+
+
+def calculate_aggregates(
+    scores: Dict[str, Any],
+    match: Match,
+    instance_types: Optional[Dict[str, BasicMatchType]] = None,
+) -> Dict[str, Any]:
+    """Calculate aggregate scores based on match configuration"""
+    spec = AGGREGATE_SPECS.get(match.aggregate_type)
+    if spec is None:
+        return {}
+    if instance_types is None:
+        instance_types = instance_type_map(match)
+
+    by_caliber: Dict[CaliberType, List[Dict[str, Any]]] = {}
+    for score in _aggregate_cards(scores, spec, instance_types):
+        try:
+            caliber = CaliberType(score["caliber"])
+        except ValueError:
+            continue  # Not a known caliber; cannot be placed in a column
+        by_caliber.setdefault(caliber, []).append(score)
 
+    aggregates = {}
+    for caliber, cal_scores in by_caliber.items():
+        best = _best_n(cal_scores, spec.count)
+        if best is not None:
+            aggregates[f"{spec.label}_{caliber.value}"] = best
     return aggregates
 
+
+def calculate_overall_aggregate(
+    scores: Dict[str, Any],
+    match: Match,
+    instance_types: Optional[Dict[str, BasicMatchType]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Caliber-agnostic aggregate: best `count` base-type cards for the shooter.
+    Returns None when the match has no aggregate or too few cards.
+    """
+    spec = AGGREGATE_SPECS.get(match.aggregate_type)
+    if spec is None:
+        return None
+    if instance_types is None:
+        instance_types = instance_type_map(match)
+    return _best_n(_aggregate_cards(scores, spec, instance_types), spec.count)
+
 def calculate_shooter_averages_by_caliber(scores: List[Score]) -> Dict[str, Any]:
     """Calculate shooter's average performance by caliber from a list of scores"""
     by_caliber = {}
@@ -408,27 +437,36 @@ def calculate_shooter_averages_by_caliber(scores: List[Score]) -> Dict[str, Any]
 
     return averages
 
-def calculate_score_subtotals(score_obj: Score, stages_config: Dict[str, Any]) -> Dict[str, Any]:
+def calculate_score_subtotals(
+    score_obj: Score, stages_config: Union[StageTable, Dict[str, Any]]
+) -> Dict[str, Any]:
     """Calculate subtotals for a score based on stage configuration"""
-    subtotals = {}
-    
-    if stages_config["subtotal_mappings"]:
-        # Process subtotals based on match type
-        for subtotal_name, stage_names in stages_config["subtotal_mappings"].items():
-            subtotal_score = 0
-            subtotal_x_count = 0
-            
-            for stage in score_obj.stages:
-                if stage.name in stage_names:
-                    # Handle NULL values in subtotal calculation
-                    if stage.score is not None:
-                        subtotal_score += stage.score
-                    if stage.x_count is not None:
-                        subtotal_x_count += stage.x_count
-            
-            subtotals[subtotal_name] = {
-                "score": subtotal_score,
-                "x_count": subtotal_x_count
-            }
-    
-    return subtotals
\ No newline at end of file
+    if isinstance(stages_config, StageTable):
+        table = stages_config
+    else:
+        if not stages_config["subtotal_mappings"]:
+            return {}
+        table = _compile_stage_table(
+            stages_config.get("entry_stages", []), stages_config["subtotal_mappings"], 0
+        )
+
+    if not table.subtotal_names:
+        return {}
+
+    # One pass over the stages; NULL values are skipped
+    slot_by_stage = table.slot_by_stage
+    scores = [0] * len(table.subtotal_names)
+    x_counts = [0] * len(table.subtotal_names)
+    for stage in score_obj.stages:
+        slot = slot_by_stage.get(stage.name)
+        if slot is None:
+            continue
+        if stage.score is not None:
+            scores[slot] += stage.score
+        if stage.x_count is not None:
+            x_counts[slot] += stage.x_count
+
+    return {
+        name: {"score": scores[slot], "x_count": x_counts[slot]}
+        for slot, name in enumerate(table.subtotal_names)
+    }
@@ -1,6 +1,11 @@
 import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from .metrics import MongoCommandListener
+
 MONGO_URL = os.environ.get("MONGO_URL")
 if not MONGO_URL:
     raise RuntimeError(
@@ -10,9 +15,11 @@ if not MONGO_URL:
 
 DB_NAME = os.environ.get("DB_NAME", "shooting_matches_db")
 
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(MONGO_URL, event_listeners=[MongoCommandListener()])
 db = client[DB_NAME]
 
+_transactions_supported: Optional[bool] = None
+
 
 async def connect_to_mongo():
     """Optional hook for startup; client is created at import time."""
@@ -21,3 +28,30 @@ async def connect_to_mongo():
 
 async def close_mongo_connection():
     client.close()
+
+
+async def transactions_supported() -> bool:
+    """Multi-document transactions need a replica set or mongos; checked once."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await client.admin.command("hello")
+        except Exception:
+            # Older servers / test doubles without `hello`: run without transactions
+            hello = {}
+        _transactions_supported = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+    return _transactions_supported
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    Yield a session inside an open transaction, or None on a standalone
+    mongod. Pass it as session= to every write that must commit together.
+    """
+    if not await transactions_supported():
+        yield None
+        return
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
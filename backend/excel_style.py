@@ -7,7 +7,12 @@ column layout or data values.
 
 from __future__ import annotations
 
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.page import PageMargins
 
@@ -29,60 +34,170 @@ THIN = Border(
 )
 
 
+# Shared style objects. openpyxl de-duplicates styles by value when a workbook
+# is saved, so handing out one instance per style (instead of a fresh Font /
+# PatternFill / Alignment per cell) keeps that work proportional to the number
+# of distinct styles. Treat these as immutable — copy() before changing one.
+_FONT_TITLE = Font(name="Calibri", bold=True, size=16, color=NAVY)
+_FONT_SUBTITLE = Font(name="Calibri", bold=True, size=12, color=NAVY)
+_FONT_SECTION = Font(name="Calibri", bold=True, size=11, color="000000")
+_FONT_HEADER = Font(name="Calibri", bold=True, size=10, color=HEADER_FG)
+_FONT_BODY = Font(name="Calibri", bold=False, size=10)
+_FONT_BODY_BOLD = Font(name="Calibri", bold=True, size=10)
+_FONT_META_LABEL = Font(name="Calibri", bold=True, size=10, color="404040")
+_FONT_GRID = Font(name="Calibri", size=11)
+_FONT_GRID_BOLD = Font(name="Calibri", size=11, bold=True)
+
+_FILL_HEADER = PatternFill(start_color=HEADER_BG, end_color=HEADER_BG, fill_type="solid")
+_FILL_SECTION = PatternFill(start_color=SECTION, end_color=SECTION, fill_type="solid")
+_FILL_GOLD = PatternFill(start_color=GOLD, end_color=GOLD, fill_type="solid")
+_FILL_SPECIAL = PatternFill(start_color=SPECIAL, end_color=SPECIAL, fill_type="solid")
+_FILL_ALT = PatternFill(start_color=ALT_ROW, end_color=ALT_ROW, fill_type="solid")
+
+_ALIGN_CENTER = Alignment(horizontal="center", vertical="center", wrap_text=False)
+_ALIGN_LEFT = Alignment(horizontal="left", vertical="center", wrap_text=False)
+_ALIGN_RIGHT = Alignment(horizontal="right", vertical="center", wrap_text=False)
+_ALIGN_GRID_CENTER = Alignment(horizontal="center")
+
+
 def font_title() -> Font:
-    return Font(name="Calibri", bold=True, size=16, color=NAVY)
+    return _FONT_TITLE
 
 
 def font_subtitle() -> Font:
-    return Font(name="Calibri", bold=True, size=12, color=NAVY)
+    return _FONT_SUBTITLE
 
 
 def font_section() -> Font:
-    return Font(name="Calibri", bold=True, size=11, color="000000")
+    return _FONT_SECTION
 
 
 def font_header() -> Font:
-    return Font(name="Calibri", bold=True, size=10, color=HEADER_FG)
+    return _FONT_HEADER
 
 
 def font_body(bold: bool = False) -> Font:
-    return Font(name="Calibri", bold=bold, size=10)
+    return _FONT_BODY_BOLD if bold else _FONT_BODY
 
 
 def font_meta_label() -> Font:
-    return Font(name="Calibri", bold=True, size=10, color="404040")
+    return _FONT_META_LABEL
 
 
 def fill_header() -> PatternFill:
-    return PatternFill(start_color=HEADER_BG, end_color=HEADER_BG, fill_type="solid")
+    return _FILL_HEADER
 
 
 def fill_section() -> PatternFill:
-    return PatternFill(start_color=SECTION, end_color=SECTION, fill_type="solid")
+    return _FILL_SECTION
 
 
 def fill_gold() -> PatternFill:
-    return PatternFill(start_color=GOLD, end_color=GOLD, fill_type="solid")
+    return _FILL_GOLD
 
 
 def fill_special() -> PatternFill:
-    return PatternFill(start_color=SPECIAL, end_color=SPECIAL, fill_type="solid")
+    return _FILL_SPECIAL
 
 
 def fill_alt() -> PatternFill:
-    return PatternFill(start_color=ALT_ROW, end_color=ALT_ROW, fill_type="solid")
+    return _FILL_ALT
 
 
 def align_center() -> Alignment:
-    return Alignment(horizontal="center", vertical="center", wrap_text=False)
+    return _ALIGN_CENTER
 
 
 def align_left() -> Alignment:
-    return Alignment(horizontal="left", vertical="center", wrap_text=False)
+    return _ALIGN_LEFT
 
 
 def align_right() -> Alignment:
-    return Alignment(horizontal="right", vertical="center", wrap_text=False)
+    return _ALIGN_RIGHT
+
+
+# --- Named styles ---
+# Row/cell styling goes through workbook NamedStyles so each cell stores a
+# single style reference. Specs are module-level and built once; a fresh
+# NamedStyle is created per workbook because openpyxl binds (and renumbers)
+# a NamedStyle when it is added to a workbook.
+STYLE_HEADER = "mt_header"
+STYLE_SECTION = "mt_section"
+
+_DATA_FILLS = {
+    "": None,
+    "_alt": _FILL_ALT,
+    "_gold": _FILL_GOLD,
+    "_special": _FILL_SPECIAL,
+}
+
+
+@dataclass(frozen=True)
+class _StyleSpec:
+    font: Optional[Font] = None
+    fill: Optional[PatternFill] = None
+    alignment: Optional[Alignment] = None
+    border: Optional[Border] = None
+
+
+def _build_style_specs() -> Dict[str, _StyleSpec]:
+    specs: Dict[str, _StyleSpec] = {
+        STYLE_HEADER: _StyleSpec(_FONT_HEADER, _FILL_HEADER, _ALIGN_CENTER, THIN),
+        STYLE_SECTION: _StyleSpec(_FONT_SECTION, _FILL_SECTION, None, THIN),
+    }
+    for bold in (False, True):
+        for left in (False, True):
+            for suffix, fill in _DATA_FILLS.items():
+                specs[data_style_name(bold=bold, left=left, fill=suffix)] = _StyleSpec(
+                    _FONT_BODY_BOLD if bold else _FONT_BODY,
+                    fill,
+                    _ALIGN_LEFT if left else _ALIGN_CENTER,
+                    THIN,
+                )
+            # Match-report summary grid: Calibri 11 (the Excel default, spelled
+            # out so readers do not fall back to their own), plain centering
+            for alt in (False, True):
+                specs[grid_style_name(bold=bold, left=left, alt=alt)] = _StyleSpec(
+                    _FONT_GRID_BOLD if bold else _FONT_GRID,
+                    _FILL_ALT if alt else None,
+                    _ALIGN_LEFT if left else _ALIGN_GRID_CENTER,
+                    THIN,
+                )
+    return specs
+
+
+def data_style_name(*, bold: bool = False, left: bool = False, fill: str = "") -> str:
+    return f"mt_body{'_bold' if bold else ''}{'_left' if left else ''}{fill}"
+
+
+def grid_style_name(*, bold: bool = False, left: bool = False, alt: bool = False) -> str:
+    return f"mt_grid{'_bold' if bold else ''}{'_left' if left else ''}{'_alt' if alt else ''}"
+
+
+NAMED_STYLE_SPECS: Mapping[str, _StyleSpec] = MappingProxyType(_build_style_specs())
+
+_registered_workbooks: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def register_named_styles(wb) -> None:
+    """Add every Match Track NamedStyle to ``wb`` (idempotent, once per workbook)."""
+    if wb in _registered_workbooks:
+        return
+    existing = set(wb.named_styles)
+    for name, spec in NAMED_STYLE_SPECS.items():
+        if name in existing:
+            continue
+        style = NamedStyle(name=name)
+        if spec.font is not None:
+            style.font = spec.font
+        if spec.fill is not None:
+            style.fill = spec.fill
+        if spec.alignment is not None:
+            style.alignment = spec.alignment
+        if spec.border is not None:
+            style.border = spec.border
+        wb.add_named_style(style)
+    _registered_workbooks.add(wb)
 
 
 def apply_print_setup(ws, *, landscape: bool = False, fit_width: bool = True) -> None:
@@ -107,20 +222,15 @@ def style_range_border(ws, min_row: int, max_row: int, min_col: int, max_col: in
 
 
 def style_header_row(ws, row: int, max_col: int) -> None:
+    register_named_styles(ws.parent)
     for col in range(1, max_col + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = font_header()
-        cell.fill = fill_header()
-        cell.alignment = align_center()
-        cell.border = THIN
+        ws.cell(row=row, column=col).style = STYLE_HEADER
 
 
 def style_section_banner(ws, row: int, max_col: int = 5) -> None:
+    register_named_styles(ws.parent)
     for col in range(1, max_col + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = fill_section()
-        cell.font = font_section()
-        cell.border = THIN
+        ws.cell(row=row, column=col).style = STYLE_SECTION
     # Merge looks nicer for section titles when first cell has the text
     try:
         ws.merge_cells(
@@ -152,14 +262,16 @@ def style_data_row(
     highlight: bool = False,
     special: bool = False,
 ) -> None:
+    register_named_styles(ws.parent)
+    if highlight:
+        fill = "_gold"
+    elif special:
+        fill = "_special"
+    elif alt:
+        fill = "_alt"
+    else:
+        fill = ""
+    center = data_style_name(bold=highlight, fill=fill)
+    left = data_style_name(bold=highlight, left=True, fill=fill)
     for col in range(1, max_col + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = font_body(bold=highlight)
-        cell.border = THIN
-        cell.alignment = align_center() if col != 3 else align_left()
-        if highlight:
-            cell.fill = fill_gold()
-        elif special:
-            cell.fill = fill_special()
-        elif alt:
-            cell.fill = fill_alt()
+        ws.cell(row=row, column=col).style = center if col != 3 else left
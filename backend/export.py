@@ -0,0 +1,240 @@
+"""
+Columnar match-result export (CSV / NDJSON / Parquet).
+
+Pure functions — no DB I/O. Each score document flattens to one row per
+stage, so a result set is (shooter, instance, caliber, stage) long-format
+data that pandas, spreadsheets and newsletter scripts can read directly
+instead of scraping the styled Excel report. SeasonSummary rolls the same
+score documents up per shooter and caliber for league season exports.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .core import STANDARD_CALIBER_ORDER_MAP, CaliberType
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = (
+    "match_id",
+    "match_name",
+    "match_date",
+    "shooter_id",
+    "shooter_name",
+    "nra_number",
+    "competitor_number",
+    "rating",
+    "division",
+    "match_type_instance",
+    "match_type",
+    "caliber",
+    "stage",
+    "stage_score",
+    "stage_x_count",
+    "total_score",
+    "total_x_count",
+    "not_shot",
+)
+
+# Score fields the row builder reads; use as the Mongo projection.
+SCORE_PROJECTION = {
+    "_id": 0,
+    "shooter_id": 1,
+    "match_id": 1,
+    "match_type_instance": 1,
+    "caliber": 1,
+    "stages": 1,
+    "total_score": 1,
+    "total_x_count": 1,
+    "not_shot": 1,
+}
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def match_context(match: Mapping[str, Any]) -> Dict[str, Any]:
+    """Per-match fields repeated on every row, plus an instance -> type map."""
+    date = match.get("date")
+    return {
+        "match_id": match.get("id"),
+        "match_name": match.get("name"),
+        "match_date": date.date().isoformat() if isinstance(date, datetime) else date,
+        "instance_types": {
+            mt.get("instance_name"): _enum_value(mt.get("type"))
+            for mt in match.get("match_types") or []
+        },
+    }
+
+
+def shooter_context(shooter: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    shooter = shooter or {}
+    return {
+        "shooter_name": shooter.get("name"),
+        "nra_number": shooter.get("nra_number"),
+        "competitor_number": shooter.get("competitor_number"),
+        "rating": _enum_value(shooter.get("rating")),
+        "division": _enum_value(shooter.get("division")) or "Civilian",
+    }
+
+
+def score_rows(
+    match_ctx: Mapping[str, Any],
+    shooter_ctx: Mapping[str, Any],
+    score_doc: Mapping[str, Any],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten one score document to one row per stage.
+
+    A card with no stages still yields a single row (stage None) so
+    not-shot entries are not silently dropped.
+    """
+    instance = score_doc.get("match_type_instance")
+    base = {
+        "match_id": match_ctx["match_id"],
+        "match_name": match_ctx["match_name"],
+        "match_date": match_ctx["match_date"],
+        "shooter_id": score_doc.get("shooter_id"),
+        **shooter_ctx,
+        "match_type_instance": instance,
+        "match_type": match_ctx["instance_types"].get(instance),
+        "caliber": _enum_value(score_doc.get("caliber")),
+        "total_score": score_doc.get("total_score"),
+        "total_x_count": score_doc.get("total_x_count"),
+        "not_shot": bool(score_doc.get("not_shot", False)),
+    }
+    stages = score_doc.get("stages") or [{"name": None}]
+    for stage in stages:
+        row = dict(base)
+        row["stage"] = stage.get("name")
+        row["stage_score"] = stage.get("score")
+        row["stage_x_count"] = stage.get("x_count")
+        yield row
+
+
+def csv_header() -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(EXPORT_COLUMNS)
+    return buf.getvalue()
+
+
+def csv_lines(rows: Iterable[Mapping[str, Any]]) -> str:
+    """Encode a batch of rows (no header). Call per batch to keep memory flat."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if row.get(c) is None else row.get(c) for c in EXPORT_COLUMNS])
+    return buf.getvalue()
+
+
+def ndjson_lines(rows: Iterable[Mapping[str, Any]]) -> str:
+    return "".join(
+        json.dumps({c: row.get(c) for c in EXPORT_COLUMNS}, default=str) + "\n"
+        for row in rows
+    )
+
+
+def parquet_bytes(rows: List[Mapping[str, Any]]) -> bytes:
+    """Write rows to Parquet through pandas/pyarrow (imported on first use)."""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(list(rows), columns=list(EXPORT_COLUMNS))
+    for col in ("competitor_number", "stage_score", "stage_x_count", "total_score", "total_x_count"):
+        frame[col] = frame[col].astype("Int64")
+    buf = io.BytesIO()
+    frame.to_parquet(buf, engine="pyarrow", index=False)
+    return buf.getvalue()
+
+
+# --- Season rollup (league export) ---
+
+SEASON_SUMMARY_COLUMNS = (
+    "shooter_id",
+    "shooter_name",
+    "caliber",
+    "matches",
+    "cards",
+    "total_score",
+    "total_x_count",
+    "average",
+    "best",
+)
+
+
+@dataclass
+class SeasonLine:
+    shooter_id: str
+    caliber: str
+    match_ids: Set[str] = field(default_factory=set)
+    cards: int = 0
+    score_sum: int = 0
+    x_sum: int = 0
+    best: Optional[int] = None
+
+
+def _caliber_rank(caliber: str) -> int:
+    try:
+        return STANDARD_CALIBER_ORDER_MAP.get(CaliberType(caliber), 99)
+    except ValueError:
+        return 99
+
+
+class SeasonSummary:
+    """
+    Per-shooter, per-caliber season totals, fed one score document at a time
+    so it can ride along the same cursor pass that writes the result rows.
+    Not-shot and null-total cards are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._lines: Dict[Tuple[str, str], SeasonLine] = {}
+
+    def add(self, score_doc: Mapping[str, Any]) -> None:
+        total = score_doc.get("total_score")
+        if score_doc.get("not_shot") or total is None:
+            return
+        shooter_id = score_doc.get("shooter_id")
+        caliber = _enum_value(score_doc.get("caliber"))
+        line = self._lines.get((shooter_id, caliber))
+        if line is None:
+            line = self._lines[(shooter_id, caliber)] = SeasonLine(shooter_id, caliber)
+        line.match_ids.add(score_doc.get("match_id"))
+        line.cards += 1
+        line.score_sum += int(total)
+        line.x_sum += int(score_doc.get("total_x_count") or 0)
+        line.best = int(total) if line.best is None else max(line.best, int(total))
+
+    def rows(self, shooter_names: Mapping[str, Optional[str]]) -> List[Dict[str, Any]]:
+        """Rows ordered by shooter name, then standard caliber order."""
+        out = []
+        for line in self._lines.values():
+            out.append(
+                {
+                    "shooter_id": line.shooter_id,
+                    "shooter_name": shooter_names.get(line.shooter_id),
+                    "caliber": line.caliber,
+                    "matches": len(line.match_ids),
+                    "cards": line.cards,
+                    "total_score": line.score_sum,
+                    "total_x_count": line.x_sum,
+                    "average": round(line.score_sum / line.cards, 2),
+                    "best": line.best,
+                }
+            )
+        out.sort(
+            key=lambda r: ((r["shooter_name"] or "").casefold(), _caliber_rank(r["caliber"]))
+        )
+        return out
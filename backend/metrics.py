@@ -0,0 +1,270 @@
+"""
+Request and Mongo metrics in Prometheus text format.
+
+MetricsMiddleware (plain ASGI, outermost) resolves each request's route
+template before calling the app and records, per (method, route):
+
+- http_requests_total{status}            counter
+- http_request_duration_seconds          histogram (until the body is sent)
+- http_response_size_bytes               histogram (bytes on the wire)
+- http_requests_in_flight                gauge
+
+MongoCommandListener is registered on the Motor client (database.py). It
+counts commands and their durations per command name, and adds one to the
+current request's tally: Motor runs driver calls on its executor with a copy
+of the caller's contextvars, so the per-request counter set by the
+middleware is visible from the listener thread. That tally feeds
+mongodb_commands_per_request{route}.
+
+render() writes everything, plus the compression totals, in the text
+exposition format served at /api/metrics. All state is in-process (single
+uvicorn process, see entrypoint.sh) and resets on restart.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COMMAND_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+# Requests that match no route share one label, so scanners can't grow the series
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_request_commands: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "request_mongo_commands", default=None
+)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = self.header()
+        for labels, row in items:
+            cumulative = 0
+            for upper, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = (("le", _format_value(upper)),)
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """The process-wide metric set."""
+
+    def __init__(self) -> None:
+        self.requests = Counter("http_requests_total", "HTTP requests by route and status.")
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Time until the response body was sent.", LATENCY_BUCKETS
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body bytes sent (after compression).", SIZE_BUCKETS
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "Requests currently being handled.")
+        self.mongo_commands = Counter("mongodb_commands_total", "Mongo commands started, by command.")
+        self.mongo_failures = Counter("mongodb_command_failures_total", "Mongo commands that failed.")
+        self.mongo_duration = Histogram(
+            "mongodb_command_duration_seconds", "Mongo command round trip time.", LATENCY_BUCKETS
+        )
+        self.mongo_per_request = Histogram(
+            "mongodb_commands_per_request", "Mongo commands issued while handling one request.",
+            COMMAND_COUNT_BUCKETS,
+        )
+
+    def all(self) -> Iterable[_Metric]:
+        return (
+            self.requests,
+            self.latency,
+            self.response_size,
+            self.in_flight,
+            self.mongo_commands,
+            self.mongo_failures,
+            self.mongo_duration,
+            self.mongo_per_request,
+        )
+
+
+metrics = Metrics()
+
+
+def _compression_lines(snapshot: List[Dict[str, Any]]) -> List[str]:
+    series = (
+        ("http_compression_input_bytes_total", "Response bytes before compression.", "bytes_in"),
+        ("http_compression_output_bytes_total", "Response bytes after compression.", "bytes_out"),
+        ("http_compression_cpu_seconds_total", "CPU time spent compressing.", "cpu_seconds"),
+    )
+    lines: List[str] = []
+    for name, help_text, field in series:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for row in snapshot:
+            labels = (("route", row["route"]), ("encoding", row["encoding"]))
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(row[field])}")
+    return lines
+
+
+def render(registry: Metrics = metrics, compression: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Prometheus text exposition (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in registry.all():
+        lines += metric.render()
+    if compression is not None:
+        lines += _compression_lines(compression)
+    return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, registry: Metrics = metrics):
+        self.registry = registry
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self.registry.mongo_commands.inc((("command", event.command_name),))
+        tally = _request_commands.get()
+        if tally is not None:
+            tally[0] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.registry.mongo_duration.observe((("command", event.command_name),), event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        labels = (("command", event.command_name),)
+        self.registry.mongo_duration.observe(labels, event.duration_micros / 1e6)
+        self.registry.mongo_failures.inc(labels)
+
+
+def _route_template(app, scope) -> str:
+    """Path template of the route that will handle scope ("/api/matches/{match_id}")."""
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None) or UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Metrics = metrics, route_app=None):
+        self.app = app
+        self.registry = registry
+        # The FastAPI app whose routes name the series (the ASGI app passed in
+        # is the next middleware)
+        self.route_app = route_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = _route_template(self.route_app, scope) if self.route_app is not None else UNMATCHED_ROUTE
+        labels: Labels = (("method", scope["method"]), ("route", route))
+        registry = self.registry
+        tally = [0]
+        token = _request_commands.set(tally)
+        state = {"status": 500, "bytes": 0}
+        start = time.perf_counter()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight.inc(labels)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight.dec(labels)
+            _request_commands.reset(token)
+            registry.requests.inc(labels + (("status", str(state["status"])),))
+            registry.latency.observe(labels, elapsed)
+            registry.response_size.observe(labels, state["bytes"])
+            registry.mongo_per_request.observe((("route", route),), tally[0])
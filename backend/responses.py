@@ -0,0 +1,53 @@
+"""
+orjson response class for the heavy report endpoints.
+
+FastAPI's default path runs the return value through response_model
+validation and jsonable_encoder, both of which walk every node of a large
+nested report in Python. ORJSONReportResponse serializes the raw
+structure in one orjson call: datetimes, enums (including enum dict keys)
+and numpy scalars natively, Pydantic models via model_dump().
+
+Endpoints return trusted_response(content). That hands the content straight
+to the response class and skips response_model re-validation, unless
+VALIDATE_REPORT_RESPONSES is set, in which case FastAPI's normal
+validate-then-encode path runs (still rendered by orjson).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+VALIDATE_REPORT_RESPONSES = os.environ.get("VALIDATE_REPORT_RESPONSES", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONReportResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+def trusted_response(content: Any) -> Any:
+    """Return content for a report endpoint, bypassing re-validation when allowed."""
+    if VALIDATE_REPORT_RESPONSES:
+        return content
+    return ORJSONReportResponse(content)
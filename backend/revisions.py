@@ -0,0 +1,110 @@
+"""
+Data revision counters and ETags for conditional GETs.
+
+Pure functions — no DB I/O. DataRevisions keeps in-process counters that
+the write handlers bump (see server.py: touch_matches, touch_match_scores,
+touch_shooters):
+
+- "matches"        any match document changed (the /matches list)
+- "match:<id>"     that match's document or its scores changed
+- "matches:all"    many match documents changed at once (league delete,
+                   shooter delete); part of every per-match ETag
+- "shooters"       any shooter changed (lists, and names in reports)
+
+A response's ETag is a hash of the process epoch, the counters it depends
+on and the request's query string, so it is known before any data is read
+and a matching If-None-Match is answered with 304 straight away. The epoch
+is new on every start and on a database reset, which invalidates every
+ETag handed out before. Counters live in the API process: this relies on
+the single-process deployment (entrypoint.sh), and writes made directly to
+Mongo are not seen until the next restart.
+
+ETagMiddleware adds the ETag a route dependency left in request.state to
+the 200 response, whatever response class the endpoint returned, with
+Cache-Control: private, no-cache so the browser revalidates every time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import uuid
+from typing import Dict, Iterable, Optional
+
+
+class DataRevisions:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self.epoch = uuid.uuid4().hex
+
+    def bump(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._counters[key] = self._counters.get(key, 0) + 1
+
+    def get(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def reset(self) -> None:
+        """Start a new epoch; every earlier ETag stops matching."""
+        with self._lock:
+            self._counters.clear()
+            self.epoch = uuid.uuid4().hex
+
+    def etag(self, keys: Iterable[str], variant: str = "") -> str:
+        """Strong ETag over the epoch, the given counters and a request variant."""
+        parts = [self.epoch, variant]
+        parts.extend(f"{key}={self.get(key)}" for key in keys)
+        digest = hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+        return f'"{digest}"'
+
+
+# "-gzip" / "-br" added by CompressionMiddleware for compressed representations
+_ENCODING_SUFFIX = re.compile(r'-[a-z]+"$')
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header matches etag (weak comparison, RFC 9110)."""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or _ENCODING_SUFFIX.sub('"', candidate) == etag:
+            return True
+    return False
+
+
+data_revisions = DataRevisions()
+
+
+class ETagMiddleware:
+    """Copy request.state.etag onto successful responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message.get("status") == 200:
+                etag = (scope.get("state") or {}).get("etag")
+                if etag:
+                    headers = [
+                        (k, v) for k, v in message.get("headers") or () if k not in (b"etag", b"cache-control")
+                    ]
+                    headers.append((b"etag", etag.encode("latin-1")))
+                    # Browsers keep the copy but always revalidate it
+                    headers.append((b"cache-control", b"private, no-cache"))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
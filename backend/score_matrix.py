@@ -0,0 +1,298 @@
+"""
+Compact array-backed score matrix for one match.
+
+Pure functions — no DB I/O. A match's scorecards become dense numpy arrays
+indexed [shooter, card, stage], where a card is one (instance, caliber)
+column and the stage axis is the union of the match's stage names. Scores
+and X counts are int16; a boolean mask marks which stage cells were
+actually entered, so null stages and not-shot cards never count.
+
+Totals, stage-family sums (slow / timed / rapid / NMC block), subtotals and
+best-N aggregates are vectorized sums over those arrays instead of loops
+over per-stage dicts.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bulletin import NMC_BLOCK_STAGES, RAPID_STAGES, SLOW_STAGES, TIMED_STAGES
+from .core import AggregateSpec, get_stage_table
+
+Card = Tuple[str, str]  # (match_type_instance, caliber value)
+
+_STAGE_FAMILIES = {
+    "slow": SLOW_STAGES,
+    "timed": TIMED_STAGES,
+    "rapid": RAPID_STAGES,
+    "nmc": NMC_BLOCK_STAGES,
+}
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def _match_cards(match: Any) -> Tuple[List[Card], Dict[str, Any], List[str]]:
+    """Card columns, instance -> type and stage names in match configuration order."""
+    if match is None:
+        return [], {}, []
+    if isinstance(match, Mapping):
+        match_types = [
+            (mt.get("instance_name"), mt.get("type"), mt.get("calibers") or [])
+            for mt in match.get("match_types") or []
+        ]
+    else:
+        match_types = [(mt.instance_name, mt.type, mt.calibers) for mt in match.match_types]
+
+    cards: List[Card] = []
+    instance_types: Dict[str, Any] = {}
+    stage_names: List[str] = []
+    for instance, mt_type, calibers in match_types:
+        instance_types[instance] = _enum_value(mt_type)
+        for cal in calibers:
+            cards.append((instance, _enum_value(cal)))
+        for stage in get_stage_table(mt_type).entry_stages:
+            if stage not in stage_names:
+                stage_names.append(stage)
+    return cards, instance_types, stage_names
+
+
+class MatchScoreMatrix:
+    """
+    Dense [shooter, card, stage] view of a match's scores.
+
+    score / x        int16 [S, C, K]  stage values (0 where not entered)
+    valid            bool  [S, C, K]  stage was entered with a score
+    total / total_x  int16 [S, C]     card totals as stored on the document
+    present          bool  [S, C]     a document exists for the card
+    has_total        bool  [S, C]     card exists, is shot and has a total
+    not_shot         bool  [S, C]     card was marked not shot
+
+    Build with from_documents(); the constructor only wires up arrays.
+    """
+
+    def __init__(
+        self,
+        shooter_ids: Sequence[str],
+        cards: Sequence[Card],
+        stage_names: Sequence[str],
+        instance_types: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self.shooter_ids: Tuple[str, ...] = tuple(shooter_ids)
+        self.cards: Tuple[Card, ...] = tuple(cards)
+        self.stage_names: Tuple[str, ...] = tuple(stage_names)
+        self.instance_types: Dict[str, Any] = dict(instance_types or {})
+        self.shooter_index = {sid: i for i, sid in enumerate(self.shooter_ids)}
+        self.card_index = {card: i for i, card in enumerate(self.cards)}
+        self.stage_index = {name: i for i, name in enumerate(self.stage_names)}
+
+        shape = (len(self.shooter_ids), len(self.cards), len(self.stage_names))
+        self.score = np.zeros(shape, dtype=np.int16)
+        self.x = np.zeros(shape, dtype=np.int16)
+        self.valid = np.zeros(shape, dtype=bool)
+        self.total = np.zeros(shape[:2], dtype=np.int16)
+        self.total_x = np.zeros(shape[:2], dtype=np.int16)
+        self.present = np.zeros(shape[:2], dtype=bool)
+        self.has_total = np.zeros(shape[:2], dtype=bool)
+        self.not_shot = np.zeros(shape[:2], dtype=bool)
+
+    @classmethod
+    def from_documents(
+        cls, score_docs: Iterable[Mapping[str, Any]], match: Any = None
+    ) -> "MatchScoreMatrix":
+        """
+        Build from raw score documents (Mongo dicts or equivalent).
+
+        `match` (a Match or match document) fixes column and stage order to
+        the match configuration; cards or stages seen only on documents are
+        appended after it. Duplicate cards keep the last document.
+        """
+        docs = list(score_docs)
+        cards, instance_types, stage_names = _match_cards(match)
+        card_set = set(cards)
+        stage_set = set(stage_names)
+        shooter_ids: Dict[str, None] = {}
+        for doc in docs:
+            shooter_ids.setdefault(doc.get("shooter_id"), None)
+            card = (doc.get("match_type_instance"), _enum_value(doc.get("caliber")))
+            if card not in card_set:
+                card_set.add(card)
+                cards.append(card)
+            for stage in doc.get("stages") or []:
+                name = stage.get("name")
+                if name is not None and name not in stage_set:
+                    stage_set.add(name)
+                    stage_names.append(name)
+
+        matrix = cls(list(shooter_ids), cards, stage_names, instance_types)
+        for doc in docs:
+            matrix._load(doc)
+        return matrix
+
+    def _load(self, doc: Mapping[str, Any]) -> None:
+        s = self.shooter_index[doc.get("shooter_id")]
+        c = self.card_index[(doc.get("match_type_instance"), _enum_value(doc.get("caliber")))]
+        self.score[s, c] = 0
+        self.x[s, c] = 0
+        self.valid[s, c] = False
+        self.present[s, c] = True
+        not_shot = bool(doc.get("not_shot", False))
+        self.not_shot[s, c] = not_shot
+        total = doc.get("total_score")
+        self.has_total[s, c] = not not_shot and total is not None
+        self.total[s, c] = 0 if total is None else int(total)
+        self.total_x[s, c] = int(doc.get("total_x_count") or 0)
+        if not_shot:
+            return
+        for stage in doc.get("stages") or []:
+            sc = stage.get("score")
+            k = self.stage_index.get(stage.get("name"))
+            if sc is None or k is None:
+                continue
+            self.score[s, c, k] = int(sc)
+            self.x[s, c, k] = int(stage.get("x_count") or 0)
+            self.valid[s, c, k] = True
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes
+            for a in (
+                self.score, self.x, self.valid, self.total, self.total_x,
+                self.present, self.has_total, self.not_shot,
+            )
+        )
+
+    # --- Vectorized sums ---
+
+    def _stage_mask(self, names: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.stage_names), dtype=bool)
+        for name in names:
+            k = self.stage_index.get(name)
+            if k is not None:
+                mask[k] = True
+        return mask
+
+    def stage_sums(self, names: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sum score/X over the named stages for every [shooter, card].
+        Returns (score, x, any_valid); score/x are 0 where any_valid is False.
+        """
+        sel = self.valid & self._stage_mask(names)
+        score = np.where(sel, self.score, 0).sum(axis=2, dtype=np.int32)
+        x = np.where(sel, self.x, 0).sum(axis=2, dtype=np.int32)
+        return score, x, sel.any(axis=2)
+
+    def stage_totals(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Card totals recomputed from entered stages."""
+        return self.stage_sums(self.stage_names)
+
+    def subtotals(self, card: Card) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-shooter subtotal blocks for one card, keyed by shooter id, in the
+        calculate_score_subtotals shape ({} for types without subtotals).
+        """
+        c = self.card_index.get(card)
+        mt_type = self.instance_types.get(card[0])
+        if c is None or mt_type is None:
+            return {}
+        table = get_stage_table(mt_type)
+        if not table.subtotal_names:
+            return {}
+        blocks = {
+            name: self.stage_sums(stages) for name, stages in table.subtotal_mappings.items()
+        }
+        out: Dict[str, Dict[str, Any]] = {}
+        for sid, s in self.shooter_index.items():
+            if not self.present[s, c]:
+                continue
+            out[sid] = {
+                name: {"score": int(score[s, c]), "x_count": int(x[s, c])}
+                for name, (score, x, _) in blocks.items()
+            }
+        return out
+
+    # --- Bulletin events ---
+
+    def event_scores(
+        self, event_scope: str, match_type_instance: str, caliber: str
+    ) -> List[Tuple[str, int, int]]:
+        """
+        (shooter_id, score, x) for one instance+caliber event, matching
+        bulletin.event_score_from_score_doc for slow|timed|rapid|nmc|total.
+        """
+        c = self.card_index.get((match_type_instance, caliber))
+        if c is None:
+            return []
+        total = self.total[:, c].astype(np.int32)
+        total_x = self.total_x[:, c].astype(np.int32)
+        ok = self.has_total[:, c]
+        if event_scope in _STAGE_FAMILIES:
+            score, x, any_valid = self.stage_sums(_STAGE_FAMILIES[event_scope])
+            score, x, any_valid = score[:, c], x[:, c], any_valid[:, c]
+            if event_scope == "nmc":
+                # Mid-block on a 900; otherwise the NMC scorecard's own total
+                score = np.where(any_valid, score, total)
+                x = np.where(any_valid, x, total_x)
+                ok = any_valid | ok
+            else:
+                ok = any_valid
+        elif event_scope == "total":
+            score, x = total, total_x
+        else:
+            raise ValueError(f"Unknown event_scope: {event_scope}")
+        return [
+            (self.shooter_ids[s], int(score[s]), int(x[s])) for s in np.flatnonzero(ok)
+        ]
+
+    def aggregate_totals(self, caliber: Optional[str] = None) -> List[Tuple[str, int, int]]:
+        """
+        (shooter_id, score, x) summing every shot card, optionally for one
+        caliber only (grand vs caliber aggregate).
+        """
+        cols = np.array(
+            [caliber is None or cal == caliber for _, cal in self.cards], dtype=bool
+        )
+        mask = self.has_total & cols
+        score = np.where(mask, self.total, 0).sum(axis=1, dtype=np.int32)
+        x = np.where(mask, self.total_x, 0).sum(axis=1, dtype=np.int32)
+        return [
+            (self.shooter_ids[s], int(score[s]), int(x[s]))
+            for s in np.flatnonzero(mask.any(axis=1))
+        ]
+
+    # --- Multigun aggregates ---
+
+    def aggregates(self, spec: AggregateSpec) -> Dict[str, Dict[str, Any]]:
+        """
+        Best `spec.count` base-type cards per shooter and caliber, keyed by
+        shooter id then f"{label}_{caliber}", in the calculate_aggregates shape.
+        """
+        base = _enum_value(spec.base_type)
+        by_caliber: Dict[str, List[int]] = {}
+        for c, (instance, cal) in enumerate(self.cards):
+            if self.instance_types.get(instance) == base:
+                by_caliber.setdefault(cal, []).append(c)
+
+        out: Dict[str, Dict[str, Any]] = {sid: {} for sid in self.shooter_ids}
+        for cal, cols in by_caliber.items():
+            if len(cols) < spec.count:
+                continue
+            cols_arr = np.array(cols)
+            ok = self.has_total[:, cols_arr]
+            # Missing cards sort last; stable so ties keep column order
+            keyed = np.where(ok, self.total[:, cols_arr].astype(np.int32), -1)
+            order = np.argsort(-keyed, axis=1, kind="stable")[:, : spec.count]
+            top = np.take_along_axis(keyed, order, axis=1)
+            top_x = np.take_along_axis(self.total_x[:, cols_arr].astype(np.int32), order, axis=1)
+            complete = (top >= 0).all(axis=1)
+            for s in np.flatnonzero(complete):
+                out[self.shooter_ids[s]][f"{spec.label}_{cal}"] = {
+                    "score": int(top[s].sum()),
+                    "x_count": int(top_x[s].sum()),
+                    "components": [self.cards[cols[i]][0] for i in order[s]],
+                }
+        return out
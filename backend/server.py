@@ -1,22 +1,25 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Body, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Body, Depends, Query, Request, status, UploadFile, File
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
+import importlib
 import logging
 import uuid
 import io
 import csv
-from typing import Dict, List, Optional, Any, Union
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
-from fastapi.responses import StreamingResponse
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, ValidationError
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, ValidationError
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timedelta
 from enum import Enum
 import re
+import tempfile
 
 from .core import (
     BasicMatchType,
@@ -37,17 +40,57 @@ from .core import (
     ScoreBase,  # This was already here
     Score,      # This was already here
     get_stages_for_match_type,      # ADD THIS
+    get_stage_table,
     get_match_type_max_score,        # ADD THIS
     _get_aggregate_components,        # ADD THIS
     _get_ordered_calibers_for_aggregate, # ADD THIS
     calculate_aggregates,              # ADD THIS
-    calculate_shooter_averages_by_caliber,  # ADD THIS
+    calculate_overall_aggregate,
+    instance_type_map,
+    AGGREGATE_SPECS,
     calculate_score_subtotals               # ADD THIS
 )
 from .bulletin import (
     CompetitorResult,
     build_bulletin,
-    event_score_from_score_doc,
+)
+from .analytics import AVERAGES_COLUMNS, AVERAGES_PROJECTION, club_averages
+from .shooter_stats import (
+    accumulate as accumulate_stats,
+    caliber_averages,
+    diff_stats,
+    key_filter,
+    report_averages,
+)
+from .shooter_index import ShooterIndex
+from .standings import STANDINGS_PROJECTION, LeagueStandings
+from .classification import CLASSIFICATION_PROJECTION, MIN_QUALIFYING_CARDS, classify
+from .trends import (
+    TREND_BUFFER_SIZE,
+    TREND_PROJECTION,
+    build_trend_docs,
+    shooter_trends,
+    trend_entry,
+    trend_key,
+)
+from .responses import ORJSONReportResponse, trusted_response
+from .compression import CompressionMiddleware, compression_stats
+from .revisions import ETagMiddleware, data_revisions, if_none_match
+from .metrics import MetricsMiddleware, render as render_metrics
+from .export import (
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    EXPORT_COLUMNS,
+    SCORE_PROJECTION,
+    SEASON_SUMMARY_COLUMNS,
+    SeasonSummary,
+    csv_header,
+    csv_lines,
+    match_context,
+    ndjson_lines,
+    parquet_bytes,
+    score_rows,
+    shooter_context,
 )
 
 # Import auth components
@@ -63,7 +106,7 @@ from .auth import (
     get_password_hash,
     create_user_record,
 )
-from .database import db, connect_to_mongo, close_mongo_connection
+from .database import db, connect_to_mongo, close_mongo_connection, transaction
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
@@ -116,115 +159,128 @@ def _build_dynamic_non_aggregate_header(match_obj: Match) -> List[str]:
             header.append(f"{mt.instance_name} ({caliber_enum.value})")
     return header
 
-# --- Modified build_aggregate_row_grouped function ---
+# --- Per-shooter score index used by all Excel row builders ---
+_STAGE_BUCKETS = ("SF", "TF", "RF", "NMC")
+
+
+def _stage_bucket(stage_name: str) -> Optional[str]:
+    """SF/TF/RF/NMC bucket for a stage name. NMC mid-block never folds into SF/TF/RF."""
+    name = stage_name.upper()
+    if "NMC" in name:
+        return "NMC"
+    for prefix in ("SF", "TF", "RF"):
+        if name.startswith(prefix):
+            return prefix
+    return None
+
+
+def build_shooter_score_index(
+    shooter_data: Dict[str, Any],
+    instance_types: Dict[str, BasicMatchType],
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Index one shooter's report scores by (instance_name, caliber value).
+
+    Built once per shooter so row and detail-sheet builders do dict lookups
+    instead of rescanning every score per column. Each entry carries the
+    score totals plus pre-bucketed SF/TF/RF/NMC stage sums (null stages
+    count as 0, as on the printed report).
+    """
+    index: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for score_item in shooter_data["scores"].values():
+        score_details = score_item["score"]
+        caliber = score_details["caliber"]
+        caliber_str = caliber.value if hasattr(caliber, "value") else str(caliber)
+        instance_name = score_details["match_type_instance"]
+
+        buckets = {name: [0, 0] for name in _STAGE_BUCKETS}
+        for stage in score_details["stages"]:
+            bucket = _stage_bucket(stage["name"])
+            if bucket is None:
+                continue
+            buckets[bucket][0] += stage["score"] if stage["score"] is not None else 0
+            buckets[bucket][1] += stage["x_count"] if stage["x_count"] is not None else 0
+
+        index[(instance_name, caliber_str)] = {
+            "type": instance_types.get(instance_name),
+            "caliber": caliber_str,
+            "not_shot": score_details.get("not_shot", False),
+            "total_score": score_details["total_score"],
+            "total_x_count": score_details["total_x_count"],
+            "stages": score_details["stages"],
+            "buckets": buckets,
+        }
+    return index
+
+
 def build_aggregate_row_grouped(
-    shooter: Shooter, 
-    shooter_data: Dict[str, Any], 
-    report_data: Dict[str, Any], 
-    ordered_calibers: List[CaliberType], 
+    shooter: Shooter,
+    score_index: Dict[Tuple[str, str], Dict[str, Any]],
+    ordered_calibers: List[CaliberType],
     agg_sub_fields: List[str],
     base_match_type_for_agg: BasicMatchType
 ):
     row = [shooter.name]
-    
+
     overall_agg_total_score = 0
     overall_agg_total_x = 0
-    
-    match_config = report_data.get("match_config", {})
-    match_types_configs_dict = {mtc["instance_name"]: mtc for mtc in match_config.get("match_types", [])}
+    # caliber value -> {"has_data", "total", "x", "buckets"}
+    by_caliber: Dict[str, Dict[str, Any]] = {}
 
-    for score_key, score_item in shooter_data["scores"].items():
-        score_details = score_item["score"]
-        if score_details.get("not_shot", False) or score_details["total_score"] is None:
+    for entry in score_index.values():
+        if entry["not_shot"] or entry["type"] != base_match_type_for_agg:
             continue
 
-        instance_name = score_details["match_type_instance"]
-        mt_config_for_score = match_types_configs_dict.get(instance_name)
-        
-        if mt_config_for_score and mt_config_for_score["type"] == base_match_type_for_agg:
-            overall_agg_total_score += score_details["total_score"]
-            overall_agg_total_x += (score_details["total_x_count"] or 0)
-            
+        if entry["total_score"] is not None:
+            overall_agg_total_score += entry["total_score"]
+            overall_agg_total_x += (entry["total_x_count"] or 0)
+
+        col = by_caliber.setdefault(
+            entry["caliber"],
+            {"total": 0, "x": 0, "buckets": {name: [0, 0] for name in _STAGE_BUCKETS}},
+        )
+        if entry["total_score"] is not None:
+            col["total"] += entry["total_score"]
+        if entry["total_x_count"] is not None:
+            col["x"] += entry["total_x_count"]
+        for name, (sc, xc) in entry["buckets"].items():
+            col["buckets"][name][0] += sc
+            col["buckets"][name][1] += xc
+
     row.append(f"{overall_agg_total_score} ({overall_agg_total_x}X)" if overall_agg_total_score > 0 or overall_agg_total_x > 0 else "-")
 
     for target_caliber_enum in ordered_calibers:
-        target_caliber_str = target_caliber_enum.value
-        
-        col_data = {field: {"score": 0, "x": 0} for field in agg_sub_fields}
-        col_total_score_direct_sum = 0 # Sum of total_score from individual matches for this caliber
-        col_total_x_direct_sum = 0     # Sum of total_x_count from individual matches for this caliber
-        has_data_for_caliber_column = False
-
-        for score_key, score_item in shooter_data["scores"].items():
-            score_details = score_item["score"]
-            if score_details.get("not_shot", False) or score_details["caliber"] != target_caliber_str:
-                continue
-
-            instance_name = score_details["match_type_instance"]
-            mt_config_for_score = match_types_configs_dict.get(instance_name)
+        col = by_caliber.get(target_caliber_enum.value)
 
-            if mt_config_for_score and mt_config_for_score["type"] == base_match_type_for_agg:
-                has_data_for_caliber_column = True
-                
-                if score_details["total_score"] is not None:
-                    col_total_score_direct_sum += score_details["total_score"]
-                if score_details["total_x_count"] is not None:
-                    col_total_x_direct_sum += score_details["total_x_count"]
-
-                for stage in score_details["stages"]:
-                    val = stage["score"] if stage["score"] is not None else 0
-                    xval = stage["x_count"] if stage["x_count"] is not None else 0
-                    
-                    stage_name_upper = stage["name"].upper() # Normalize stage name for matching
-
-                    if stage_name_upper.startswith("SF") and "NMC" not in stage_name_upper:
-                        col_data["SF"]["score"] += val
-                        col_data["SF"]["x"] += xval
-                    elif "NMC" in stage_name_upper and "NMC" in agg_sub_fields:
-                         col_data["NMC"]["score"] += val
-                         col_data["NMC"]["x"] += xval
-                    elif stage_name_upper.startswith("TF") and "NMC" not in stage_name_upper:
-                        col_data["TF"]["score"] += val
-                        col_data["TF"]["x"] += xval
-                    elif stage_name_upper.startswith("RF") and "NMC" not in stage_name_upper:
-                        col_data["RF"]["score"] += val
-                        col_data["RF"]["x"] += xval
-        
         def fmt_cell(score_val, x_val):
-            if not has_data_for_caliber_column: return "-"
+            if col is None: return "-"
             return f"{score_val} ({x_val}X)" if score_val > 0 or x_val > 0 else "0 (0X)"
 
         for field_name in agg_sub_fields:
-            if field_name in ["SF", "TF", "RF"] or (field_name == "NMC" and "NMC" in col_data):
-                row.append(fmt_cell(col_data[field_name]["score"], col_data[field_name]["x"]))
+            if field_name in _STAGE_BUCKETS:
+                sc, xc = col["buckets"][field_name] if col else (0, 0)
+                row.append(fmt_cell(sc, xc))
             elif field_name == "900" or field_name == "600": # This is the total for the caliber column
-                row.append(fmt_cell(col_total_score_direct_sum, col_total_x_direct_sum))
-            # else: # Should not happen with defined agg_sub_fields
-            #     row.append("-") # Fallback for unexpected field
-                
+                row.append(fmt_cell(col["total"] if col else 0, col["x"] if col else 0))
+
     return row
 
 # --- New function to build a row for non-aggregate matches ---
 def build_non_aggregate_row(
-    shooter: Shooter, 
-    shooter_data: Dict[str, Any], 
+    shooter: Shooter,
+    score_index: Dict[Tuple[str, str], Dict[str, Any]],
     match_obj: Match # Pass the full match_obj to access its structure
 ) -> List[Any]:
     row = [shooter.name]
-    
-    total_score_sum = 0
-    num_scored_entries = 0
-    
-    # Pre-calculate overall average for this shooter in this non-aggregate match
-    for score_key, score_item in shooter_data["scores"].items():
-        score_details = score_item["score"]
-        if not score_details.get("not_shot", False) and score_details["total_score"] is not None:
-            total_score_sum += score_details["total_score"]
-            num_scored_entries += 1
-            
-    if num_scored_entries > 0:
-        average_score = round(total_score_sum / num_scored_entries, 2)
-        row.append(average_score)
+
+    # Overall average for this shooter in this non-aggregate match
+    shot_totals = [
+        entry["total_score"]
+        for entry in score_index.values()
+        if not entry["not_shot"] and entry["total_score"] is not None
+    ]
+    if shot_totals:
+        row.append(round(sum(shot_totals) / len(shot_totals), 2))
     else:
         row.append("-") # No scores to average
 
@@ -232,26 +288,12 @@ def build_non_aggregate_row(
     for mt_instance in match_obj.match_types:
         # Use the SAME order as in header builder - preserve caliber creation order
         for target_caliber_enum in mt_instance.calibers:
-            target_caliber_str = target_caliber_enum.value
-            
-            score_found = False
-            # Iterate through the shooter's scores to find the matching entry
-            for score_key, score_item in shooter_data["scores"].items():
-                score_details = score_item["score"]
-                # The key in shooter_data["scores"] is typically f"{match_type_instance}_{caliber}"
-                # We need to match instance_name and caliber
-                if score_details["match_type_instance"] == mt_instance.instance_name and \
-                   score_details["caliber"] == target_caliber_str:
-                    if not score_details.get("not_shot", False) and score_details["total_score"] is not None:
-                        row.append(f"{score_details['total_score']} ({score_details.get('total_x_count', 0)}X)")
-                    else:
-                        row.append("-") # Not shot or no score
-                    score_found = True
-                    break
-            
-            if not score_found:
-                row.append("-") # No score entry found for this specific match_type_instance and caliber
-                
+            entry = score_index.get((mt_instance.instance_name, target_caliber_enum.value))
+            if entry and not entry["not_shot"] and entry["total_score"] is not None:
+                row.append(f"{entry['total_score']} ({entry['total_x_count']}X)")
+            else:
+                row.append("-") # Not shot, no score, or no entry for this instance/caliber
+
     return row
 
 # Define Models
@@ -314,6 +356,42 @@ class ScoreWithDetails(Score):
     match_location: str
 
 
+# --- Trusted reads ---
+# Score and shooter documents were validated when they were written. Read
+# paths validate a whole result set through one TypeAdapter call instead of
+# Model(**doc) per row; request bodies still go through the models directly.
+# (model_construct was measured slower here: it builds nested models and
+# enum fields in Python, and leaves stored strings un-coerced.)
+_SCORE_LIST = TypeAdapter(List[Score])
+_SHOOTER_LIST = TypeAdapter(List[Shooter])
+
+
+def load_scores(docs: List[Dict[str, Any]]) -> List[Score]:
+    """Score documents from Mongo -> Score models in one batch."""
+    return _SCORE_LIST.validate_python(docs)
+
+
+def load_shooters(docs: List[Dict[str, Any]]) -> List[Shooter]:
+    """
+    Shooter documents from Mongo -> Shooter models in one batch, filling
+    fields older documents lack. A batch with a bad document falls back to
+    per-document parsing and skips the invalid ones.
+    """
+    for doc in docs:
+        doc.setdefault("division", "Civilian")
+        doc.setdefault("special_categories", [])
+    try:
+        return _SHOOTER_LIST.validate_python(docs)
+    except ValidationError:
+        parsed = []
+        for doc in docs:
+            try:
+                parsed.append(Shooter(**doc))
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid shooter doc: {e}")
+        return parsed
+
+
 # --- User bulk-import models ---
 class BulkUserRowResult(BaseModel):
     row: int
@@ -616,6 +694,17 @@ async def reset_database(current_user: User = Depends(get_admin_user)):
     # Remove all users except the current admin
     await db.users.delete_many({"id": {"$ne": current_user.id}})
 
+    # Dropping took the collections' indexes with them; with no scores left
+    # the derived collections are complete as they stand
+    await ensure_shooter_stats()
+    await ensure_shooter_trends()
+    await ensure_roster_indexes()
+    await _mark_backfilled("shooter_stats")
+    await _mark_backfilled("shooter_trends")
+    _league_standings.clear()
+    _drop_shooter_index()
+    data_revisions.reset()
+
     # Return success
     return {"success": True}
 
@@ -666,6 +755,97 @@ def _parse_rating(value: Optional[str]) -> Optional[Rating]:
         raise ValueError(f"Invalid rating '{value}'. Use one of: {valid}")
 
 
+# --- Shooter search index (typeahead) ---
+# Built from the shooters collection on first use; every shooter insert,
+# update and delete in this process keeps it current.
+_shooter_index: Optional[ShooterIndex] = None
+
+
+async def get_shooter_index() -> ShooterIndex:
+    global _shooter_index
+    if _shooter_index is None:
+        docs = await db.shooters.find({}, {"_id": 0}).to_list(None)
+        _shooter_index = ShooterIndex.from_documents(docs)
+    return _shooter_index
+
+
+def _index_shooter(doc: Dict[str, Any]) -> None:
+    if _shooter_index is not None:
+        _shooter_index.upsert(doc)
+
+
+def _unindex_shooter(shooter_id: str) -> None:
+    if _shooter_index is not None:
+        _shooter_index.remove(shooter_id)
+
+
+def _drop_shooter_index() -> None:
+    global _shooter_index
+    _shooter_index = None
+
+
+# --- Revision ETags (see revisions.py) ---
+# Bump after the write lands: a response read before the bump then carries
+# the older ETag and is simply refetched next time.
+def touch_matches(*match_ids: str) -> None:
+    """A match document changed (pass none when many changed at once)."""
+    if match_ids:
+        data_revisions.bump("matches", *(f"match:{mid}" for mid in match_ids))
+    else:
+        data_revisions.bump("matches", "matches:all")
+
+
+def touch_match_scores(match_ids) -> None:
+    data_revisions.bump(*(f"match:{mid}" for mid in match_ids if mid))
+
+
+def touch_shooters() -> None:
+    data_revisions.bump("shooters")
+
+
+def revision_etag(*keys: str):
+    """
+    Route dependency: answer 304 when If-None-Match still matches the ETag of
+    the given revision counters ("{param}" is filled from the path), before
+    the endpoint reads anything. Otherwise the ETag goes on the response.
+    """
+
+    async def check(request: Request, current_user: User = Depends(get_current_active_user)) -> None:
+        resolved = [key.format(**request.path_params) for key in keys]
+        etag = data_revisions.etag(resolved, variant=request.url.query)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        request.state.etag = etag
+
+    return Depends(check)
+
+
+MATCH_REPORT_REVISIONS = ("matches:all", "match:{match_id}", "shooters")
+
+
+def _new_shooter(
+    name: str,
+    nra_number: Optional[str] = None,
+    cmp_number: Optional[str] = None,
+    rating: Optional[Rating] = None,
+    competitor_number: Optional[int] = None,
+    division: Optional[Division] = Division.CIVILIAN,
+    special_categories: Optional[List] = None,
+) -> Shooter:
+    name = name.strip()
+    if not name:
+        raise ValueError("name is required")
+    return Shooter(
+        name=name,
+        nra_number=nra_number,
+        cmp_number=cmp_number,
+        rating=rating,
+        competitor_number=competitor_number,
+        division=division or Division.CIVILIAN,
+        special_categories=list(special_categories or []),
+    )
+
+
 async def _create_shooter_record(
     name: str,
     nra_number: Optional[str] = None,
@@ -681,9 +861,16 @@ async def _create_shooter_record(
     Insert a shooter. Returns (shooter, skip_reason).
     If skip_if_duplicate and a same-name shooter exists, returns (None, reason).
     """
-    name = name.strip()
-    if not name:
-        raise ValueError("name is required")
+    shooter_obj = _new_shooter(
+        name,
+        nra_number=nra_number,
+        cmp_number=cmp_number,
+        rating=rating,
+        competitor_number=competitor_number,
+        division=division,
+        special_categories=special_categories,
+    )
+    name = shooter_obj.name
 
     if skip_if_duplicate:
         existing = await db.shooters.find_one(
@@ -698,16 +885,9 @@ async def _create_shooter_record(
             if by_nra:
                 return None, f"NRA number {nra_number} already used by '{by_nra['name']}'"
 
-    shooter_obj = Shooter(
-        name=name,
-        nra_number=nra_number,
-        cmp_number=cmp_number,
-        rating=rating,
-        competitor_number=competitor_number,
-        division=division or Division.CIVILIAN,
-        special_categories=list(special_categories or []),
-    )
     await db.shooters.insert_one(shooter_obj.dict())
+    _index_shooter(shooter_obj.dict())
+    touch_shooters()
     return shooter_obj, None
 
 
@@ -755,6 +935,8 @@ async def bulk_create_shooters_from_csv(
 
     Header names are case-insensitive (spaces/underscores ok).
     Duplicate names (case-insensitive) and duplicate NRA numbers are skipped.
+    Existing names and NRA numbers are loaded once and checked in memory;
+    new shooters are written with one insert_many.
     """
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(
@@ -879,9 +1061,19 @@ async def bulk_create_shooters_from_csv(
 
     results: List[BulkShooterRowResult] = []
     created = skipped = errors = 0
+    # Existing shooters: casefolded name -> stored name, NRA number -> name
+    existing_names: Dict[str, str] = {}
+    existing_nra: Dict[str, str] = {}
+    async for doc in db.shooters.find({}, {"_id": 0, "name": 1, "nra_number": 1}):
+        stored_name = doc.get("name") or ""
+        existing_names.setdefault(stored_name.casefold(), stored_name)
+        if doc.get("nra_number"):
+            existing_nra.setdefault(str(doc["nra_number"]), stored_name)
     # Track names/nra seen in this file to avoid double-insert within same upload
     seen_names: set[str] = set()
     seen_nra: set[str] = set()
+    # (index into results, shooter) for the single insert_many
+    pending: List[Tuple[int, Shooter]] = []
 
     for row_num, row in enumerate(reader, start=2):
         name = cell(row, "name")
@@ -942,16 +1134,20 @@ async def bulk_create_shooters_from_csv(
                     competitor_number = int(float(comp_raw))
                 except ValueError:
                     competitor_number = None
-            shooter_obj, skip_reason = await _create_shooter_record(
-                name=name,
+            shooter_obj = _new_shooter(
+                name,
                 nra_number=nra_number,
                 cmp_number=cmp_number,
                 rating=rating,
                 competitor_number=competitor_number,
                 division=Division(division) if division else Division.CIVILIAN,
                 special_categories=[SpecialCategory(c) for c in specials],
-                skip_if_duplicate=True,
             )
+            skip_reason = None
+            if name_key in existing_names:
+                skip_reason = f"Shooter named '{existing_names[name_key]}' already exists"
+            elif nra_number and nra_number in existing_nra:
+                skip_reason = f"NRA number {nra_number} already used by '{existing_nra[nra_number]}'"
             if skip_reason:
                 skipped += 1
                 results.append(
@@ -967,6 +1163,7 @@ async def bulk_create_shooters_from_csv(
                 seen_names.add(name_key)
                 if nra_number:
                     seen_nra.add(nra_number)
+                pending.append((len(results), shooter_obj))
                 results.append(
                     BulkShooterRowResult(
                         row=row_num,
@@ -1009,6 +1206,24 @@ async def bulk_create_shooters_from_csv(
             detail="CSV contained no data rows",
         )
 
+    if pending:
+        docs = [shooter_obj.dict() for _, shooter_obj in pending]
+        failed: Dict[int, str] = {}
+        try:
+            await db.shooters.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "write failed") for err in e.details.get("writeErrors", [])}
+            logger.error(f"Shooter CSV import: {len(failed)} insert(s) failed")
+        for i, ((result_index, _), doc) in enumerate(zip(pending, docs)):
+            if i in failed:
+                created -= 1
+                errors += 1
+                results[result_index].status = "error"
+                results[result_index].detail = f"Insert failed: {failed[i]}"
+            else:
+                _index_shooter(doc)
+        touch_shooters()
+
     return BulkShooterImportResult(
         created=created,
         skipped=skipped,
@@ -1017,22 +1232,29 @@ async def bulk_create_shooters_from_csv(
     )
 
 
-@api_router.get("/shooters", response_model=List[Shooter])
+@api_router.get("/shooters", response_model=List[Shooter], dependencies=[revision_etag("shooters")])
 async def get_shooters(current_user: User = Depends(get_current_active_user)):
     shooters = await db.shooters.find().to_list(1000)
     # Stable alphabetical order for dropdowns / management
-    parsed = []
-    for shooter in shooters:
-        shooter.setdefault("division", "Civilian")
-        shooter.setdefault("special_categories", [])
-        try:
-            parsed.append(Shooter(**shooter))
-        except Exception as e:
-            logger.warning(f"Skipping invalid shooter doc: {e}")
+    parsed = load_shooters(shooters)
     parsed.sort(key=lambda s: (s.name or "").casefold())
     return parsed
 
 
+@api_router.get("/shooters/search", response_model=List[Shooter])
+async def search_shooters(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Typeahead: shooters whose last name, first name, NRA number or
+    competitor number start with each word of q. Last-name matches first.
+    """
+    index = await get_shooter_index()
+    return load_shooters([dict(doc) for doc in index.search(q, limit)])
+
+
 @api_router.get("/shooters/{shooter_id}", response_model=Shooter)
 async def get_shooter(
     shooter_id: str, current_user: User = Depends(get_current_active_user)
@@ -1101,7 +1323,9 @@ async def update_shooter(
         ],
     }
     await db.shooters.update_one({"id": shooter_id}, {"$set": update_fields})
-    updated = await db.shooters.find_one({"id": shooter_id})
+    updated = await db.shooters.find_one({"id": shooter_id}, {"_id": 0})
+    _index_shooter(updated)
+    touch_shooters()
     # Defaults for older documents
     updated.setdefault("division", "Civilian")
     updated.setdefault("special_categories", [])
@@ -1119,7 +1343,7 @@ async def delete_shooter(
 
     By default refuses if the shooter has any scores. Pass force=true to also
     delete all of that shooter's scores (across all matches). Also removes the
-    shooter from every match roster.
+    shooter from every match and league roster.
     """
     existing = await db.shooters.find_one({"id": shooter_id})
     if not existing:
@@ -1136,17 +1360,35 @@ async def delete_shooter(
             ),
         )
 
-    deleted_scores = 0
-    if score_count > 0 and force:
+    async def delete_shooter_scores() -> int:
+        if score_count == 0:
+            return 0
+        removed = await db.scores.find(
+            {"shooter_id": shooter_id}, {"_id": 0, "id": 1, "match_id": 1}
+        ).to_list(None)
         result = await db.scores.delete_many({"shooter_id": shooter_id})
-        deleted_scores = result.deleted_count
-
-    # Remove from all match rosters (safe even if field missing)
-    await db.matches.update_many(
-        {}, {"$pull": {"roster_shooter_ids": shooter_id}}
+        await db.shooter_stats.delete_many({"shooter_id": shooter_id})
+        await db.shooter_trends.delete_many({"shooter_id": shooter_id})
+        await touch_league_standings(
+            await _match_leagues({d["match_id"] for d in removed}),
+            removed_ids=[d["id"] for d in removed],
+        )
+        return result.deleted_count
+
+    # Only rosters that list the shooter are touched (multikey index, see
+    # ensure_roster_indexes)
+    on_roster = {"roster_shooter_ids": shooter_id}
+    pull = {"$pull": {"roster_shooter_ids": shooter_id}}
+    deleted_scores, _, _ = await asyncio.gather(
+        delete_shooter_scores(),
+        db.matches.update_many(on_roster, pull),
+        db.leagues.update_many(on_roster, pull),
     )
 
     await db.shooters.delete_one({"id": shooter_id})
+    _unindex_shooter(shooter_id)
+    touch_shooters()
+    touch_matches()
     return {
         "success": True,
         "deleted_scores": deleted_scores,
@@ -1175,6 +1417,51 @@ class MatchRosterAddRequest(BaseModel):
     new_shooters: List[ShooterCreate] = Field(default_factory=list)
 
 
+async def _roster_additions(body: MatchRosterAddRequest) -> List[str]:
+    """
+    Ids to add for a match / league roster request: shooter_ids checked with
+    one $in query (400 naming every unknown id), then new_shooters created
+    with one insert_many. Nothing is written if any part is invalid.
+    """
+    ids_to_add = list(dict.fromkeys(sid for sid in body.shooter_ids if sid))
+    if ids_to_add:
+        found = {
+            doc["id"]
+            async for doc in db.shooters.find({"id": {"$in": ids_to_add}}, {"_id": 0, "id": 1})
+        }
+        missing = [sid for sid in ids_to_add if sid not in found]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Shooter id{'s' if len(missing) > 1 else ''} not found: {', '.join(missing)}",
+            )
+
+    new_docs: List[Dict[str, Any]] = []
+    for ns in body.new_shooters:
+        data = ns.dict()
+        name = (data.get("name") or "").strip()
+        if not name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each new shooter requires a name",
+            )
+        new_docs.append(
+            _new_shooter(
+                name,
+                nra_number=_empty_to_none(data.get("nra_number")),
+                cmp_number=_empty_to_none(data.get("cmp_number")),
+                rating=data.get("rating") or None,
+            ).dict()
+        )
+    if new_docs:
+        await db.shooters.insert_many(new_docs)
+        for doc in new_docs:
+            _index_shooter(doc)
+            ids_to_add.append(doc["id"])
+        touch_shooters()
+    return ids_to_add
+
+
 # --- League Routes ---
 # Layering:
 #   Shooter  = global person (persists forever)
@@ -1261,7 +1548,9 @@ async def delete_league(
     await db.matches.update_many(
         {"league_id": league_id}, {"$set": {"league_id": None}}
     )
+    touch_matches()
     await db.leagues.delete_one({"id": league_id})
+    _league_standings.pop(league_id, None)
     return {
         "success": True,
         "message": f"Deleted league '{existing.get('name')}' and unlinked matches",
@@ -1283,11 +1572,10 @@ async def get_league_roster(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
 
-    members: List[Shooter] = []
-    for sid in league.get("roster_shooter_ids") or []:
-        doc = await db.shooters.find_one({"id": sid})
-        if doc:
-            members.append(Shooter(**doc))
+    roster_ids = list(league.get("roster_shooter_ids") or [])
+    members = load_shooters(
+        await db.shooters.find({"id": {"$in": roster_ids}}, {"_id": 0}).to_list(None)
+    )
     members.sort(key=lambda s: (s.name or "").casefold())
 
     match_count = await db.matches.count_documents({"league_id": league_id})
@@ -1316,34 +1604,7 @@ async def add_to_league_roster(
             detail="Provide shooter_ids and/or new_shooters",
         )
 
-    ids_to_add: List[str] = []
-    for sid in body.shooter_ids:
-        if not sid:
-            continue
-        exists = await db.shooters.find_one({"id": sid})
-        if not exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Shooter id not found: {sid}",
-            )
-        ids_to_add.append(sid)
-
-    for ns in body.new_shooters:
-        data = ns.dict()
-        name = (data.get("name") or "").strip()
-        if not name:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Each new shooter requires a name",
-            )
-        shooter_obj, _ = await _create_shooter_record(
-            name=name,
-            nra_number=_empty_to_none(data.get("nra_number")),
-            cmp_number=_empty_to_none(data.get("cmp_number")),
-            rating=data.get("rating") or None,
-            skip_if_duplicate=False,
-        )
-        ids_to_add.append(shooter_obj.id)
+    ids_to_add = await _roster_additions(body)
 
     if ids_to_add:
         await db.leagues.update_one(
@@ -1354,6 +1615,120 @@ async def add_to_league_roster(
     return await get_league_roster(league_id, current_user)
 
 
+@api_router.get("/leagues/{league_id}/export")
+async def export_league_season(
+    league_id: str, current_user: User = Depends(get_current_active_user)
+):
+    """
+    Season workbook for every match linked to the league.
+
+    One read of the scores (match_id $in linked matches) feeds both the
+    long-format Results sheet, in match date order, and the per-shooter
+    Season Summary sheet. The write-only workbook is built and saved on a
+    worker thread into a spooled temporary file (on disk past
+    XLSX_SPOOL_SIZE), which is then streamed back in chunks.
+    """
+    league = await db.leagues.find_one({"id": league_id})
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+
+    match_ctxs: Dict[str, Dict[str, Any]] = {}
+    async for m in db.matches.find({"league_id": league_id}).sort("date", 1):
+        match_ctxs[m["id"]] = match_context(m)
+    match_ids = list(match_ctxs)
+
+    shooter_ids = await db.scores.distinct("shooter_id", {"match_id": {"$in": match_ids}})
+    shooter_ctxs: Dict[str, Dict[str, Any]] = {}
+    async for doc in db.shooters.find({"id": {"$in": shooter_ids}}):
+        shooter_ctxs[doc["id"]] = shooter_context(doc)
+
+    score_docs = await db.scores.find(
+        {"match_id": {"$in": match_ids}}, SCORE_PROJECTION
+    ).to_list(None)
+    match_order = {match_id: i for i, match_id in enumerate(match_ids)}
+    score_docs.sort(
+        key=lambda d: (
+            match_order[d["match_id"]],
+            (shooter_ctxs.get(d["shooter_id"]) or {}).get("shooter_name") or "",
+            d["shooter_id"],
+            d.get("match_type_instance") or "",
+            str(d.get("caliber") or ""),
+        )
+    )
+
+    out = await run_in_threadpool(
+        _build_league_season_workbook, score_docs, match_ctxs, shooter_ctxs
+    )
+    safe_name = re.sub(r"[^\w\-]+", "_", league.get("name") or "league")[:40]
+    return StreamingResponse(
+        _iter_file(out),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f'attachment; filename="league_season_{safe_name}.xlsx"',
+            "Access-Control-Expose-Headers": "Content-Disposition",
+        },
+    )
+
+
+# Season workbooks stay in memory up to this size, then spill to disk
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def _build_league_season_workbook(
+    score_docs: List[Dict[str, Any]],
+    match_ctxs: Dict[str, Dict[str, Any]],
+    shooter_ctxs: Dict[str, Dict[str, Any]],
+):
+    """Results and Season Summary sheets, saved to a rewound spooled file (CPU-bound)."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    from .excel_style import fill_header, font_header
+
+    wb = Workbook(write_only=True)
+    # Created first so it is the first tab; filled after the single pass
+    ws_summary = wb.create_sheet("Season Summary")
+    ws_results = wb.create_sheet("Results")
+
+    def header_cells(ws, columns) -> List[WriteOnlyCell]:
+        cells = []
+        for name in columns:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = font_header()
+            cell.fill = fill_header()
+            cells.append(cell)
+        return cells
+
+    ws_results.append(header_cells(ws_results, EXPORT_COLUMNS))
+    season = SeasonSummary()
+    for score_doc in score_docs:
+        season.add(score_doc)
+        rows = score_rows(
+            match_ctxs[score_doc["match_id"]],
+            shooter_ctxs.get(score_doc["shooter_id"]) or shooter_context(None),
+            score_doc,
+        )
+        for row in rows:
+            ws_results.append([row[c] for c in EXPORT_COLUMNS])
+
+    ws_summary.append(header_cells(ws_summary, SEASON_SUMMARY_COLUMNS))
+    names = {sid: ctx["shooter_name"] for sid, ctx in shooter_ctxs.items()}
+    for row in season.rows(names):
+        ws_summary.append([row[c] for c in SEASON_SUMMARY_COLUMNS])
+
+    out = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+    wb.save(out)
+    out.seek(0)
+    return out
+
+
+def _iter_file(f, chunk_size: int = 64 * 1024):
+    """Read f in chunks for StreamingResponse (run on its threadpool), closing it at the end."""
+    with f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
 @api_router.delete("/leagues/{league_id}/roster/{shooter_id}")
 async def remove_from_league_roster(
     league_id: str,
@@ -1378,6 +1753,108 @@ async def remove_from_league_roster(
     }
 
 
+# --- League standings (best N of M per caliber) ---
+# League id -> LeagueStandings. Score writes in a league's matches bump
+# leagues.standings_revision and apply the write to the cached state; a state
+# whose revision no longer matches the league document (a write from another
+# worker, a match linked or unlinked) is rebuilt from one $in cursor.
+_league_standings: Dict[str, LeagueStandings] = {}
+
+
+async def _match_leagues(match_ids) -> List[str]:
+    return await db.matches.distinct(
+        "league_id", {"id": {"$in": list(match_ids)}, "league_id": {"$ne": None}}
+    )
+
+
+async def touch_league_standings(
+    league_ids,
+    *,
+    scores: List[Dict[str, Any]] = (),
+    removed_ids: List[str] = (),
+    invalidate: bool = False,
+) -> None:
+    """Bump each league's standings revision and update (or drop) its cached state."""
+    for league_id in {lid for lid in league_ids if lid}:
+        league = await db.leagues.find_one_and_update(
+            {"id": league_id},
+            {"$inc": {"standings_revision": 1}},
+            projection={"standings_revision": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        state = _league_standings.get(league_id)
+        if state is None:
+            continue
+        if invalidate or league is None or state.revision != league["standings_revision"] - 1:
+            _league_standings.pop(league_id, None)
+            continue
+        for score_id in removed_ids:
+            state.remove_score(score_id)
+        for doc in scores:
+            state.apply_score(doc)
+        state.revision = league["standings_revision"]
+
+
+async def _load_league_standings(league_id: str, revision: int) -> LeagueStandings:
+    match_ids = await db.matches.distinct("id", {"league_id": league_id})
+    state = LeagueStandings(revision, match_ids)
+    cursor = db.scores.find({"match_id": {"$in": match_ids}}, STANDINGS_PROJECTION)
+    async for doc in cursor.batch_size(500):
+        state.apply_score(doc)
+    # Only cache if no write landed while scanning
+    latest = await db.leagues.find_one({"id": league_id}, {"_id": 0, "standings_revision": 1})
+    if latest and latest.get("standings_revision", 0) == revision:
+        _league_standings[league_id] = state
+    return state
+
+
+@api_router.get("/leagues/{league_id}/standings", response_class=ORJSONReportResponse)
+async def get_league_standings(
+    league_id: str,
+    best: Optional[int] = Query(None, ge=1),
+    include_guests: bool = False,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Season standings per caliber: sum of each shooter's best `best` match
+    totals across the league's matches (all of them when omitted), ties on
+    X count. Only league roster members are ranked unless include_guests.
+    """
+    league = await db.leagues.find_one(
+        {"id": league_id},
+        {"_id": 0, "name": 1, "season": 1, "roster_shooter_ids": 1, "standings_revision": 1},
+    )
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+
+    revision = league.get("standings_revision", 0)
+    state = _league_standings.get(league_id)
+    if state is None or state.revision != revision:
+        state = await _load_league_standings(league_id, revision)
+
+    members = None if include_guests else set(league.get("roster_shooter_ids") or [])
+    ranked = state.rank(best, members)
+    shooter_ids = list({row["shooter_id"] for rows in ranked.values() for row in rows})
+    names = {
+        doc["id"]: doc.get("name")
+        async for doc in db.shooters.find({"id": {"$in": shooter_ids}}, {"_id": 0, "id": 1, "name": 1})
+    }
+    return trusted_response(
+        {
+            "league_id": league_id,
+            "league_name": league.get("name") or "",
+            "season": league.get("season"),
+            "revision": revision,
+            "matches": len(state.match_ids),
+            "best": best,
+            "calibers": {
+                caliber: [{**row, "shooter_name": names.get(row["shooter_id"])} for row in rows]
+                for caliber, rows in ranked.items()
+            },
+        }
+    )
+
+
 # Match Routes
 @api_router.post("/matches", response_model=Match)
 async def create_match(
@@ -1405,10 +1882,12 @@ async def create_match(
 
     match_obj = Match(**data, league_id=league_id, roster_shooter_ids=roster)
     await db.matches.insert_one(match_obj.dict())
+    touch_matches(match_obj.id)
+    await touch_league_standings([league_id], invalidate=True)
     return match_obj
 
 
-@api_router.get("/matches", response_model=List[Match])
+@api_router.get("/matches", response_model=List[Match], dependencies=[revision_etag("matches")])
 async def get_matches(current_user: User = Depends(get_current_active_user)):
     matches = await db.matches.find().sort("date", -1).to_list(1000)
     return [Match(**match) for match in matches]
@@ -1424,7 +1903,33 @@ async def get_match(
     return Match(**match)
 
 
-@api_router.put("/matches/{match_id}", response_model=Match)
+class MatchUpdateResponse(Match):
+    """Updated match plus the number of scores dropped with removed types / calibers."""
+    scores_dropped: int = 0
+
+
+def removed_structure_query(match_id: str, existing: Match, updated: MatchCreate) -> Optional[Dict[str, Any]]:
+    """One score filter for every removed match type and removed caliber, or None."""
+    existing_types = {mt.instance_name: mt for mt in existing.match_types}
+    new_types = {mt.instance_name: mt for mt in updated.match_types}
+
+    clauses: List[Dict[str, Any]] = []
+    removed_types = sorted(set(existing_types) - set(new_types))
+    if removed_types:
+        clauses.append({"match_type_instance": {"$in": removed_types}})
+    for name in sorted(set(existing_types) & set(new_types)):
+        removed_calibers = set(existing_types[name].calibers) - set(new_types[name].calibers)
+        if removed_calibers:
+            clauses.append({
+                "match_type_instance": name,
+                "caliber": {"$in": sorted(c.value for c in removed_calibers)},
+            })
+    if not clauses:
+        return None
+    return {"match_id": match_id, "$or": clauses}
+
+
+@api_router.put("/matches/{match_id}", response_model=MatchUpdateResponse)
 async def update_match(
     match_id: str,
     match_update: MatchCreate,
@@ -1443,35 +1948,9 @@ async def update_match(
     
     existing_match_obj = Match(**existing_match)
     
-    # Find match types that have been removed or modified
-    existing_match_types = {mt.instance_name: mt for mt in existing_match_obj.match_types}
-    new_match_types = {mt.instance_name: mt for mt in match_update.match_types}
-    
-    # Delete scores for entirely removed match types
-    removed_match_types = set(existing_match_types.keys()) - set(new_match_types.keys())
-    if removed_match_types:
-        for match_type in removed_match_types:
-            await db.scores.delete_many({
-                "match_id": match_id,
-                "match_type_instance": match_type
-            })
-    
-    # For match types that still exist, check for removed calibers
-    for match_type_name in set(existing_match_types.keys()) & set(new_match_types.keys()):
-        existing_calibers = set(existing_match_types[match_type_name].calibers)
-        new_calibers = set(new_match_types[match_type_name].calibers)
-        
-        # Find calibers that have been removed
-        removed_calibers = existing_calibers - new_calibers
-        
-        # Delete scores for removed calibers
-        if removed_calibers:
-            for caliber in removed_calibers:
-                await db.scores.delete_many({
-                    "match_id": match_id,
-                    "match_type_instance": match_type_name,
-                    "caliber": caliber
-                })
+    # Scores for removed match types, and for calibers removed from the types
+    # that remain, go in one delete
+    drop_query = removed_structure_query(match_id, existing_match_obj, match_update)
     
     # Structure only — never wipe roster or league link from this endpoint
     update_data = match_update.dict()
@@ -1485,18 +1964,50 @@ async def update_match(
         league_id=preserved_league,
     )
     
-    # Update in database
-    await db.matches.update_one(
-        {"id": match_id}, 
-        {"$set": match_obj.dict(exclude={"id"})}
+    # Score delete and match update commit together where transactions are
+    # available; stats / trends / standings follow from the dropped docs
+    dropped: List[Dict[str, Any]] = []
+    dropped_count = 0
+    async with transaction() as session:
+        if drop_query:
+            dropped = await db.scores.find(drop_query, REMOVED_SCORE_PROJECTION, session=session).to_list(None)
+            if dropped:
+                result = await db.scores.delete_many(drop_query, session=session)
+                dropped_count = result.deleted_count
+        await db.matches.update_one(
+            {"id": match_id},
+            {"$set": match_obj.dict(exclude={"id"})},
+            session=session,
+        )
+    touch_matches(match_id)
+    # The dropped instances are gone from the match now: stats take their
+    # types from the match as it was
+    types_before = {mt.instance_name: mt.type for mt in existing_match_obj.match_types}
+    await scores_removed(
+        dropped, match_type_for=lambda doc: types_before.get(doc.get("match_type_instance"))
     )
+    # Instances whose type changed: their remaining scores move from the old
+    # type's stats to the new one
+    retyped = [
+        mt.instance_name
+        for mt in match_obj.match_types
+        if mt.instance_name in types_before and types_before[mt.instance_name] != mt.type
+    ]
+    if retyped:
+        moved = await db.scores.find(
+            {"match_id": match_id, "match_type_instance": {"$in": retyped}}, SCORE_PROJECTION
+        ).to_list(None)
+        await record_score_stats(
+            moved, sign=-1, match_type_for=lambda doc: types_before.get(doc.get("match_type_instance"))
+        )
+        await record_score_stats(moved)
+    if match_obj.date != existing_match_obj.date:
+        # Trend buffers are ordered by match date
+        await refresh_score_trends(
+            await db.scores.find({"match_id": match_id}, TREND_PROJECTION).to_list(None)
+        )
     
-    # Get updated match
-    updated_match = await db.matches.find_one({"id": match_id})
-    if not updated_match:
-        raise HTTPException(status_code=500, detail="Failed to update match")
-    
-    return Match(**updated_match)
+    return MatchUpdateResponse(**match_obj.dict(), scores_dropped=dropped_count)
 
 
 @api_router.put("/matches/{match_id}/league", response_model=Match)
@@ -1534,6 +2045,9 @@ async def set_match_league(
         )
     else:
         await db.matches.update_one({"id": match_id}, {"$set": update})
+    touch_matches(match_id)
+    if match.get("league_id") != league_id:
+        await touch_league_standings([match.get("league_id"), league_id], invalidate=True)
 
     updated = await db.matches.find_one({"id": match_id})
     return Match(**updated)
@@ -1569,13 +2083,11 @@ async def sync_match_roster_from_league(
         )
 
     league_ids = list(league.get("roster_shooter_ids") or [])
+    roster_ids = list(match.get("roster_shooter_ids") or [])
     if league_ids:
-        await db.matches.update_one(
-            {"id": match_id},
-            {"$addToSet": {"roster_shooter_ids": {"$each": league_ids}}},
-        )
+        roster_ids = await _add_to_roster(match_id, league_ids)
 
-    return await get_match_roster(match_id, current_user)
+    return await _match_roster(match_id, roster_ids)
 
 
 @api_router.post("/matches/{match_id}/roster/{shooter_id}/promote-to-league")
@@ -1612,6 +2124,7 @@ async def promote_match_shooter_to_league(
         {"id": match_id},
         {"$addToSet": {"roster_shooter_ids": shooter_id}},
     )
+    touch_matches(match_id)
     await db.leagues.update_one(
         {"id": league_id},
         {"$addToSet": {"roster_shooter_ids": shooter_id}},
@@ -1625,51 +2138,28 @@ async def promote_match_shooter_to_league(
     }
 
 
-@api_router.get("/matches/{match_id}/roster", response_model=MatchRosterResponse)
-async def get_match_roster(
-    match_id: str, current_user: User = Depends(get_current_active_user)
-):
-    """Return formal roster plus any shooters who have scores but aren't rostered."""
-    match = await db.matches.find_one({"id": match_id})
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
-
-    roster_ids = list(match.get("roster_shooter_ids") or [])
-
-    # Score counts for this match by shooter
+async def _match_roster(match_id: str, roster_ids: List[str]) -> MatchRosterResponse:
+    """Roster response from one score-count $group and one shooter $in query."""
     pipeline = [
         {"$match": {"match_id": match_id}},
         {"$group": {"_id": "$shooter_id", "count": {"$sum": 1}}},
     ]
-    score_counts: Dict[str, int] = {}
-    async for row in db.scores.aggregate(pipeline):
-        score_counts[row["_id"]] = row["count"]
-
-    async def load_member(sid: str) -> Optional[MatchRosterMember]:
-        doc = await db.shooters.find_one({"id": sid})
-        if not doc:
-            return None
-        count = score_counts.get(sid, 0)
-        return MatchRosterMember(
-            shooter=Shooter(**doc),
-            score_count=count,
-            has_scores=count > 0,
-        )
+    score_counts: Dict[str, int] = {
+        row["_id"]: row["count"] async for row in db.scores.aggregate(pipeline)
+    }
 
-    members: List[MatchRosterMember] = []
-    for sid in roster_ids:
-        member = await load_member(sid)
-        if member:
-            members.append(member)
-    members.sort(key=lambda m: (m.shooter.name or "").casefold())
+    roster_set = set(roster_ids)
+    docs = await db.shooters.find(
+        {"id": {"$in": list(roster_set | set(score_counts))}}, {"_id": 0}
+    ).to_list(None)
 
+    members: List[MatchRosterMember] = []
     scored_but_not: List[MatchRosterMember] = []
-    roster_set = set(roster_ids)
-    for sid, count in score_counts.items():
-        if sid not in roster_set:
-            member = await load_member(sid)
-            if member:
-                scored_but_not.append(member)
+    for shooter in load_shooters(docs):
+        count = score_counts.get(shooter.id, 0)
+        member = MatchRosterMember(shooter=shooter, score_count=count, has_scores=count > 0)
+        (members if shooter.id in roster_set else scored_but_not).append(member)
+    members.sort(key=lambda m: (m.shooter.name or "").casefold())
     scored_but_not.sort(key=lambda m: (m.shooter.name or "").casefold())
 
     return MatchRosterResponse(
@@ -1679,6 +2169,29 @@ async def get_match_roster(
     )
 
 
+async def _add_to_roster(match_id: str, shooter_ids: List[str]) -> List[str]:
+    """$addToSet onto the match roster; returns the roster afterwards."""
+    updated = await db.matches.find_one_and_update(
+        {"id": match_id},
+        {"$addToSet": {"roster_shooter_ids": {"$each": shooter_ids}}},
+        projection={"roster_shooter_ids": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    touch_matches(match_id)
+    return list((updated or {}).get("roster_shooter_ids") or [])
+
+
+@api_router.get("/matches/{match_id}/roster", response_model=MatchRosterResponse)
+async def get_match_roster(
+    match_id: str, current_user: User = Depends(get_current_active_user)
+):
+    """Return formal roster plus any shooters who have scores but aren't rostered."""
+    match = await db.matches.find_one({"id": match_id}, {"_id": 0, "roster_shooter_ids": 1})
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return await _match_roster(match_id, list(match.get("roster_shooter_ids") or []))
+
+
 @api_router.post("/matches/{match_id}/roster", response_model=MatchRosterResponse)
 async def add_to_match_roster(
     match_id: str,
@@ -1699,43 +2212,13 @@ async def add_to_match_roster(
             detail="Provide shooter_ids and/or new_shooters",
         )
 
-    ids_to_add: List[str] = []
-
-    for sid in body.shooter_ids:
-        if not sid:
-            continue
-        exists = await db.shooters.find_one({"id": sid})
-        if not exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Shooter id not found: {sid}",
-            )
-        ids_to_add.append(sid)
-
-    for ns in body.new_shooters:
-        data = ns.dict()
-        name = (data.get("name") or "").strip()
-        if not name:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Each new shooter requires a name",
-            )
-        shooter_obj, _ = await _create_shooter_record(
-            name=name,
-            nra_number=_empty_to_none(data.get("nra_number")),
-            cmp_number=_empty_to_none(data.get("cmp_number")),
-            rating=data.get("rating") or None,
-            skip_if_duplicate=False,
-        )
-        ids_to_add.append(shooter_obj.id)
+    ids_to_add = await _roster_additions(body)
 
+    roster_ids = list(match.get("roster_shooter_ids") or [])
     if ids_to_add:
-        await db.matches.update_one(
-            {"id": match_id},
-            {"$addToSet": {"roster_shooter_ids": {"$each": ids_to_add}}},
-        )
+        roster_ids = await _add_to_roster(match_id, ids_to_add)
 
-    return await get_match_roster(match_id, current_user)
+    return await _match_roster(match_id, roster_ids)
 
 
 @api_router.delete("/matches/{match_id}/roster/{shooter_id}")
@@ -1770,15 +2253,15 @@ async def remove_from_match_roster(
 
     deleted_scores = 0
     if delete_scores and score_count > 0:
-        result = await db.scores.delete_many(
+        deleted_scores = await remove_scores(
             {"match_id": match_id, "shooter_id": shooter_id}
         )
-        deleted_scores = result.deleted_count
 
     await db.matches.update_one(
         {"id": match_id},
         {"$pull": {"roster_shooter_ids": shooter_id}},
     )
+    touch_matches(match_id)
 
     return {
         "success": True,
@@ -1805,20 +2288,22 @@ async def delete_match(
         raise HTTPException(status_code=404, detail="Match not found")
     
     # Delete all scores associated with this match
-    delete_scores_result = await db.scores.delete_many({"match_id": match_id})
+    deleted_scores = await remove_scores({"match_id": match_id})
     
     # Delete match configuration
     await db.match_configs.delete_many({"match_id": match_id})
     
     # Delete the match itself
     delete_match_result = await db.matches.delete_one({"id": match_id})
+    touch_matches(match_id)
+    await touch_league_standings([match.get("league_id")], invalidate=True)
     
     if delete_match_result.deleted_count == 0:
         raise HTTPException(status_code=500, detail="Failed to delete match")
     
     return {
         "success": True,
-        "message": f"Match deleted successfully along with {delete_scores_result.deleted_count} related scores"
+        "message": f"Match deleted successfully along with {deleted_scores} related scores"
     }
 
 
@@ -1846,9 +2331,11 @@ async def get_match_config(
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    match_obj = Match(**match)
+    return _build_match_config(Match(**match))
+
 
-    # Build detailed configuration
+def _build_match_config(match_obj: Match) -> Dict[str, Any]:
+    """Match structure with each instance's stage layout inlined."""
     config = {
         "match_id": match_obj.id,
         "match_name": match_obj.name,
@@ -1875,6 +2362,284 @@ async def get_match_config(
     return config
 
 
+# --- Shooter stats (running sums per shooter / caliber / match type) ---
+async def _score_match_types(score_docs: List[Dict[str, Any]]):
+    """(match_id, instance_name) -> match type for the given scores, in one query."""
+    match_ids = list({doc.get("match_id") for doc in score_docs})
+    types: Dict[Tuple[str, str], Any] = {}
+    async for match in db.matches.find(
+        {"id": {"$in": match_ids}}, {"_id": 0, "id": 1, "match_types": 1}
+    ):
+        for mt in match.get("match_types") or []:
+            types.setdefault((match["id"], mt.get("instance_name")), mt.get("type"))
+    return lambda doc: types.get((doc.get("match_id"), doc.get("match_type_instance")))
+
+
+async def _apply_stats_deltas(deltas: Dict[Tuple[str, Any, Optional[str]], Dict[str, int]]) -> None:
+    if not deltas:
+        return
+    await db.shooter_stats.bulk_write(
+        [UpdateOne(key_filter(key), {"$inc": delta}, upsert=True) for key, delta in deltas.items()],
+        ordered=False,
+    )
+    shooter_ids = list({key[0] for key in deltas})
+    await db.shooter_stats.delete_many(
+        {"shooter_id": {"$in": shooter_ids}, "entries": {"$lte": 0}}
+    )
+
+
+async def record_score_stats(
+    score_docs: List[Dict[str, Any]],
+    sign: int = 1,
+    match_type_for: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> None:
+    """Add (sign=1) or remove (sign=-1) scores from shooter_stats.
+
+    Match types come from the stored matches unless match_type_for is given;
+    either way they must be what the score was recorded under, so call this
+    before the match changes or pass the types from before the change.
+    """
+    if not score_docs:
+        return
+    _note_backfill_write("shooter_stats", {doc.get("shooter_id") for doc in score_docs})
+    if match_type_for is None:
+        match_type_for = await _score_match_types(score_docs)
+    await _apply_stats_deltas(accumulate_stats(score_docs, match_type_for, sign))
+
+
+async def rebuild_shooter_stats(shooter_id: Optional[str] = None) -> Dict[str, Any]:
+    """Recompute shooter_stats from scores, reporting keys that had drifted."""
+    scope = {"shooter_id": shooter_id} if shooter_id else {}
+    docs = await db.scores.find(scope, SCORE_PROJECTION).to_list(None)
+    expected = accumulate_stats(docs, await _score_match_types(docs))
+    stored = await db.shooter_stats.find(scope, {"_id": 0}).to_list(None)
+    mismatched = diff_stats(stored, expected)
+
+    await db.shooter_stats.delete_many(scope)
+    await _apply_stats_deltas(expected)
+    return {
+        "scores": len(docs),
+        "stats_documents": len(expected),
+        "mismatched": len(mismatched),
+        "mismatched_keys": [list(key) for key in mismatched[:50]],
+    }
+
+
+async def ensure_shooter_stats() -> None:
+    """Unique key index on shooter_stats (at startup and after a database reset)."""
+    await db.shooter_stats.create_index(
+        [("shooter_id", 1), ("caliber", 1), ("match_type", 1)], unique=True
+    )
+
+
+# --- Startup backfills of derived collections ---
+# Each runs in the background once the app is serving and writes a marker to
+# `meta` when it has finished, so one that crashed or was interrupted by a
+# restart runs again on the next start. Shooters written to while a backfill
+# runs may have had the change overwritten by it; they are collected here and
+# rebuilt once more afterwards.
+_backfill_dirty: Dict[str, set] = {}
+_backfill_task: Optional[asyncio.Task] = None
+
+
+def _backfill_marker(name: str) -> Dict[str, str]:
+    return {"id": f"backfill:{name}"}
+
+
+def _note_backfill_write(name: str, shooter_ids) -> None:
+    dirty = _backfill_dirty.get(name)
+    if dirty is not None:
+        dirty.update(shooter_ids)
+
+
+async def _mark_backfilled(name: str) -> None:
+    await db.meta.update_one(
+        _backfill_marker(name), {"$set": {"completed_at": datetime.utcnow()}}, upsert=True
+    )
+
+
+async def _run_backfill(name: str, rebuild: Callable[[Optional[str]], Any]) -> Optional[Any]:
+    """Run rebuild() over every shooter unless a finished backfill is recorded."""
+    if await db.meta.find_one(_backfill_marker(name), {"_id": 1}):
+        return None
+    dirty = _backfill_dirty[name] = set()
+    try:
+        result = await rebuild(None)
+        while dirty:
+            await rebuild(dirty.pop())
+    finally:
+        _backfill_dirty.pop(name, None)
+    await _mark_backfilled(name)
+    return result
+
+
+async def backfill_derived_collections() -> None:
+    try:
+        result = await _run_backfill("shooter_stats", rebuild_shooter_stats)
+        if result is not None:
+            logger.info(f"Backfilled shooter_stats from {result['scores']} score(s)")
+    except Exception as e:
+        logger.error(f"shooter_stats backfill failed, retrying on next start: {e}")
+    try:
+        count = await _run_backfill("shooter_trends", rebuild_shooter_trends)
+        if count is not None:
+            logger.info(f"Backfilled {count} shooter_trends buffer(s)")
+    except Exception as e:
+        logger.error(f"shooter_trends backfill failed, retrying on next start: {e}")
+
+
+# --- Shooter trends (date-ordered, capped buffer per shooter / caliber) ---
+async def _match_dates(match_ids) -> Dict[str, datetime]:
+    return {
+        match["id"]: match.get("date")
+        async for match in db.matches.find(
+            {"id": {"$in": list(match_ids)}}, {"_id": 0, "id": 1, "date": 1}
+        )
+    }
+
+
+async def push_score_trend(score_doc: Dict[str, Any], match_date: datetime) -> None:
+    """Insert (or replace) one score in its shooter/caliber buffer, oldest entries falling off."""
+    key = trend_key(score_doc)
+    _note_backfill_write("shooter_trends", [key["shooter_id"]])
+    await db.shooter_trends.update_one(key, {"$pull": {"recent": {"score_id": score_doc["id"]}}})
+    entry = trend_entry(score_doc, match_date)
+    if entry is None:
+        return
+    await db.shooter_trends.update_one(
+        key,
+        {
+            "$push": {
+                "recent": {
+                    "$each": [entry],
+                    "$sort": {"date": 1, "score_id": 1},
+                    "$slice": -TREND_BUFFER_SIZE,
+                }
+            }
+        },
+        upsert=True,
+    )
+
+
+async def refresh_score_trends(score_docs: List[Dict[str, Any]]) -> None:
+    """Rebuild the buffers the given scores belong to from the scores collection.
+
+    Used after deletes and match date changes, where an evicted older card may
+    need to come back into the buffer.
+    """
+    keys = {tuple(trend_key(doc).values()) for doc in score_docs}
+    _note_backfill_write("shooter_trends", {shooter_id for shooter_id, _ in keys})
+    for shooter_id, caliber in keys:
+        key = {"shooter_id": shooter_id, "caliber": caliber}
+        docs = await db.scores.find(key, TREND_PROJECTION).to_list(None)
+        rebuilt = build_trend_docs(docs, await _match_dates({d.get("match_id") for d in docs}))
+        if rebuilt:
+            await db.shooter_trends.replace_one(key, rebuilt[0], upsert=True)
+        else:
+            await db.shooter_trends.delete_one(key)
+
+
+async def rebuild_shooter_trends(shooter_id: Optional[str] = None) -> int:
+    """Recompute shooter_trends from scores; returns the number of buffers written."""
+    scope = {"shooter_id": shooter_id} if shooter_id else {}
+    docs = await db.scores.find(scope, TREND_PROJECTION).to_list(None)
+    trend_docs = build_trend_docs(docs, await _match_dates({d.get("match_id") for d in docs}))
+    await db.shooter_trends.delete_many(scope)
+    if trend_docs:
+        # Upserts: a score written since the delete may have created a buffer
+        await db.shooter_trends.bulk_write(
+            [ReplaceOne(trend_key(doc), doc, upsert=True) for doc in trend_docs], ordered=False
+        )
+    return len(trend_docs)
+
+
+async def ensure_shooter_trends() -> None:
+    """Unique key index on shooter_trends (at startup and after a database reset)."""
+    await db.shooter_trends.create_index([("shooter_id", 1), ("caliber", 1)], unique=True)
+
+
+async def ensure_roster_indexes() -> None:
+    """Multikey indexes so roster membership lookups don't scan every match / league."""
+    await db.matches.create_index("roster_shooter_ids")
+    await db.leagues.create_index("roster_shooter_ids")
+
+
+# Score fields scores_removed() reads from deleted docs
+REMOVED_SCORE_PROJECTION = {**SCORE_PROJECTION, **TREND_PROJECTION}
+
+
+async def scores_removed(
+    docs: List[Dict[str, Any]],
+    match_type_for: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> None:
+    """Bring stats, trends and league standings in step with deleted scores.
+
+    Pass match_type_for when the match has already been edited (see
+    record_score_stats).
+    """
+    if not docs:
+        return
+    touch_match_scores({d["match_id"] for d in docs})
+    await record_score_stats(docs, sign=-1, match_type_for=match_type_for)
+    await refresh_score_trends(docs)
+    await touch_league_standings(
+        await _match_leagues({d["match_id"] for d in docs}), removed_ids=[d["id"] for d in docs]
+    )
+
+
+async def remove_scores(query: Dict[str, Any]) -> int:
+    """Delete scores matching query, keeping stats, trends and league standings in step."""
+    docs = await db.scores.find(query, REMOVED_SCORE_PROJECTION).to_list(None)
+    if not docs:
+        return 0
+    result = await db.scores.delete_many(query)
+    await scores_removed(docs)
+    return result.deleted_count
+
+
+@api_router.post("/admin/shooter-stats/rebuild")
+async def rebuild_shooter_stats_endpoint(
+    shooter_id: Optional[str] = None, current_user: User = Depends(get_admin_user)
+):
+    """Admin-only: recompute shooter_stats and shooter_trends from scores (all shooters, or one)."""
+    result = await rebuild_shooter_stats(shooter_id)
+    result["trend_documents"] = await rebuild_shooter_trends(shooter_id)
+    return result
+
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(current_user: User = Depends(get_admin_user)):
+    """Admin-only: request, Mongo and compression metrics in Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(compression=compression_stats.snapshot()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@api_router.get("/admin/compression-stats")
+async def get_compression_stats(current_user: User = Depends(get_admin_user)):
+    """Admin-only: compressed responses per route and encoding since startup."""
+    return compression_stats.snapshot()
+
+
+@api_router.get("/admin/classifications", response_class=ORJSONReportResponse)
+async def get_classifications(
+    min_cards: int = Query(MIN_QUALIFYING_CARDS, ge=1),
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    Admin-only: ratings the score history supports for every shooter, and the
+    changes against each shooter's current rating. Nothing is written.
+    """
+    docs = await db.scores.find(
+        {"not_shot": {"$ne": True}, "total_score": {"$ne": None}}, CLASSIFICATION_PROJECTION
+    ).to_list(None)
+    shooters = await db.shooters.find({}, {"_id": 0, "id": 1, "name": 1, "rating": 1}).to_list(None)
+    return trusted_response(
+        classify(docs, await _score_match_types(docs), shooters, min_cards=min_cards)
+    )
+
+
 # Score Routes
 @api_router.post("/scores", response_model=Score)
 async def create_score(
@@ -1926,6 +2691,10 @@ async def create_score(
 
     score_obj = Score(**score_dict)
     await db.scores.insert_one(score_obj.dict())
+    touch_match_scores([score_obj.match_id])
+    await record_score_stats([score_obj.dict()])
+    await push_score_trend(score_obj.dict(), match_obj.date)
+    await touch_league_standings([match_obj.league_id], scores=[score_obj.dict()])
     return score_obj
 
 
@@ -1982,14 +2751,26 @@ async def update_score(
     })
 
     # Update score
+    await record_score_stats([existing_score], sign=-1)
     await db.scores.update_one({"id": score_id}, {"$set": score_dict})
 
     # Get updated score
     updated_score = await db.scores.find_one({"id": score_id})
+    touch_match_scores({existing_score["match_id"], updated_score["match_id"]})
+    await record_score_stats([updated_score])
+    if trend_key(existing_score) == trend_key(updated_score) and trend_entry(updated_score, match_obj.date):
+        await push_score_trend(updated_score, match_obj.date)
+    else:
+        # Caliber changed or card no longer shot: the old buffer may need an evicted card back
+        await refresh_score_trends([existing_score, updated_score])
+    await touch_league_standings(
+        await _match_leagues({existing_score["match_id"], updated_score["match_id"]}),
+        scores=[updated_score],
+    )
     return Score(**updated_score)
 
 
-@api_router.get("/scores", response_model=List[Score])
+@api_router.get("/scores", response_model=List[Score], response_class=ORJSONReportResponse)
 async def get_scores(
     match_id: Optional[str] = None,
     shooter_id: Optional[str] = None,
@@ -2003,7 +2784,7 @@ async def get_scores(
         query["shooter_id"] = shooter_id
 
     scores = await db.scores.find(query).to_list(1000)
-    return [Score(**score) for score in scores]
+    return trusted_response(load_scores(scores))
 
 
 @api_router.get("/scores/{score_id}", response_model=Score)
@@ -2017,10 +2798,19 @@ async def get_score(
 
 
 # Special Reports
-@api_router.get("/match-report/{match_id}", response_model=Dict[str, Any])
+@api_router.get(
+    "/match-report/{match_id}",
+    response_model=Dict[str, Any],
+    response_class=ORJSONReportResponse,
+    dependencies=[revision_etag(*MATCH_REPORT_REVISIONS)],
+)
 async def get_match_report(
     match_id: str, current_user: User = Depends(get_current_active_user)
 ):
+    return trusted_response(await _build_match_report(match_id))
+
+
+async def _build_match_report(match_id: str) -> Dict[str, Any]:
     # Get match details
     match = await db.matches.find_one({"id": match_id})
     if not match:
@@ -2032,16 +2822,15 @@ async def get_match_report(
     scores = await db.scores.find({"match_id": match_id}).to_list(1000)
     
     # Build shooter data map
-    shooter_ids = set(score["shooter_id"] for score in scores)
-    shooters = {}
-    for shooter_id in shooter_ids:
-        shooter = await db.shooters.find_one({"id": shooter_id})
-        if shooter:
-            shooters[shooter_id] = Shooter(**shooter)
+    shooter_ids = list({score["shooter_id"] for score in scores})
+    shooter_docs = await db.shooters.find({"id": {"$in": shooter_ids}}).to_list(None)
+    shooters = {shooter.id: shooter for shooter in load_shooters(shooter_docs)}
     
-    # Get match configuration for subtotal calculations
-    match_config = await get_match_config(match_id, current_user)
-    match_types_config = {mt["instance_name"]: mt for mt in match_config["match_types"]}
+    # Match configuration for the response; stage tables for subtotal calculations
+    match_config = _build_match_config(match_obj)
+    stage_tables = {
+        mt.instance_name: get_stage_table(mt.type) for mt in match_obj.match_types
+    }
     
     # Organize scores by shooter, match type instance, and caliber
     result = {
@@ -2049,8 +2838,7 @@ async def get_match_report(
         "shooters": {}
     }
     
-    for score in scores:
-        score_obj = Score(**score)
+    for score_obj in load_scores(scores):
         shooter_id = score_obj.shooter_id
         if shooter_id not in result["shooters"] and shooter_id in shooters:
             result["shooters"][shooter_id] = {
@@ -2066,13 +2854,11 @@ async def get_match_report(
             key = f"{match_type_instance}_{caliber}"
             
             # Add calculated subtotals if this match type has them
-            if match_type_instance in match_types_config:
-                mt_config = match_types_config[match_type_instance]
-                match_type = mt_config["type"]
-                stages_config = get_stages_for_match_type(match_type)
-                
+            if match_type_instance in stage_tables:
                 # Use the core function to calculate subtotals
-                subtotals = calculate_score_subtotals(score_obj, stages_config)
+                subtotals = calculate_score_subtotals(
+                    score_obj, stage_tables[match_type_instance]
+                )
                 
                 shooter_data["scores"][key] = {
                     "score": {
@@ -2095,40 +2881,21 @@ async def get_match_report(
                 }
     
     # Calculate and add aggregates if applicable
-    if match_obj.aggregate_type != "None":
+    agg_spec = AGGREGATE_SPECS.get(match_obj.aggregate_type)
+    if agg_spec is not None:
+        instance_types = instance_type_map(match_obj)
         for shooter_id, shooter_data in result["shooters"].items():
             shooter_scores = shooter_data["scores"]
-            shooter_data["aggregates"] = calculate_aggregates(shooter_scores, match_obj)
-
-            # --- Add fallback aggregate total if not present ---
-            agg_label = None
-            agg_count = 0
-            if match_obj.aggregate_type == AggregateType.TWENTY_SEVEN_HUNDRED:
-                agg_label = "2700"
-                agg_count = 3
-            elif match_obj.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_2X900:
-                agg_label = "1800"
-                agg_count = 2
-            elif match_obj.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_3X600:
-                agg_label = "1800"
-                agg_count = 3
-
-            if agg_label:
-                # Find all 900 or 600 scores for this shooter
-                scores_list = []
-                x_counts = []
-                for key, score_data in shooter_scores.items():
-                    score = score_data["score"]
-                    if score["total_score"] is not None:
-                        scores_list.append(score["total_score"])
-                        x_counts.append(score["total_x_count"] or 0)
-                if len(scores_list) >= agg_count:
-                    total = sum(sorted(scores_list, reverse=True)[:agg_count])
-                    x_total = sum(sorted(x_counts, reverse=True)[:agg_count])
-                    shooter_data["aggregates"][agg_label] = {
-                        "score": total,
-                        "x_count": x_total,
-                    }
+            shooter_data["aggregates"] = calculate_aggregates(
+                shooter_scores, match_obj, instance_types
+            )
+            # Caliber-agnostic total under the bare label (e.g. "1800")
+            overall = calculate_overall_aggregate(shooter_scores, match_obj, instance_types)
+            if overall is not None:
+                shooter_data["aggregates"][agg_spec.label] = {
+                    "score": overall["score"],
+                    "x_count": overall["x_count"],
+                }
 
     # Include match configuration in the result
     result["match_config"] = match_config
@@ -2172,18 +2939,13 @@ async def _build_bulletin_results_for_event(
       grand_aggregate — sum all totals for shooter in match
     """
     scores = await db.scores.find({"match_id": match_id}).to_list(5000)
-    shooter_ids = {s["shooter_id"] for s in scores}
-    shooters: Dict[str, Shooter] = {}
-    for sid in shooter_ids:
-        doc = await db.shooters.find_one({"id": sid})
-        if doc:
-            # Tolerate older docs missing new fields
-            doc.setdefault("division", "Civilian")
-            doc.setdefault("special_categories", [])
-            doc.setdefault("competitor_number", None)
-            shooters[sid] = Shooter(**doc)
+    shooter_ids = list({s["shooter_id"] for s in scores})
+    shooter_docs = await db.shooters.find({"id": {"$in": shooter_ids}}).to_list(None)
+    shooters: Dict[str, Shooter] = {sh.id: sh for sh in load_shooters(shooter_docs)}
 
-    results: List[CompetitorResult] = []
+    from .score_matrix import MatchScoreMatrix
+
+    matrix = MatchScoreMatrix.from_documents(scores)
 
     if event_scope in ("slow", "timed", "rapid", "nmc", "total"):
         if not caliber or not match_type_instance:
@@ -2191,53 +2953,16 @@ async def _build_bulletin_results_for_event(
                 status_code=400,
                 detail="caliber and match_type_instance are required for this event_scope",
             )
-        for s in scores:
-            if s.get("match_type_instance") != match_type_instance:
-                continue
-            cal = s.get("caliber")
-            cal_val = cal.value if hasattr(cal, "value") else str(cal)
-            if cal_val != caliber:
-                continue
-            sc, xc = event_score_from_score_doc(s, event_scope)
-            if sc is None:
-                continue
-            sh = shooters.get(s["shooter_id"])
-            if not sh:
-                continue
-            results.append(
-                CompetitorResult(
-                    shooter_id=sh.id,
-                    name=sh.name,
-                    competitor_number=getattr(sh, "competitor_number", None),
-                    rating=_shooter_rating(sh),
-                    division=_shooter_division(sh),
-                    special_categories=_shooter_cats(sh),
-                    score=sc,
-                    x_count=xc or 0,
-                )
-            )
-        return results
-
-    # Aggregates: accumulate per shooter
-    totals: Dict[str, Dict[str, int]] = {}
-    for s in scores:
-        if s.get("not_shot") or s.get("total_score") is None:
-            continue
-        cal = s.get("caliber")
-        cal_val = cal.value if hasattr(cal, "value") else str(cal)
-        if event_scope == "caliber_aggregate":
-            if not caliber or cal_val != caliber:
-                continue
-        elif event_scope != "grand_aggregate":
-            raise HTTPException(status_code=400, detail=f"Unknown event_scope: {event_scope}")
-
-        sid = s["shooter_id"]
-        if sid not in totals:
-            totals[sid] = {"score": 0, "x": 0}
-        totals[sid]["score"] += int(s["total_score"])
-        totals[sid]["x"] += int(s.get("total_x_count") or 0)
+        event_scores = matrix.event_scores(event_scope, match_type_instance, caliber)
+    elif event_scope == "caliber_aggregate":
+        event_scores = matrix.aggregate_totals(caliber) if caliber else []
+    elif event_scope == "grand_aggregate":
+        event_scores = matrix.aggregate_totals()
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown event_scope: {event_scope}")
 
-    for sid, t in totals.items():
+    results: List[CompetitorResult] = []
+    for sid, sc, xc in event_scores:
         sh = shooters.get(sid)
         if not sh:
             continue
@@ -2249,8 +2974,8 @@ async def _build_bulletin_results_for_event(
                 rating=_shooter_rating(sh),
                 division=_shooter_division(sh),
                 special_categories=_shooter_cats(sh),
-                score=t["score"],
-                x_count=t["x"],
+                score=sc,
+                x_count=xc,
             )
         )
     return results
@@ -2280,7 +3005,10 @@ def _event_title(event_scope: str, caliber: Optional[str], match_type_instance:
     return f"{cal} MATCH"
 
 
-@api_router.get("/match-report/{match_id}/bulletin/events")
+@api_router.get(
+    "/match-report/{match_id}/bulletin/events",
+    dependencies=[revision_etag(*MATCH_REPORT_REVISIONS)],
+)
 async def list_bulletin_events(
     match_id: str, current_user: User = Depends(get_current_active_user)
 ):
@@ -2377,7 +3105,11 @@ async def list_bulletin_events(
     return {"match_id": match_id, "events": events}
 
 
-@api_router.get("/match-report/{match_id}/bulletin")
+@api_router.get(
+    "/match-report/{match_id}/bulletin",
+    response_class=ORJSONReportResponse,
+    dependencies=[revision_etag(*MATCH_REPORT_REVISIONS)],
+)
 async def get_match_bulletin(
     match_id: str,
     event_scope: str = "total",
@@ -2391,6 +3123,25 @@ async def get_match_bulletin(
 
     Query params mirror docs/NRA_BULLETIN_SPEC.md event scopes.
     """
+    return trusted_response(
+        await _build_match_bulletin(
+            match_id,
+            event_scope=event_scope,
+            caliber=caliber,
+            match_type_instance=match_type_instance,
+            match_no=match_no,
+        )
+    )
+
+
+async def _build_match_bulletin(
+    match_id: str,
+    *,
+    event_scope: str,
+    caliber: Optional[str],
+    match_type_instance: Optional[str],
+    match_no: int,
+) -> Dict[str, Any]:
     match = await db.matches.find_one({"id": match_id})
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
@@ -2447,6 +3198,9 @@ async def get_match_bulletin_excel(
     current_user: User = Depends(get_current_active_user),
 ):
     """Excel export of the NRA bulletin (same sections as the web view)."""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
     from .excel_style import (
         apply_print_setup,
         autosize_columns,
@@ -2460,13 +3214,12 @@ async def get_match_bulletin_excel(
         align_center,
     )
 
-    bulletin = await get_match_bulletin(
+    bulletin = await _build_match_bulletin(
         match_id,
         event_scope=event_scope,
         caliber=caliber,
         match_type_instance=match_type_instance,
         match_no=match_no,
-        current_user=current_user,
     )
     wb = Workbook()
     ws = wb.active
@@ -2593,22 +3346,25 @@ async def get_match_report_excel(
     match_id: str, current_user: User = Depends(get_current_active_user)
 ):
     # Get the match report data first (reuse existing function)
-    report_data = await get_match_report(match_id, current_user)
+    report_data = await _build_match_report(match_id)
     match_obj: Match = report_data["match"] # Added type hint
     shooters_data = report_data["shooters"]
     
     # Create a new workbook
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
     from .excel_style import (
         apply_print_setup,
-        fill_alt,
         fill_header,
         font_body,
         font_header,
         font_meta_label,
         font_title,
+        grid_style_name,
+        register_named_styles,
         THIN,
-        align_center,
-        align_left,
     )
 
     wb = Workbook()
@@ -2678,23 +3434,12 @@ async def get_match_report_excel(
 
     current_header_start_row = 8 # Assuming match details take up to row 7
 
-    # Add shooter rows
-    for idx, (shooter_id, s_data) in enumerate(shooters_data.items()): # s_data to avoid conflict
-        shooter_obj = s_data["shooter"]
-        row_content_list: List[Any] # Type hint for clarity
-        if is_aggregate:
-            if base_match_type_for_agg_val and ordered_calibers_for_agg and agg_sub_fields_for_agg: # Ensure all parts are valid
-                row_content_list = build_aggregate_row_grouped(
-                    shooter_obj, s_data, report_data, 
-                    ordered_calibers_for_agg, agg_sub_fields_for_agg, base_match_type_for_agg_val
-                )
-            else: # Should not happen if headers were generated
-                pass
-        else:
-            row_content_list = build_non_aggregate_row(shooter_obj, s_data, match_obj) # Pass match_obj
-        
-        for col_idx_excel, value in enumerate(row_content_list, 1):
-            ws.cell(row=current_header_start_row + header_offset + idx, column=col_idx_excel, value=value)
+    # One score index per shooter, shared by the summary rows and detail sheets
+    instance_types = {mt.instance_name: mt.type for mt in match_obj.match_types}
+    score_indexes = {
+        shooter_id: build_shooter_score_index(s_data, instance_types)
+        for shooter_id, s_data in shooters_data.items()
+    }
 
     # Apply header styles (for both header rows if aggregate)
     if header_offset > 0: # Check if any header was actually added
@@ -2766,22 +3511,21 @@ async def get_match_report_excel(
     data_start_excel_row = current_header_start_row + header_offset
     for idx, (shooter_id, s_data) in enumerate(shooters_data.items()): # s_data to avoid conflict
         shooter_obj = s_data["shooter"]
-        row_content_list: List[Any] # Type hint for clarity
+        row_content_list: List[Any] = [] # Type hint for clarity
         if is_aggregate:
             if base_match_type_for_agg_val and ordered_calibers_for_agg and agg_sub_fields_for_agg: # Ensure all parts are valid
                 row_content_list = build_aggregate_row_grouped(
-                    shooter_obj, s_data, report_data, 
+                    shooter_obj, score_indexes[shooter_id],
                     ordered_calibers_for_agg, agg_sub_fields_for_agg, base_match_type_for_agg_val
                 )
-            else: # Should not happen if headers were generated
-                pass
         else:
-            row_content_list = build_non_aggregate_row(shooter_obj, s_data, match_obj) # Pass match_obj
+            row_content_list = build_non_aggregate_row(shooter_obj, score_indexes[shooter_id], match_obj) # Pass match_obj
         
         for col_idx_excel, value in enumerate(row_content_list, 1):
             ws.cell(row=data_start_excel_row + idx, column=col_idx_excel, value=value)
 
     # Apply borders, zebra striping, and alignment to data cells
+    register_named_styles(wb)
     for row_offset, row in enumerate(
         ws.iter_rows(
             min_row=data_start_excel_row,
@@ -2792,15 +3536,12 @@ async def get_match_report_excel(
     ):
         alt = row_offset % 2 == 1
         for cell in row:
-            cell.border = thin_border
-            if cell.col_idx > 1:  # Center-align score columns
-                cell.alignment = Alignment(horizontal="center")
-            else:
-                cell.alignment = align_left()
-            if alt:
-                cell.fill = fill_alt()
-            if cell.col_idx in total_col_indices_to_bold:
-                cell.font = Font(bold=True)
+            # Shooter name left-aligned, score columns centered
+            cell.style = grid_style_name(
+                bold=cell.col_idx in total_col_indices_to_bold,
+                left=cell.col_idx == 1,
+                alt=alt,
+            )
 
     # Freeze panes for both aggregate and non-aggregate matches
     if is_aggregate:
@@ -2815,6 +3556,7 @@ async def get_match_report_excel(
     # Create detailed sheets for each shooter
     for shooter_id, shooter_data in shooters_data.items():
         shooter = shooter_data["shooter"]
+        score_index = score_indexes[shooter_id]
         ws_detail = wb.create_sheet(title=f"{shooter.name[:28]}")  # Limit sheet name length
         
         # Add shooter details
@@ -2838,18 +3580,9 @@ async def get_match_report_excel(
         apply_print_setup(ws_detail, landscape=False, fit_width=True)
         
         if is_aggregate:
-            total_possible_display_value = ""
-            agg_main_label_for_lookup = ""
-            
-            if match_obj.aggregate_type == AggregateType.TWENTY_SEVEN_HUNDRED:
-                total_possible_display_value = "2700"
-                agg_main_label_for_lookup = "2700"
-            elif match_obj.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_2X900:
-                total_possible_display_value = "1800"
-                agg_main_label_for_lookup = "1800"
-            elif match_obj.aggregate_type == AggregateType.EIGHTEEN_HUNDRED_3X600:
-                total_possible_display_value = "1800"
-                agg_main_label_for_lookup = "1800"
+            agg_spec = AGGREGATE_SPECS.get(match_obj.aggregate_type)
+            total_possible_display_value = agg_spec.label if agg_spec else ""
+            agg_main_label_for_lookup = total_possible_display_value
 
             # Display the main aggregate total for the shooter
             # Try to get this from the pre-calculated aggregates in shooter_data
@@ -2887,78 +3620,31 @@ async def get_match_report_excel(
                         has_data_for_caliber_component = False
 
                         # Sum scores for this caliber that are of the aggregate's base match type
-                        for score_key, score_item_detail in shooter_data["scores"].items():
-                            score_details_item = score_item_detail["score"]
-                            if score_details_item["caliber"] == caliber_str_detail:
-                                # Check if this score's match_type_instance is of the base_match_type_for_agg_detail
-                                is_part_of_aggregate_base_type = False
-                                for mt_cfg in match_obj.match_types:
-                                    if mt_cfg.instance_name == score_details_item["match_type_instance"] and \
-                                       mt_cfg.type == base_match_type_for_agg_detail:
-                                        is_part_of_aggregate_base_type = True
-                                        break
-                                
-                                if is_part_of_aggregate_base_type:
-                                    if not score_details_item.get("not_shot", False):
-                                        if score_details_item["total_score"] is not None:
-                                            caliber_component_total_score += score_details_item["total_score"]
-                                            has_data_for_caliber_component = True
-                                        if score_details_item["total_x_count"] is not None:
-                                            caliber_component_total_x += score_details_item["total_x_count"]
-                        
+                        for entry in score_index.values():
+                            if entry["caliber"] != caliber_str_detail or \
+                               entry["type"] != base_match_type_for_agg_detail or entry["not_shot"]:
+                                continue
+                            if entry["total_score"] is not None:
+                                caliber_component_total_score += entry["total_score"]
+                                has_data_for_caliber_component = True
+                            if entry["total_x_count"] is not None:
+                                caliber_component_total_x += entry["total_x_count"]
+
                         display_val = f"{caliber_component_total_score} ({caliber_component_total_x}X)" if has_data_for_caliber_component else "-"
                         ws_detail.append([f"{caliber_str_detail} {sub_total_points_label}", display_val])
-            
+
             ws_detail.append([])  # Blank row before detailed stage breakdown
         
         # For each match type and caliber, add detailed scores
         row_index = 9  # Starting row for score details
         
         for mt in match_obj.match_types:
-            match_config = None
-            for mt_config in report_data.get("match_config", {}).get("match_types", []):
-                if mt_config["instance_name"] == mt.instance_name:
-                    match_config = mt_config
-                    break
-            
-            if not match_config:
-                continue
-                
-            stages_config = get_stages_for_match_type(mt.type)
-            
             for caliber in mt.calibers:
-                # Try multiple key formats as in the summary
-                key_formats = [
-                    f"{mt.instance_name}_{caliber.value}", # Use caliber.value here
-                    f"{mt.instance_name}_CaliberType.{caliber.value.replace('.', '').upper()}" # And here
-                ]
-                
-                # Add special cases by comparing caliber.value
-                if caliber == CaliberType.TWENTYTWO: # Or caliber.value == ".22"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.TWENTYTWO")
-                elif caliber == CaliberType.CENTERFIRE: # Or caliber.value == "CF"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.CENTERFIRE")
-                elif caliber == CaliberType.FORTYFIVE: # Or caliber.value == ".45"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.FORTYFIVE")
-                elif caliber == CaliberType.SERVICEPISTOL: # Or caliber.value == "Service Pistol"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.SERVICEPISTOL")
-                    key_formats.append(f"{mt.instance_name}_CaliberType.NINESERVICE")
-                    key_formats.append(f"{mt.instance_name}_CaliberType.FORTYFIVESERVICE")
-                elif caliber == CaliberType.SERVICEREVOLVER: # Or caliber.value == "Service Revolver"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.SERVICEREVOLVER")
-                elif caliber == CaliberType.DR: # Or caliber.value == "DR"
-                    key_formats.append(f"{mt.instance_name}_CaliberType.DR")
-                
-                # Try to find a matching score
-                score_data = None
-                for key in key_formats:
-                    if key in shooter_data["scores"]:
-                        score_data = shooter_data["scores"][key]
-                        break
-                
-                if not score_data:
+                entry = score_index.get((mt.instance_name, caliber.value))
+                if not entry:
                     continue
-                
+                score_data = {"score": entry}
+
                 # Add header for this match type and caliber
                 ws_detail.append([f"{mt.instance_name} - {caliber.value}"]) # Use caliber.value for display
                 current_row = ws_detail.max_row  # Get the actual row that was just appended
@@ -3099,6 +3785,72 @@ async def get_match_report_excel(
     )
 
 
+@api_router.get("/match-report/{match_id}/export")
+async def export_match_results(
+    match_id: str,
+    export_format: str = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Long-format results: one row per (shooter, instance, caliber, stage).
+
+    format=csv|ndjson streams straight from the scores cursor in batches;
+    format=parquet is built in memory through pandas/pyarrow.
+    """
+    export_format = (export_format or "").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}",
+        )
+
+    match = await db.matches.find_one({"id": match_id})
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    match_ctx = match_context(match)
+    shooter_ids = await db.scores.distinct("shooter_id", {"match_id": match_id})
+    shooter_ctxs: Dict[str, Dict[str, Any]] = {}
+    async for doc in db.shooters.find({"id": {"$in": shooter_ids}}):
+        shooter_ctxs[doc["id"]] = shooter_context(doc)
+
+    def rows_for(score_doc: Dict[str, Any]):
+        return score_rows(match_ctx, shooter_ctxs.get(score_doc["shooter_id"]) or shooter_context(None), score_doc)
+
+    cursor = db.scores.find({"match_id": match_id}, SCORE_PROJECTION).sort(
+        [("shooter_id", 1), ("match_type_instance", 1), ("caliber", 1)]
+    )
+    safe_name = re.sub(r"[^\w\-]+", "_", match_ctx["match_name"] or "match")[:40]
+    filename = f"match_results_{safe_name}.{export_format}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Access-Control-Expose-Headers": "Content-Disposition",
+    }
+
+    if export_format == "parquet":
+        rows: List[Dict[str, Any]] = []
+        async for score_doc in cursor:
+            rows.extend(rows_for(score_doc))
+        return StreamingResponse(
+            io.BytesIO(parquet_bytes(rows)),
+            media_type=EXPORT_MEDIA_TYPES["parquet"],
+            headers=headers,
+        )
+
+    encode = csv_lines if export_format == "csv" else ndjson_lines
+
+    async def stream():
+        if export_format == "csv":
+            yield csv_header()
+        # One score card per chunk keeps memory flat regardless of match size
+        async for score_doc in cursor.batch_size(500):
+            yield encode(rows_for(score_doc))
+
+    return StreamingResponse(
+        stream(), media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers
+    )
+
+
 # Add shooter averages endpoint for ShooterDetail component
 @api_router.get("/shooter-averages/{shooter_id}")
 async def get_shooter_averages(
@@ -3109,16 +3861,32 @@ async def get_shooter_averages(
     if not shooter:
         raise HTTPException(status_code=404, detail="Shooter not found")
 
-    # Get all scores for this shooter
-    scores = await db.scores.find({"shooter_id": shooter_id}).to_list(1000)
-    score_objects = [Score(**score) for score in scores]
-    
-    # Use the core function to calculate averages
-    averages = calculate_shooter_averages_by_caliber(score_objects)
+    # Running sums from shooter_stats: a few documents, however long the history
+    stats = await db.shooter_stats.find({"shooter_id": shooter_id}, {"_id": 0}).to_list(None)
+    return {"caliber_averages": caliber_averages(stats)}
 
-    return {"caliber_averages": averages}
 
-@api_router.get("/shooter-report/{shooter_id}")
+@api_router.get("/shooter-trends/{shooter_id}")
+async def get_shooter_trends(
+    shooter_id: str,
+    window: int = Query(10, ge=1, le=TREND_BUFFER_SIZE),
+    months: int = Query(12, ge=1, le=120),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Last-N and last-months mean / std / best per caliber, with stage families."""
+    shooter = await db.shooters.find_one({"id": shooter_id}, {"_id": 0, "id": 1})
+    if not shooter:
+        raise HTTPException(status_code=404, detail="Shooter not found")
+
+    # One bounded buffer per caliber, kept in match-date order on score writes
+    trend_docs = await db.shooter_trends.find({"shooter_id": shooter_id}, {"_id": 0}).to_list(None)
+    return {
+        "window": window,
+        "months": months,
+        "calibers": shooter_trends(trend_docs, window=window, months=months),
+    }
+
+@api_router.get("/shooter-report/{shooter_id}", response_class=ORJSONReportResponse)
 async def get_shooter_report(
     shooter_id: str, current_user: User = Depends(get_current_active_user)
 ):
@@ -3132,15 +3900,19 @@ async def get_shooter_report(
 
     # Get all scores for this shooter
     scores = await db.scores.find({"shooter_id": shooter_id}).to_list(1000)
-    score_objs = [Score(**score) for score in scores]
+    score_objs = load_scores(scores)
 
-    # Get all matches the shooter participated in
-    match_ids = set(score.match_id for score in score_objs)
+    # Get all matches the shooter participated in (one query), with an
+    # instance_name -> MatchTypeInstance map built once per match
+    match_ids = list({score.match_id for score in score_objs})
     matches = {}
-    for match_id in match_ids:
-        match = await db.matches.find_one({"id": match_id})
-        if match:
-            matches[match_id] = Match(**match)
+    instances_by_match: Dict[str, Dict[str, MatchTypeInstance]] = {}
+    async for match in db.matches.find({"id": {"$in": match_ids}}):
+        match_obj = Match(**match)
+        matches[match_obj.id] = match_obj
+        instances_by_match[match_obj.id] = {
+            mt.instance_name: mt for mt in reversed(match_obj.match_types)
+        }
 
     # Build detailed report
     report = {
@@ -3152,137 +3924,48 @@ async def get_shooter_report(
     # Group scores by match
     for score in score_objs:
         match_id = score.match_id
-        if match_id in matches:
-            match = matches[match_id]
-            if match_id not in report["matches"]:
-                report["matches"][match_id] = {"match": match, "scores": []}
-
-            # Add score details
-            report["matches"][match_id]["scores"].append(
-                {
-                    "score": score,
-                    "match_type": next(
-                        (
-                            mt
-                            for mt in match.match_types
-                            if mt.instance_name == score.match_type_instance
-                        ),
-                        None,
-                    ),
-                }
-            )
-
-    # Calculate averages by match type and caliber
-    averages_by_type = {}
-    averages_by_caliber = {}
-
-    for score in score_objs:
-        match_id = score.match_id
-        if match_id in matches:
-            match = matches[match_id]
-            match_type = next(
-                (
-                    mt.type
-                    for mt in match.match_types
-                    if mt.instance_name == score.match_type_instance
-                ),
-                None,
-            )
-
-            if match_type:
-                # By match type and caliber
-                key = f"{match_type}_{score.caliber}"
-                if key not in averages_by_type:
-                    averages_by_type[key] = {
-                        "count": 0,
-                        "total_score": 0,
-                        "total_x_count": 0,
-                        "stages": {},
-                    }
-
-                # Skip NULL scores and scores marked as not_shot
-                if score.total_score is None or getattr(score, "not_shot", False):
-                    continue
-                    
-                avg_data = averages_by_type[key]
-                avg_data["count"] += 1
-                avg_data["total_score"] += score.total_score
-                avg_data["total_x_count"] += (score.total_x_count or 0)
-
-                # Track stage scores
-                for stage in score.stages:
-                    if stage.name not in avg_data["stages"]:
-                        avg_data["stages"][stage.name] = {
-                            "score_sum": 0,
-                            "x_count_sum": 0,
-                        }
-
-                    avg_data["stages"][stage.name]["score_sum"] += (stage.score if stage.score is not None else 0)
-                    avg_data["stages"][stage.name]["count"] = avg_data["stages"][stage.name].get("count", 0) + (1 if stage.score is not None else 0)
-                    avg_data["stages"][stage.name]["x_count_sum"] += (stage.x_count if stage.x_count is not None else 0)
-
-                # By caliber only
-                if score.caliber not in averages_by_caliber:
-                    averages_by_caliber[score.caliber] = {
-                        "count": 0,
-                        "total_score_sum": 0,
-                        "total_x_count_sum": 0,
-                        "match_types": {},
-                    }
+        if match_id not in matches:
+            continue
+        if match_id not in report["matches"]:
+            report["matches"][match_id] = {"match": matches[match_id], "scores": []}
+        report["matches"][match_id]["scores"].append(
+            {
+                "score": score,
+                "match_type": instances_by_match[match_id].get(score.match_type_instance),
+            }
+        )
 
-                cal_data = averages_by_caliber[score.caliber]
-                cal_data["count"] += 1
-                cal_data["total_score_sum"] += score.total_score
-                cal_data["total_x_count_sum"] += (score.total_x_count or 0)
-
-                # Track match type data
-                if match_type not in cal_data["match_types"]:
-                    cal_data["match_types"][match_type] = {
-                        "count": 0,
-                        "score_sum": 0,
-                        "x_count_sum": 0,
-                    }
+    # Averages by match type and caliber come from the running sums in shooter_stats
+    stats = await db.shooter_stats.find({"shooter_id": shooter_id}, {"_id": 0}).to_list(None)
+    report["averages"] = report_averages(stats)
 
-                cal_data["match_types"][match_type]["count"] += 1
-                cal_data["match_types"][match_type]["score_sum"] += score.total_score
-                cal_data["match_types"][match_type]["x_count_sum"] += (score.total_x_count or 0)
-
-    # Calculate final averages
-    for key, data in averages_by_type.items():
-        if data["count"] > 0:
-            valid_scores_count = sum(1 for stage_name, stage_data in data["stages"].items() if stage_data.get("count", 0) > 0)
-            if valid_scores_count > 0:
-                data["avg_score"] = round(data["total_score"] / data["count"], 2)
-                data["avg_x_count"] = round(data["total_x_count"] / data["count"], 2)
-
-                for stage_name, stage_data in data["stages"].items():
-                    stage_count = stage_data.get("count", 0)
-                    if stage_count > 0:
-                        stage_data["avg_score"] = round(
-                            stage_data["score_sum"] / stage_count, 2
-                        )
-                        stage_data["avg_x_count"] = round(
-                            stage_data["x_count_sum"] / stage_count, 2
-                        )
-
-    for caliber, data in averages_by_caliber.items():
-        if data["count"] > 0:
-            data["avg_score"] = round(data["total_score_sum"] / data["count"], 2)
-            data["avg_x_count"] = round(data["total_x_count_sum"] / data["count"], 2)
-
-            for match_type, mt_data in data["match_types"].items():
-                if mt_data["count"] > 0:
-                    mt_data["avg_score"] = round(
-                        mt_data["score_sum"] / mt_data["count"], 2
-                    )
-                    mt_data["avg_x_count"] = round(
-                        mt_data["x_count_sum"] / mt_data["count"], 2
-                    )
+    return trusted_response(report)
 
-    report["averages"]["by_match_type"] = averages_by_type
-    report["averages"]["by_caliber"] = averages_by_caliber
+@api_router.get("/analytics/averages", response_class=ORJSONReportResponse)
+async def get_club_averages(
+    caliber: Optional[CaliberType] = None,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Per-shooter, per-caliber card and stage-family averages for the whole club."""
+    query: Dict[str, Any] = {"not_shot": {"$ne": True}, "total_score": {"$ne": None}}
+    if caliber:
+        query["caliber"] = caliber.value
+    score_docs = [doc async for doc in db.scores.find(query, AVERAGES_PROJECTION)]
+
+    shooter_ids = list({doc["shooter_id"] for doc in score_docs})
+    shooter_names = {
+        doc["id"]: doc.get("name")
+        async for doc in db.shooters.find(
+            {"id": {"$in": shooter_ids}}, {"_id": 0, "id": 1, "name": 1}
+        )
+    }
+    return trusted_response(
+        {
+            "columns": list(AVERAGES_COLUMNS),
+            "rows": club_averages(score_docs, shooter_names),
+        }
+    )
 
-    return report
 
 @api_router.get("/")
 async def root():
@@ -3303,6 +3986,8 @@ else:
     # Minimal fallback for development when no ORIGINS env var is set
     allowed_origins = ["http://localhost:3000", "http://localhost:8080"]
 
+# Innermost: sets the revision ETag before compression tags it per encoding
+app.add_middleware(ETagMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -3311,6 +3996,10 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+# Outside CORS, so CORS headers are on the response before it is compressed
+app.add_middleware(CompressionMiddleware)
+# Outermost: times the whole request and counts bytes as sent
+app.add_middleware(MetricsMiddleware, route_app=app)
 
 async def create_first_admin():
     """Seed a default admin when the users collection is empty."""
@@ -3345,12 +4034,35 @@ async def create_first_admin():
         # Don't fail startup; log and continue so the API still serves
 
 
+# Imported on first use by the Excel / bulletin / classification handlers;
+# warmed on a worker thread once the app is serving so the first export does
+# not pay for them either
+DEFERRED_IMPORTS = ("openpyxl", "backend.excel_style", "backend.score_matrix", "numpy")
+
+
+def warm_deferred_imports() -> None:
+    for name in DEFERRED_IMPORTS:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Background import of {name} failed: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
     await create_first_admin()
+    await ensure_shooter_stats()
+    await ensure_shooter_trends()
+    await ensure_roster_indexes()
+    global _backfill_task
+    _backfill_task = asyncio.create_task(backfill_derived_collections())
+    asyncio.get_running_loop().run_in_executor(None, warm_deferred_imports)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if _backfill_task is not None:
+        # Left unmarked, so it runs again on the next start
+        _backfill_task.cancel()
     await close_mongo_connection()
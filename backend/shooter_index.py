@@ -0,0 +1,148 @@
+"""
+In-process shooter search index for typeahead.
+
+Pure functions — no DB I/O. Each shooter contributes casefolded tokens to
+three sorted lists: last name, first name, and the rest (other name parts,
+NRA number, competitor number). A query matches a shooter when every query
+token is a prefix of one of the shooter's tokens; the candidates come from
+a bisect range scan of the sorted lists, so a lookup touches only matching
+entries.
+
+Entries are (token, sort key, shooter id), so scanning a last-name range
+yields shooters already in "last, first" order. Results are last-name
+matches first, then first-name matches, then the rest, and scanning stops
+once `limit` results are found.
+
+The index lives in the API process and is maintained by the shooter create,
+update and delete handlers (see server.py).
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Mapping, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+_APOSTROPHES = str.maketrans("", "", "'’")
+
+_FIELDS = ("last", "first", "other")
+Entry = Tuple[str, str, str]  # (token, sort key, shooter id)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Casefolded word tokens; apostrophes dropped so O'Brien -> obrien."""
+    if text is None:
+        return []
+    return _TOKEN_RE.findall(str(text).casefold().translate(_APOSTROPHES))
+
+
+def _name_parts(name: str) -> Tuple[List[str], List[str], List[str]]:
+    """(last, first, other) tokens for "First Middle Last" or "Last, First Middle"."""
+    if "," in name:
+        last_part, _, given_part = name.partition(",")
+        last, given = tokenize(last_part), tokenize(given_part)
+    else:
+        tokens = tokenize(name)
+        last, given = tokens[-1:], tokens[:-1]
+    return last, given[:1], given[1:]
+
+
+def shooter_tokens(doc: Mapping[str, Any]) -> Tuple[Dict[str, List[str]], str]:
+    """Tokens per field, and the "last first other" sort key."""
+    last, first, other = _name_parts(doc.get("name") or "")
+    sort_key = " ".join(last + first + other)
+    other = other + tokenize(doc.get("nra_number"))
+    if doc.get("competitor_number") is not None:
+        other.append(str(doc["competitor_number"]))
+    return {"last": last, "first": first, "other": other}, sort_key
+
+
+class ShooterIndex:
+    """Prefix / token-prefix search over shooter names and numbers."""
+
+    def __init__(self) -> None:
+        self._lists: Dict[str, List[Entry]] = {field: [] for field in _FIELDS}
+        self._entries: Dict[str, List[Tuple[str, Entry]]] = {}
+        # "\0tok\0tok..." per shooter: a prefix test is one substring search
+        self._joined: Dict[str, str] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_documents(cls, docs) -> "ShooterIndex":
+        index = cls()
+        entries: Dict[str, List[Entry]] = {field: [] for field in _FIELDS}
+        for doc in docs:
+            for field, entry in index._register(doc):
+                entries[field].append(entry)
+        for field in _FIELDS:
+            entries[field].sort()
+        index._lists = entries
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _register(self, doc: Mapping[str, Any]) -> List[Tuple[str, Entry]]:
+        shooter_id = doc["id"]
+        fields, sort_key = shooter_tokens(doc)
+        entries = [
+            (field, (token, sort_key, shooter_id))
+            for field in _FIELDS
+            for token in dict.fromkeys(fields[field])
+        ]
+        self._entries[shooter_id] = entries
+        self._joined[shooter_id] = "".join("\0" + t for field in _FIELDS for t in fields[field])
+        self._docs[shooter_id] = dict(doc)
+        return entries
+
+    def remove(self, shooter_id: str) -> None:
+        for field, entry in self._entries.pop(shooter_id, ()):
+            entries = self._lists[field]
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+        self._joined.pop(shooter_id, None)
+        self._docs.pop(shooter_id, None)
+
+    def upsert(self, doc: Mapping[str, Any]) -> None:
+        """Add a shooter, or replace its entries after an update."""
+        self.remove(doc["id"])
+        for field, entry in self._register(doc):
+            insort(self._lists[field], entry)
+
+    def _prefix_range(self, field: str, prefix: str) -> Tuple[int, int]:
+        entries = self._lists[field]
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return bisect_left(entries, (prefix,)), bisect_left(entries, (upper,))
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Up to `limit` shooter documents matching every token of query."""
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens or limit <= 0:
+            return []
+        # Every match has a token starting with each query token, so scanning
+        # the narrowest query token's ranges finds all of them
+        ranges = {
+            q: [self._prefix_range(field, q) for field in _FIELDS] for q in query_tokens
+        }
+        driver = min(query_tokens, key=lambda q: sum(hi - lo for lo, hi in ranges[q]))
+        needles = ["\0" + q for q in query_tokens if q != driver]
+        joined = self._joined
+
+        found: Dict[str, None] = {}
+        for field, (lo, hi) in zip(_FIELDS, ranges[driver]):
+            for _, _, shooter_id in self._lists[field][lo:hi]:
+                if shooter_id in found:
+                    continue
+                tokens = joined[shooter_id]
+                for needle in needles:
+                    if needle not in tokens:
+                        break
+                else:
+                    found[shooter_id] = None
+                    if len(found) >= limit:
+                        break
+            if len(found) >= limit:
+                break
+        return [self._docs[sid] for sid in found]
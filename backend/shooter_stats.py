@@ -0,0 +1,241 @@
+"""
+Per-shooter running statistics (the shooter_stats collection).
+
+Pure functions — no DB I/O. One stats document per (shooter, caliber, match
+type) holds running counts and sums, including per-stage-name sums, so
+lifetime averages are a read of a handful of small documents instead of a
+scan of every score the shooter ever shot.
+
+Score writes turn into $inc deltas (card_delta); deletes apply the same
+delta negated. Stage families are derived from the per-stage sums on read,
+which also lets the shooter report keep its per-stage averages.
+
+Stats document shape:
+  shooter_id, caliber, match_type      key (match_type None if unknown)
+  entries                              cards recorded, including not shot
+  cards, score_sum, x_sum              cards with a total
+  named_nmc.{cards,score_sum,x_sum}    cards whose instance name contains NMC
+  stages.<name>.{count,score_sum,x_count_sum,scored_x_sum}
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .core import BasicMatchType, CaliberType
+
+StatsKey = Tuple[str, Any, Optional[str]]  # (shooter_id, caliber, match_type)
+
+# Numeric top-level counters; nested blocks are handled separately.
+_COUNTERS = ("entries", "cards", "score_sum", "x_sum")
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def stats_key(score_doc: Mapping[str, Any], match_type: Any) -> StatsKey:
+    return (
+        score_doc.get("shooter_id"),
+        _enum_value(score_doc.get("caliber")),
+        _enum_value(match_type),
+    )
+
+
+def key_filter(key: StatsKey) -> Dict[str, Any]:
+    shooter_id, caliber, match_type = key
+    return {"shooter_id": shooter_id, "caliber": caliber, "match_type": match_type}
+
+
+def _safe_stage_name(name: Any) -> bool:
+    # Stage names become document paths
+    return isinstance(name, str) and name != "" and "." not in name and not name.startswith("$")
+
+
+def card_delta(score_doc: Mapping[str, Any], sign: int = 1) -> Dict[str, int]:
+    """$inc paths for one score document (sign=-1 to remove it)."""
+    delta = {"entries": sign}
+    total = score_doc.get("total_score")
+    if total is None or score_doc.get("not_shot"):
+        return delta
+
+    total_x = score_doc.get("total_x_count") or 0
+    delta["cards"] = sign
+    delta["score_sum"] = sign * total
+    delta["x_sum"] = sign * total_x
+    if "NMC" in (score_doc.get("match_type_instance") or ""):
+        delta["named_nmc.cards"] = sign
+        delta["named_nmc.score_sum"] = sign * total
+        delta["named_nmc.x_sum"] = sign * total_x
+    for stage in score_doc.get("stages") or []:
+        name = stage.get("name")
+        if not _safe_stage_name(name):
+            continue
+        score = stage.get("score")
+        prefix = f"stages.{name}"
+        delta[f"{prefix}.count"] = delta.get(f"{prefix}.count", 0) + (sign if score is not None else 0)
+        delta[f"{prefix}.score_sum"] = delta.get(f"{prefix}.score_sum", 0) + sign * (score or 0)
+        x_count = stage.get("x_count") or 0
+        delta[f"{prefix}.x_count_sum"] = delta.get(f"{prefix}.x_count_sum", 0) + sign * x_count
+        # X on scored stages only, for the caliber averages
+        delta[f"{prefix}.scored_x_sum"] = delta.get(f"{prefix}.scored_x_sum", 0) + (
+            sign * x_count if score is not None else 0
+        )
+    return delta
+
+
+def accumulate(
+    score_docs: Iterable[Mapping[str, Any]],
+    match_type_for: Callable[[Mapping[str, Any]], Any],
+    sign: int = 1,
+) -> Dict[StatsKey, Dict[str, int]]:
+    """Merge card deltas per stats key, so a batch is one update per key."""
+    merged: Dict[StatsKey, Dict[str, int]] = {}
+    for doc in score_docs:
+        bucket = merged.setdefault(stats_key(doc, match_type_for(doc)), {})
+        for path, value in card_delta(doc, sign).items():
+            bucket[path] = bucket.get(path, 0) + value
+    return merged
+
+
+def flatten(stats_doc: Mapping[str, Any]) -> Dict[str, int]:
+    """Stats document -> {path: value} in card_delta form (zeros dropped)."""
+    flat = {c: stats_doc.get(c, 0) for c in _COUNTERS}
+    for field, value in (stats_doc.get("named_nmc") or {}).items():
+        flat[f"named_nmc.{field}"] = value
+    for name, fields in (stats_doc.get("stages") or {}).items():
+        for field, value in fields.items():
+            flat[f"stages.{name}.{field}"] = value
+    return {path: value for path, value in flat.items() if value}
+
+
+def _caliber_key(caliber: Any) -> Any:
+    try:
+        return CaliberType(caliber)
+    except ValueError:
+        return caliber
+
+
+def _match_type_key(match_type: Any) -> Any:
+    try:
+        return BasicMatchType(match_type)
+    except ValueError:
+        return match_type
+
+
+def _avg(total: float, count: int) -> Optional[float]:
+    return round(total / count, 2) if count > 0 else None
+
+
+def caliber_averages(stats_docs: Iterable[Mapping[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+    """
+    Shooter averages by caliber, in the calculate_shooter_averages_by_caliber
+    shape. SF/TF/RF classify stage names by substring as that function does.
+    """
+    by_caliber: Dict[Any, Dict[str, float]] = {}
+    for doc in stats_docs:
+        if not doc.get("cards"):
+            continue
+        data = by_caliber.setdefault(_caliber_key(doc.get("caliber")), {})
+        data["cards"] = data.get("cards", 0) + doc["cards"]
+        data["score"] = data.get("score", 0) + doc.get("score_sum", 0)
+        data["x"] = data.get("x", 0) + doc.get("x_sum", 0)
+        nmc = doc.get("named_nmc") or {}
+        for field in ("cards", "score_sum", "x_sum"):
+            data[f"nmc_{field}"] = data.get(f"nmc_{field}", 0) + nmc.get(field, 0)
+        for name, stage in (doc.get("stages") or {}).items():
+            family = "sf" if "SF" in name else "tf" if "TF" in name else "rf" if "RF" in name else None
+            if family is None:
+                continue
+            for field in ("count", "score_sum", "scored_x_sum"):
+                data[f"{family}_{field}"] = data.get(f"{family}_{field}", 0) + stage.get(field, 0)
+
+    averages = {}
+    for caliber, data in by_caliber.items():
+        cards = data["cards"]
+        row: Dict[str, Any] = {"matches_count": cards, "valid_matches_count": cards}
+        for family in ("sf", "tf", "rf"):
+            count = data.get(f"{family}_count", 0)
+            row[f"{family}_score_avg"] = _avg(data.get(f"{family}_score_sum", 0), count)
+            row[f"{family}_x_count_avg"] = _avg(data.get(f"{family}_scored_x_sum", 0), count)
+        row["nmc_score_avg"] = _avg(data["nmc_score_sum"], data["nmc_cards"])
+        row["nmc_x_count_avg"] = _avg(data["nmc_x_sum"], data["nmc_cards"])
+        row["total_score_avg"] = round(data["score"] / cards, 2)
+        row["total_x_count_avg"] = round(data["x"] / cards, 2)
+        averages[caliber] = row
+    return averages
+
+
+def report_averages(stats_docs: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[Any, Any]]:
+    """The shooter report's {"by_match_type", "by_caliber"} averages block."""
+    by_match_type: Dict[str, Dict[str, Any]] = {}
+    by_caliber: Dict[Any, Dict[str, Any]] = {}
+    for doc in stats_docs:
+        if doc.get("match_type") is None or not doc.get("entries"):
+            continue
+        match_type = _match_type_key(doc["match_type"])
+        caliber = _caliber_key(doc.get("caliber"))
+        cards = doc.get("cards", 0)
+
+        data = by_match_type.setdefault(
+            f"{match_type}_{caliber}",
+            {"count": 0, "total_score": 0, "total_x_count": 0, "stages": {}},
+        )
+        data["count"] += cards
+        data["total_score"] += doc.get("score_sum", 0)
+        data["total_x_count"] += doc.get("x_sum", 0)
+        for name, stage in (doc.get("stages") or {}).items():
+            entry = data["stages"].setdefault(
+                name, {"score_sum": 0, "x_count_sum": 0, "count": 0}
+            )
+            for field in ("score_sum", "x_count_sum", "count"):
+                entry[field] += stage.get(field, 0)
+
+        if not cards:
+            continue
+        cal_data = by_caliber.setdefault(
+            caliber,
+            {"count": 0, "total_score_sum": 0, "total_x_count_sum": 0, "match_types": {}},
+        )
+        cal_data["count"] += cards
+        cal_data["total_score_sum"] += doc.get("score_sum", 0)
+        cal_data["total_x_count_sum"] += doc.get("x_sum", 0)
+        mt_data = cal_data["match_types"].setdefault(
+            match_type, {"count": 0, "score_sum": 0, "x_count_sum": 0}
+        )
+        mt_data["count"] += cards
+        mt_data["score_sum"] += doc.get("score_sum", 0)
+        mt_data["x_count_sum"] += doc.get("x_sum", 0)
+
+    for data in by_match_type.values():
+        if data["count"] > 0 and any(s["count"] > 0 for s in data["stages"].values()):
+            data["avg_score"] = round(data["total_score"] / data["count"], 2)
+            data["avg_x_count"] = round(data["total_x_count"] / data["count"], 2)
+            for stage in data["stages"].values():
+                if stage["count"] > 0:
+                    stage["avg_score"] = round(stage["score_sum"] / stage["count"], 2)
+                    stage["avg_x_count"] = round(stage["x_count_sum"] / stage["count"], 2)
+
+    for cal_data in by_caliber.values():
+        cal_data["avg_score"] = round(cal_data["total_score_sum"] / cal_data["count"], 2)
+        cal_data["avg_x_count"] = round(cal_data["total_x_count_sum"] / cal_data["count"], 2)
+        for mt_data in cal_data["match_types"].values():
+            mt_data["avg_score"] = round(mt_data["score_sum"] / mt_data["count"], 2)
+            mt_data["avg_x_count"] = round(mt_data["x_count_sum"] / mt_data["count"], 2)
+
+    return {"by_match_type": by_match_type, "by_caliber": by_caliber}
+
+
+def diff_stats(
+    stored: Iterable[Mapping[str, Any]], expected: Mapping[StatsKey, Mapping[str, int]]
+) -> List[StatsKey]:
+    """Keys whose stored counters differ from a fresh accumulate() (for rebuild checks)."""
+    have = {
+        (d.get("shooter_id"), d.get("caliber"), d.get("match_type")): flatten(d) for d in stored
+    }
+    want = {key: {p: v for p, v in delta.items() if v} for key, delta in expected.items()}
+    keys = set(have) | set(want)
+    return sorted(
+        (k for k in keys if have.get(k, {}) != want.get(k, {})),
+        key=lambda k: tuple("" if part is None else str(part) for part in k),
+    )
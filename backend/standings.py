@@ -0,0 +1,150 @@
+"""
+League season standings: best N of M match totals per caliber.
+
+Pure functions — no DB I/O. LeagueStandings holds, for one league at one
+revision, every shot card keyed by score id plus running (shooter, caliber,
+match) totals. Score writes are applied to it in place (apply_score /
+remove_score); because cards are keyed by score id, applying the same write
+twice is harmless, which lets the server keep a cached state current without
+rebuilding it from the scores collection.
+
+A shooter's match total in a caliber is the sum of their cards of that
+caliber in that match. Standings rank the sum of each shooter's best N match
+totals (all matches when N is None), ties broken on X count; shooters still
+tied share a place.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .core import STANDARD_CALIBER_ORDER_MAP, CaliberType
+
+# Score fields the standings read; use as the Mongo projection.
+STANDINGS_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "shooter_id": 1,
+    "match_id": 1,
+    "caliber": 1,
+    "total_score": 1,
+    "total_x_count": 1,
+    "not_shot": 1,
+}
+
+Card = Tuple[str, Any, str, int, int]  # (shooter_id, caliber, match_id, score, x)
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def _caliber_rank(caliber: Any) -> int:
+    try:
+        return STANDARD_CALIBER_ORDER_MAP.get(CaliberType(caliber), 99)
+    except ValueError:
+        return 99
+
+
+def _card(score_doc: Mapping[str, Any]) -> Optional[Card]:
+    total = score_doc.get("total_score")
+    if total is None or score_doc.get("not_shot"):
+        return None
+    return (
+        score_doc.get("shooter_id"),
+        _enum_value(score_doc.get("caliber")),
+        score_doc.get("match_id"),
+        int(total),
+        int(score_doc.get("total_x_count") or 0),
+    )
+
+
+class LeagueStandings:
+    """Running per-match totals for one league, valid at `revision`."""
+
+    def __init__(self, revision: int, match_ids: Iterable[str]):
+        self.revision = revision
+        self.match_ids: Set[str] = set(match_ids)
+        self._cards: Dict[str, Card] = {}
+        # (shooter_id, caliber) -> match_id -> [score, x, cards]
+        self._totals: Dict[Tuple[str, Any], Dict[str, List[int]]] = {}
+        self._ranked: Dict[Tuple[Optional[int], Optional[frozenset]], Dict[str, Any]] = {}
+
+    @classmethod
+    def from_documents(
+        cls, score_docs: Iterable[Mapping[str, Any]], revision: int, match_ids: Iterable[str]
+    ) -> "LeagueStandings":
+        state = cls(revision, match_ids)
+        for doc in score_docs:
+            state.apply_score(doc)
+        return state
+
+    def _add(self, card: Card, sign: int) -> None:
+        shooter_id, caliber, match_id, score, x = card
+        by_match = self._totals.setdefault((shooter_id, caliber), {})
+        entry = by_match.setdefault(match_id, [0, 0, 0])
+        entry[0] += sign * score
+        entry[1] += sign * x
+        entry[2] += sign
+        if entry[2] <= 0:
+            del by_match[match_id]
+            if not by_match:
+                del self._totals[(shooter_id, caliber)]
+
+    def remove_score(self, score_id: str) -> None:
+        card = self._cards.pop(score_id, None)
+        if card is not None:
+            self._add(card, -1)
+            self._ranked.clear()
+
+    def apply_score(self, score_doc: Mapping[str, Any]) -> None:
+        """Insert or replace one score (a not-shot card just removes it)."""
+        score_id = score_doc.get("id")
+        self.remove_score(score_id)
+        if score_doc.get("match_id") not in self.match_ids:
+            return
+        card = _card(score_doc)
+        if card is None:
+            return
+        self._cards[score_id] = card
+        self._add(card, 1)
+        self._ranked.clear()
+
+    def rank(self, best: Optional[int] = None, members: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Standings per caliber (standard caliber order); members limits who is ranked."""
+        key = (best, frozenset(members) if members is not None else None)
+        if key in self._ranked:
+            return self._ranked[key]
+
+        by_caliber: Dict[Any, List[Dict[str, Any]]] = {}
+        for (shooter_id, caliber), by_match in self._totals.items():
+            if members is not None and shooter_id not in members:
+                continue
+            ordered = sorted(by_match.items(), key=lambda kv: (kv[1][0], kv[1][1]), reverse=True)
+            counted = ordered[:best] if best else ordered
+            by_caliber.setdefault(caliber, []).append(
+                {
+                    "shooter_id": shooter_id,
+                    "total": sum(t[0] for _, t in counted),
+                    "x_count": sum(t[1] for _, t in counted),
+                    "matches_shot": len(ordered),
+                    "matches_counted": len(counted),
+                    "match_totals": [
+                        {"match_id": match_id, "score": t[0], "x_count": t[1], "counted": i < len(counted)}
+                        for i, (match_id, t) in enumerate(ordered)
+                    ],
+                }
+            )
+
+        result = {}
+        for caliber in sorted(by_caliber, key=lambda c: (_caliber_rank(c), str(c))):
+            rows = sorted(by_caliber[caliber], key=lambda r: (-r["total"], -r["x_count"], r["shooter_id"]))
+            for i, row in enumerate(rows):
+                prev = rows[i - 1] if i else None
+                if prev and (prev["total"], prev["x_count"]) == (row["total"], row["x_count"]):
+                    row["rank"] = prev["rank"]
+                else:
+                    row["rank"] = i + 1
+            result[caliber] = rows
+        self._ranked[key] = result
+        return result
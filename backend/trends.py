@@ -0,0 +1,146 @@
+"""
+Rolling-window performance trends per shooter and caliber.
+
+Pure functions — no DB I/O. Each (shooter, caliber) keeps a date-ordered
+buffer of its most recent TREND_BUFFER_SIZE shot cards (the shooter_trends
+collection, maintained with $push/$sort/$slice), so last-N and
+last-12-months summaries read one bounded document instead of the
+shooter's whole history.
+
+Stage families are classified by exact stage name, as in the bulletin: a
+card's SF value is the sum of its SF/SF1/SF2 stages, NMC is the 900 mid-block.
+"""
+
+from __future__ import annotations
+
+import statistics
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .bulletin import NMC_BLOCK_STAGES, RAPID_STAGES, SLOW_STAGES, TIMED_STAGES, sum_stages
+
+TREND_BUFFER_SIZE = 50
+
+# Score fields trend_entry reads; use as the Mongo projection.
+TREND_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "shooter_id": 1,
+    "match_id": 1,
+    "caliber": 1,
+    "stages": 1,
+    "total_score": 1,
+    "total_x_count": 1,
+    "not_shot": 1,
+}
+
+TREND_FAMILIES = {
+    "SF": SLOW_STAGES,
+    "TF": TIMED_STAGES,
+    "RF": RAPID_STAGES,
+    "NMC": NMC_BLOCK_STAGES,
+}
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def trend_entry(score_doc: Mapping[str, Any], match_date: Optional[datetime]) -> Optional[Dict[str, Any]]:
+    """Buffer entry for one score, or None if the card was not shot."""
+    total = score_doc.get("total_score")
+    if total is None or score_doc.get("not_shot") or match_date is None:
+        return None
+    stages = score_doc.get("stages") or []
+    families = {}
+    for family, names in TREND_FAMILIES.items():
+        score, _ = sum_stages(stages, names)
+        if score is not None:
+            families[family] = score
+    return {
+        "score_id": score_doc.get("id"),
+        "match_id": score_doc.get("match_id"),
+        "date": match_date,
+        "total": int(total),
+        "x": int(score_doc.get("total_x_count") or 0),
+        "stages": families,
+    }
+
+
+def trend_key(score_doc: Mapping[str, Any]) -> Dict[str, Any]:
+    return {"shooter_id": score_doc.get("shooter_id"), "caliber": _enum_value(score_doc.get("caliber"))}
+
+
+def latest_entries(entries: Iterable[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+    """Date-ordered, capped buffer contents (what $push/$sort/$slice keeps)."""
+    ordered = sorted(entries, key=lambda e: (e["date"], e.get("score_id") or ""))
+    return ordered[-TREND_BUFFER_SIZE:]
+
+
+def build_trend_docs(
+    score_docs: Iterable[Mapping[str, Any]], match_dates: Mapping[str, datetime]
+) -> List[Dict[str, Any]]:
+    """Full shooter_trends documents from a shooter's (or everyone's) scores."""
+    buffers: Dict[tuple, List[Dict[str, Any]]] = {}
+    for doc in score_docs:
+        entry = trend_entry(doc, match_dates.get(doc.get("match_id")))
+        if entry is None:
+            continue
+        key = trend_key(doc)
+        buffers.setdefault((key["shooter_id"], key["caliber"]), []).append(entry)
+    return [
+        {"shooter_id": shooter_id, "caliber": caliber, "recent": latest_entries(entries)}
+        for (shooter_id, caliber), entries in buffers.items()
+    ]
+
+
+def _summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0, "mean": None, "std": None, "best": None}
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 2),
+        "std": round(statistics.stdev(values), 2) if len(values) > 1 else None,
+        "best": max(values),
+    }
+
+
+def window_summary(entries: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Mean / std / best of totals, X and each stage family over a window."""
+    summary = _summary([e["total"] for e in entries])
+    summary["x_mean"] = round(statistics.fmean(e["x"] for e in entries), 2) if entries else None
+    summary["stages"] = {
+        family: _summary([e["stages"][family] for e in entries if family in e["stages"]])
+        for family in TREND_FAMILIES
+    }
+    return summary
+
+
+def shooter_trends(
+    trend_docs: Iterable[Mapping[str, Any]],
+    *,
+    window: int = 10,
+    months: int = 12,
+    now: Optional[datetime] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-caliber trends: last `window` cards and cards in the last `months`
+    months (approximated as 30-day months), plus the buffered series.
+    The months window only sees buffered cards.
+    """
+    now = now or datetime.utcnow()
+    since = now - timedelta(days=30 * months)
+    out = {}
+    for doc in trend_docs:
+        entries = doc.get("recent") or []
+        if not entries:
+            continue
+        out[_enum_value(doc.get("caliber"))] = {
+            "last_n": window_summary(entries[-window:]),
+            "last_months": window_summary([e for e in entries if e["date"] >= since]),
+            "series": [
+                {"date": e["date"], "match_id": e.get("match_id"), "total": e["total"], "x": e["x"]}
+                for e in entries
+            ],
+        }
+    return out
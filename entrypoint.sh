@@ -75,6 +75,39 @@ for i in range(max_retries):
 " || return 0
 }
 
+# Poll until uvicorn answers (any HTTP status, e.g. 401, means it is up),
+# giving up early if it exits, or after BACKEND_START_TIMEOUT seconds (default 60)
+wait_for_backend() {
+  python3 -c "
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+pid = int('$BACKEND_PID')
+timeout = float('${BACKEND_START_TIMEOUT:-60}')
+deadline = time.monotonic() + timeout
+
+while time.monotonic() < deadline:
+    try:
+        urllib.request.urlopen('http://localhost:8001/api/auth/me', timeout=2)
+        sys.exit(0)
+    except urllib.error.HTTPError:
+        sys.exit(0)
+    except Exception:
+        pass
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        print('Backend exited before answering')
+        sys.exit(1)
+    time.sleep(0.5)
+print(f'Backend did not answer within {timeout:.0f} seconds')
+sys.exit(1)
+"
+}
+
 # Wait for MongoDB to be ready
 check_mongodb
 
@@ -87,7 +120,7 @@ uvicorn backend.server:app --host 0.0.0.0 --port 8001 &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."
-sleep 10
+wait_for_backend || exit 1
 
 # Wait for admin user to be created
 check_admin_user
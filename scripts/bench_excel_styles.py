@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-cell style objects vs shared NamedStyles in Excel exports.
+
+Builds a large bulletin-style sheet twice — once allocating a fresh
+Font / PatternFill / Alignment per cell (the old excel_style behavior) and
+once through backend.excel_style.style_data_row (named styles) — and reports
+styling + save time and peak traced memory for each.
+
+Usage:
+  PYTHONPATH=. python3 scripts/bench_excel_styles.py [rows] [cols]
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import time
+import tracemalloc
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from backend import excel_style
+
+
+def _legacy_style_data_row(ws, row: int, max_col: int, *, alt: bool, highlight: bool) -> None:
+    """Pre-registry behavior: new style objects for every cell."""
+    for col in range(1, max_col + 1):
+        cell = ws.cell(row=row, column=col)
+        cell.font = Font(name="Calibri", bold=highlight, size=10)
+        cell.border = excel_style.THIN
+        cell.alignment = (
+            Alignment(horizontal="center", vertical="center", wrap_text=False)
+            if col != 3
+            else Alignment(horizontal="left", vertical="center", wrap_text=False)
+        )
+        if highlight:
+            cell.fill = PatternFill(
+                start_color=excel_style.GOLD, end_color=excel_style.GOLD, fill_type="solid"
+            )
+        elif alt:
+            cell.fill = PatternFill(
+                start_color=excel_style.ALT_ROW,
+                end_color=excel_style.ALT_ROW,
+                fill_type="solid",
+            )
+
+
+def _build(rows: int, cols: int, styler) -> Workbook:
+    wb = Workbook()
+    ws = wb.active
+    for r in range(1, rows + 1):
+        ws.append([r, r * 7, f"Shooter {r}"] + [f"{880 + r % 20} ({r % 40}X)"] * (cols - 3))
+        styler(ws, r, cols, alt=r % 2 == 1, highlight=r <= 3)
+    return wb
+
+
+def _run(label: str, rows: int, cols: int, styler) -> None:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    wb = _build(rows, cols, styler)
+    t1 = time.perf_counter()
+    buf = io.BytesIO()
+    wb.save(buf)
+    t2 = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<8} style {t1 - t0:6.2f}s  save {t2 - t1:6.2f}s  "
+        f"total {t2 - t0:6.2f}s  peak {peak / 1e6:7.1f} MB  size {len(buf.getvalue()) / 1e3:7.0f} KB"
+    )
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"{rows} rows x {cols} columns")
+    _run("legacy", rows, cols, _legacy_style_data_row)
+    _run("named", rows, cols, excel_style.style_data_row)
+
+
+if __name__ == "__main__":
+    main()
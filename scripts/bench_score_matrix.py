@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: match report score dicts vs MatchScoreMatrix.
+
+Builds synthetic 900 scorecards for a match, then measures peak traced memory
+and time for (a) Score models + the nested per-stage report dicts that
+get_match_report builds, and (b) backend.score_matrix.MatchScoreMatrix plus
+a vectorized slow-fire sum over every card.
+
+Usage:
+  PYTHONPATH=. python3 scripts/bench_score_matrix.py [shooters] [cards]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+
+from backend.core import Score
+from backend.bulletin import SLOW_STAGES
+from backend.score_matrix import MatchScoreMatrix
+
+NINE = ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"]
+
+
+def _docs(shooters: int, cards: int):
+    for s in range(shooters):
+        for c in range(cards):
+            stages = [{"name": n, "score": 90 + (s + c + i) % 10, "x_count": i % 4} for i, n in enumerate(NINE)]
+            yield {
+                "id": f"{s}-{c}",
+                "match_id": "m",
+                "shooter_id": f"s{s}",
+                "match_type_instance": f"900_{c}",
+                "caliber": ".22",
+                "stages": stages,
+                "total_score": sum(st["score"] for st in stages),
+                "total_x_count": sum(st["x_count"] for st in stages),
+            }
+
+
+def _dicts(docs):
+    report = {}
+    for doc in docs:
+        score = Score(**doc)
+        report.setdefault(score.shooter_id, {})[f"{score.match_type_instance}_{score.caliber}"] = {
+            "score": {
+                "id": score.id,
+                "total_score": score.total_score,
+                "total_x_count": score.total_x_count,
+                "stages": [{"name": st.name, "score": st.score, "x_count": st.x_count} for st in score.stages],
+            }
+        }
+    slow = {
+        sid: {k: sum(st["score"] for st in v["score"]["stages"] if st["name"] in SLOW_STAGES) for k, v in cards.items()}
+        for sid, cards in report.items()
+    }
+    return report, slow
+
+
+def _matrix(docs):
+    matrix = MatchScoreMatrix.from_documents(docs)
+    return matrix, matrix.stage_sums(SLOW_STAGES)
+
+
+def _run(label: str, docs, builder) -> None:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    kept = builder(docs)
+    t1 = time.perf_counter()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    print(f"{label:<7} build+sum {t1 - t0:6.3f}s  retained {current / 1e6:7.2f} MB")
+
+
+def main() -> None:
+    shooters = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    docs = list(_docs(shooters, cards))
+    print(f"{shooters} shooters x {cards} cards ({len(docs)} scores)")
+    _run("dicts", docs, _dicts)
+    _run("matrix", docs, _matrix)
+
+
+if __name__ == "__main__":
+    main()
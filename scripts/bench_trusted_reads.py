@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-document Score(**doc) vs batch TypeAdapter reads.
+
+Builds a synthetic 5,000-score match (900 cards, Mongo-shaped documents
+including _id and created_at) and reports best-of-N per-document cost for:
+  per-doc    Score(**doc) in a loop (the old read path)
+  batch      backend.server.load_scores (one TypeAdapter call)
+  construct  Score.model_construct with nested ScoreStage.model_construct
+
+Usage:
+  PYTHONPATH=. python3 scripts/bench_trusted_reads.py [scores] [repeat]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+
+from backend.server import Score, ScoreStage, load_scores  # noqa: E402
+
+NINE = ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"]
+
+
+def _docs(n: int):
+    return [
+        {
+            "_id": uuid.uuid4().hex[:24],
+            "id": str(uuid.uuid4()),
+            "shooter_id": f"s{i % 300}",
+            "match_id": "m",
+            "caliber": ".22",
+            "match_type_instance": f"900_{i % 17}",
+            "stages": [{"name": name, "score": 95, "x_count": 2} for name in NINE],
+            "total_score": 855,
+            "total_x_count": 18,
+            "not_shot": False,
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(n)
+    ]
+
+
+def _construct(doc):
+    doc = dict(doc)
+    doc.pop("_id", None)
+    doc["stages"] = [ScoreStage.model_construct(**st) for st in doc["stages"]]
+    return Score.model_construct(**doc)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    docs = _docs(n)
+    print(f"{n} score documents, best of {repeat}")
+    for label, fn in (
+        ("per-doc", lambda: [Score(**doc) for doc in docs]),
+        ("batch", lambda: load_scores(docs)),
+        ("construct", lambda: [_construct(doc) for doc in docs]),
+    ):
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        print(f"{label:<10} {best * 1e3:8.1f} ms  {best / n * 1e6:6.2f} us/doc")
+
+
+if __name__ == "__main__":
+    main()
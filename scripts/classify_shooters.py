@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Report NRA rating changes the score history supports.
+
+Calls the admin-only GET /admin/classifications endpoint, which computes
+every shooter's average percentage of possible over qualifying cards and
+maps it to rating bands. Nothing is written; ratings stay hand-entered.
+
+Usage:
+  BASE_URL=http://127.0.0.1:8001/api python3 scripts/classify_shooters.py
+  MIN_CARDS=5 BASE_URL=... python3 scripts/classify_shooters.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:8080/api").rstrip("/")
+EMAIL = os.environ.get("ADMIN_EMAIL", "admin@example.com")
+PASSWORD = os.environ.get("ADMIN_PASSWORD", "admin123")
+MIN_CARDS = os.environ.get("MIN_CARDS") or None
+
+
+def main() -> int:
+    r = requests.post(
+        f"{BASE_URL}/auth/token",
+        data={"username": EMAIL, "password": PASSWORD},
+        timeout=60,
+    )
+    r.raise_for_status()
+    token = r.json()["access_token"]
+
+    r = requests.get(
+        f"{BASE_URL}/admin/classifications",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"min_cards": MIN_CARDS} if MIN_CARDS else None,
+        timeout=600,
+    )
+    if r.status_code >= 400:
+        raise RuntimeError(f"classifications → {r.status_code}: {r.text[:600]}")
+    report = r.json()
+    print(
+        f"✓ Classified {len(report['shooters'])} shooter(s) "
+        f"(min {report['min_cards']} cards); {len(report['changes'])} proposed change(s)"
+    )
+    for change in report["changes"]:
+        print(
+            f"  {change['direction']:>4}  {change['shooter_name']}: "
+            f"{change['current_rating'] or '-'} → {change['proposed_rating']} "
+            f"({change['percent']}% over {change['cards']} cards)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Recompute the shooter_stats and shooter_trends collections from scores and
+report drift.
+
+Calls the admin-only POST /admin/shooter-stats/rebuild endpoint, which
+recomputes running sums from every score, compares them with what the
+incremental updates had stored, and replaces them. Trend buffers are
+rebuilt alongside.
+
+Usage:
+  BASE_URL=http://127.0.0.1:8001/api python3 scripts/rebuild_shooter_stats.py
+  SHOOTER_ID=<id> BASE_URL=... python3 scripts/rebuild_shooter_stats.py
+
+Exits non-zero when any stats document had drifted.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:8080/api").rstrip("/")
+EMAIL = os.environ.get("ADMIN_EMAIL", "admin@example.com")
+PASSWORD = os.environ.get("ADMIN_PASSWORD", "admin123")
+SHOOTER_ID = os.environ.get("SHOOTER_ID") or None
+
+
+def main() -> int:
+    r = requests.post(
+        f"{BASE_URL}/auth/token",
+        data={"username": EMAIL, "password": PASSWORD},
+        timeout=60,
+    )
+    r.raise_for_status()
+    token = r.json()["access_token"]
+
+    r = requests.post(
+        f"{BASE_URL}/admin/shooter-stats/rebuild",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"shooter_id": SHOOTER_ID} if SHOOTER_ID else None,
+        timeout=600,
+    )
+    if r.status_code >= 400:
+        raise RuntimeError(f"rebuild → {r.status_code}: {r.text[:600]}")
+    result = r.json()
+    print(
+        f"✓ Rebuilt {result['stats_documents']} stats document(s) "
+        f"from {result['scores']} score(s); {result['mismatched']} had drifted"
+    )
+    print(f"✓ Rebuilt {result['trend_documents']} trend buffer(s)")
+    for key in result["mismatched_keys"]:
+        print(f"  drift: shooter={key[0]} caliber={key[1]} match_type={key[2]}")
+    return 1 if result["mismatched"] else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -24,7 +24,8 @@ os.environ.setdefault("SECRET_KEY", "test-secret-key-not-for-prod")
 os.environ.setdefault("ORIGINS", "http://localhost:3000")
 
 from backend.server import app  # noqa: E402
-from backend.database import client  # noqa: E402
+from backend import server  # noqa: E402
+from backend.database import client, db  # noqa: E402
 
 
 @pytest.fixture(scope="module")
@@ -287,6 +288,58 @@ def test_full_match_score_report_lifecycle(api: TestClient, auth_headers):
     assert avgs.status_code == 200, avgs.text
 
 
+def test_columnar_match_export(api: TestClient, auth_headers):
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Export Shooter"}
+    ).json()
+    match = api.post(
+        "/api/matches",
+        headers=auth_headers,
+        json={
+            "name": "Export Match",
+            "date": datetime(2026, 7, 7).isoformat(),
+            "location": "Club",
+            "match_types": [
+                {"type": "NMC", "instance_name": "NMC1", "calibers": [".22", "CF"]}
+            ],
+            "aggregate_type": "None",
+        },
+    ).json()
+    for caliber in (".22", "CF"):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match["id"],
+                "caliber": caliber,
+                "match_type_instance": "NMC1",
+                "stages": [
+                    {"name": n, "score": 95, "x_count": 2} for n in ("SF", "TF", "RF")
+                ],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    url = f"/api/match-report/{match['id']}/export"
+    csv_resp = api.get(url, headers=auth_headers, params={"format": "csv"})
+    assert csv_resp.status_code == 200, csv_resp.text
+    lines = csv_resp.text.strip().splitlines()
+    assert lines[0].startswith("match_id,match_name")
+    assert len(lines) == 1 + 2 * 3  # header + 2 cards x 3 stages
+
+    nd = api.get(url, headers=auth_headers, params={"format": "ndjson"})
+    assert nd.status_code == 200
+    assert len(nd.text.strip().splitlines()) == 6
+
+    pq = api.get(url, headers=auth_headers, params={"format": "parquet"})
+    assert pq.status_code == 200
+    assert pq.content[:4] == b"PAR1"
+
+    bad = api.get(url, headers=auth_headers, params={"format": "xml"})
+    assert bad.status_code == 400
+
+
 def test_aggregate_1800_2x900(api: TestClient, auth_headers):
     shooter = api.post(
         "/api/shooters",
@@ -470,3 +523,801 @@ def test_league_seed_roster(api: TestClient, auth_headers):
         member_ids = set(mdoc.get("roster_shooter_ids") or [])
     assert s1["id"] in member_ids
     assert s2["id"] in member_ids
+
+
+def test_league_season_export(api: TestClient, auth_headers):
+    from io import BytesIO
+
+    from openpyxl import load_workbook
+
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Season Shooter"}
+    ).json()
+    league = api.post(
+        "/api/leagues", headers=auth_headers, json={"name": "Season League"}
+    ).json()
+    # Later week created first: Results must still come out in date order
+    for day, score in ((17, 90), (10, 95)):
+        match = api.post(
+            "/api/matches",
+            headers=auth_headers,
+            json={
+                "name": f"Season Week {day}",
+                "date": datetime(2026, 7, day).isoformat(),
+                "location": "Club",
+                "match_types": [
+                    {"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}
+                ],
+                "aggregate_type": "None",
+                "league_id": league["id"],
+            },
+        ).json()
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match["id"],
+                "caliber": ".22",
+                "match_type_instance": "NMC1",
+                "stages": [
+                    {"name": n, "score": score, "x_count": 1} for n in ("SF", "TF", "RF")
+                ],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    export = api.get(f"/api/leagues/{league['id']}/export", headers=auth_headers)
+    assert export.status_code == 200, export.text
+    wb = load_workbook(BytesIO(export.content))
+    assert wb.sheetnames == ["Season Summary", "Results"]
+    summary = list(wb["Season Summary"].iter_rows(values_only=True))
+    assert summary[1][1:] == ("Season Shooter", ".22", 2, 2, 555, 6, 277.5, 285)
+    assert wb["Results"].max_row == 1 + 2 * 3
+    results = list(wb["Results"].iter_rows(values_only=True))
+    name_col = results[0].index("match_name")
+    assert [row[name_col] for row in results[1:]] == ["Season Week 10"] * 3 + ["Season Week 17"] * 3
+
+
+def test_club_averages(api: TestClient, auth_headers):
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Averages Shooter"}
+    ).json()
+    match = api.post(
+        "/api/matches",
+        headers=auth_headers,
+        json={
+            "name": "Averages Night",
+            "date": datetime(2026, 8, 1).isoformat(),
+            "location": "Club",
+            "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".45"]}],
+            "aggregate_type": "None",
+        },
+    ).json()
+    resp = api.post(
+        "/api/scores",
+        headers=auth_headers,
+        json={
+            "shooter_id": shooter["id"],
+            "match_id": match["id"],
+            "caliber": ".45",
+            "match_type_instance": "NMC1",
+            "stages": [
+                {"name": "SF", "score": 96, "x_count": 2},
+                {"name": "TF", "score": 94, "x_count": 1},
+                {"name": "RF", "score": 92, "x_count": 0},
+            ],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+
+    averages = api.get(
+        "/api/analytics/averages", headers=auth_headers, params={"caliber": ".45"}
+    )
+    assert averages.status_code == 200, averages.text
+    body = averages.json()
+    rows = [r for r in body["rows"] if r["shooter_id"] == shooter["id"]]
+    assert len(rows) == 1
+    row = rows[0]
+    assert set(row) == set(body["columns"])
+    assert row["shooter_name"] == "Averages Shooter"
+    assert (row["cards"], row["total_score_avg"], row["sf_score_avg"]) == (1, 282, 96)
+    assert row["nmc_score_avg"] is None
+    assert all(r["caliber"] == ".45" for r in body["rows"])
+
+
+def test_shooter_stats_track_score_writes(api: TestClient, auth_headers):
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Stats Shooter"}
+    ).json()
+
+    def nmc_match(name):
+        return api.post(
+            "/api/matches",
+            headers=auth_headers,
+            json={
+                "name": name,
+                "date": datetime(2026, 8, 8).isoformat(),
+                "location": "Club",
+                "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+                "aggregate_type": "None",
+            },
+        ).json()
+
+    def post_score(match_id, score):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match_id,
+                "caliber": ".22",
+                "match_type_instance": "NMC1",
+                "stages": [
+                    {"name": n, "score": score, "x_count": 1} for n in ("SF", "TF", "RF")
+                ],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    keep, drop = nmc_match("Stats Keep"), nmc_match("Stats Drop")
+    first = post_score(keep["id"], 90)
+    post_score(drop["id"], 80)
+
+    averages = api.get(f"/api/shooter-averages/{shooter['id']}", headers=auth_headers).json()
+    assert averages["caliber_averages"][".22"]["total_score_avg"] == 255  # (270 + 240) / 2
+
+    # Update one card, delete the other match: stats follow both writes
+    updated = dict(first, stages=[{"name": n, "score": 100, "x_count": 2} for n in ("SF", "TF", "RF")])
+    resp = api.put(f"/api/scores/{first['id']}", headers=auth_headers, json=updated)
+    assert resp.status_code == 200, resp.text
+    assert api.delete(f"/api/matches/{drop['id']}", headers=auth_headers).status_code == 200
+
+    averages = api.get(f"/api/shooter-averages/{shooter['id']}", headers=auth_headers).json()
+    row = averages["caliber_averages"][".22"]
+    assert (row["valid_matches_count"], row["total_score_avg"], row["nmc_score_avg"]) == (1, 300, 300)
+    report = api.get(f"/api/shooter-report/{shooter['id']}", headers=auth_headers).json()
+    assert report["averages"]["by_caliber"][".22"]["avg_x_count"] == 6
+
+    rebuild = api.post(
+        "/api/admin/shooter-stats/rebuild",
+        headers=auth_headers,
+        params={"shooter_id": shooter["id"]},
+    )
+    assert rebuild.status_code == 200, rebuild.text
+    assert rebuild.json()["mismatched"] == 0
+
+
+def test_shooter_trends_follow_score_writes(api: TestClient, auth_headers):
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Trend Shooter"}
+    ).json()
+
+    def match_on(day):
+        return api.post(
+            "/api/matches",
+            headers=auth_headers,
+            json={
+                "name": f"Trend {day}",
+                "date": datetime(2026, 3, day).isoformat(),
+                "location": "Club",
+                "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+                "aggregate_type": "None",
+            },
+        ).json()
+
+    def post_score(match_id, score):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match_id,
+                "caliber": ".22",
+                "match_type_instance": "NMC1",
+                "stages": [
+                    {"name": n, "score": score, "x_count": 1} for n in ("SF", "TF", "RF")
+                ],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    # Entered out of date order; the buffer is kept by match date
+    late, early, middle = match_on(20), match_on(5), match_on(12)
+    post_score(late["id"], 95)
+    first = post_score(early["id"], 85)
+    post_score(middle["id"], 90)
+
+    def trends(**params):
+        resp = api.get(
+            f"/api/shooter-trends/{shooter['id']}", headers=auth_headers, params=params
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()["calibers"][".22"]
+
+    data = trends(window=2, months=120)
+    assert [p["total"] for p in data["series"]] == [255, 270, 285]
+    assert (data["last_n"]["mean"], data["last_n"]["best"]) == (277.5, 285)
+    assert data["last_n"]["stages"]["SF"]["mean"] == 92.5
+    assert data["last_months"]["count"] == 3
+
+    updated = dict(first, stages=[{"name": n, "score": 100, "x_count": 2} for n in ("SF", "TF", "RF")])
+    assert api.put(f"/api/scores/{first['id']}", headers=auth_headers, json=updated).status_code == 200
+    assert api.delete(f"/api/matches/{late['id']}", headers=auth_headers).status_code == 200
+
+    data = trends(window=5, months=120)
+    assert [p["total"] for p in data["series"]] == [300, 270]
+    assert data["last_n"]["best"] == 300
+
+    rebuild = api.post(
+        "/api/admin/shooter-stats/rebuild",
+        headers=auth_headers,
+        params={"shooter_id": shooter["id"]},
+    )
+    assert rebuild.status_code == 200, rebuild.text
+    assert rebuild.json()["trend_documents"] == 1
+    assert [p["total"] for p in trends(months=120)["series"]] == [300, 270]
+
+
+def test_classification_report(api: TestClient, auth_headers):
+    shooter = api.post(
+        "/api/shooters", headers=auth_headers, json={"name": "Class Shooter", "rating": "MK"}
+    ).json()
+    match = api.post(
+        "/api/matches",
+        headers=auth_headers,
+        json={
+            "name": "Class Match",
+            "date": datetime(2026, 4, 4).isoformat(),
+            "location": "Club",
+            "match_types": [
+                {"type": "NMC", "instance_name": f"NMC{i}", "calibers": [".22"]} for i in (1, 2, 3)
+            ],
+            "aggregate_type": "None",
+        },
+    ).json()
+    for i in (1, 2, 3):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match["id"],
+                "caliber": ".22",
+                "match_type_instance": f"NMC{i}",
+                "stages": [{"name": n, "score": 96, "x_count": 2} for n in ("SF", "TF", "RF")],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    resp = api.get("/api/admin/classifications", headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    change = next(c for c in resp.json()["changes"] if c["shooter_id"] == shooter["id"])
+    assert (change["proposed_rating"], change["direction"], change["percent"]) == ("HM", "up", 96.0)
+    # Report only: the stored rating is unchanged
+    assert api.get(f"/api/shooters/{shooter['id']}", headers=auth_headers).json()["rating"] == "MK"
+
+
+def test_league_standings_best_n(api: TestClient, auth_headers):
+    league = api.post("/api/leagues", headers=auth_headers, json={"name": "Standings League"}).json()
+    shooters = [
+        api.post("/api/shooters", headers=auth_headers, json={"name": name}).json()
+        for name in ("Standings A", "Standings B", "Standings Guest")
+    ]
+    resp = api.post(
+        f"/api/leagues/{league['id']}/roster",
+        headers=auth_headers,
+        json={"shooter_ids": [s["id"] for s in shooters[:2]]},
+    )
+    assert resp.status_code == 200, resp.text
+
+    def league_match(day):
+        return api.post(
+            "/api/matches",
+            headers=auth_headers,
+            json={
+                "name": f"Standings {day}",
+                "date": datetime(2026, 5, day).isoformat(),
+                "location": "Club",
+                "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+                "aggregate_type": "None",
+                "league_id": league["id"],
+            },
+        ).json()
+
+    def post_score(match, shooter, score, x):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter["id"],
+                "match_id": match["id"],
+                "caliber": ".22",
+                "match_type_instance": "NMC1",
+                "stages": [{"name": n, "score": score, "x_count": x} for n in ("SF", "TF", "RF")],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    def standings(**params):
+        resp = api.get(
+            f"/api/leagues/{league['id']}/standings", headers=auth_headers, params=params
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    m1, m2, m3 = league_match(1), league_match(8), league_match(15)
+    a, b, guest = shooters
+    post_score(m1, a, 90, 1)
+    post_score(m2, a, 95, 2)
+    post_score(m3, a, 80, 0)
+    post_score(m1, b, 95, 1)
+    post_score(m2, b, 90, 3)
+    post_score(m1, guest, 99, 9)
+
+    data = standings(best=2)
+    rows = data["calibers"][".22"]
+    # Both 555 over their best two; B has more X
+    assert [(r["shooter_name"], r["total"], r["x_count"], r["rank"]) for r in rows] == [
+        ("Standings B", 555, 12, 1),
+        ("Standings A", 555, 9, 2),
+    ]
+    assert data["matches"] == 3
+
+    # Writes move the revision and the cached standings follow
+    revision = data["revision"]
+    post_score(m3, b, 100, 10)
+    data = standings(best=2)
+    assert data["revision"] > revision
+    assert [(r["shooter_name"], r["total"]) for r in data["calibers"][".22"]] == [
+        ("Standings B", 585),
+        ("Standings A", 555),
+    ]
+    assert api.delete(f"/api/matches/{m2['id']}", headers=auth_headers).status_code == 200
+    data = standings()
+    assert data["matches"] == 2
+    assert [(r["shooter_name"], r["total"]) for r in data["calibers"][".22"]] == [
+        ("Standings B", 585),
+        ("Standings A", 510),
+    ]
+
+    guests = standings(include_guests=True)["calibers"][".22"]
+    assert [(r["shooter_name"], r["rank"]) for r in guests][-1] == ("Standings Guest", 3)
+
+
+def test_shooter_search_typeahead(api: TestClient, auth_headers):
+    created = api.post(
+        "/api/shooters",
+        headers=auth_headers,
+        json={"name": "Typeahead Quill", "nra_number": "TQ4455"},
+    ).json()
+
+    def search(q):
+        resp = api.get("/api/shooters/search", headers=auth_headers, params={"q": q})
+        assert resp.status_code == 200, resp.text
+        return [s["id"] for s in resp.json()]
+
+    assert search("quil") == [created["id"]]
+    assert search("type qu") == [created["id"]]
+    assert search("tq44") == [created["id"]]
+
+    updated = dict(created, name="Typeahead Quimby")
+    assert api.put(f"/api/shooters/{created['id']}", headers=auth_headers, json=updated).status_code == 200
+    assert search("quil") == []
+    assert search("quim") == [created["id"]]
+
+    assert api.delete(f"/api/shooters/{created['id']}", headers=auth_headers).status_code == 200
+    assert search("quim") == []
+
+
+def test_csv_shooter_import_duplicates(api: TestClient, auth_headers):
+    api.post(
+        "/api/shooters",
+        headers=auth_headers,
+        json={"name": "Import Existing", "nra_number": "IMP-1"},
+    )
+    csv_body = (
+        "name,nra_number\n"
+        "import existing,\n"  # existing name, case-insensitive
+        "Import Fresh,IMP-1\n"  # existing NRA number
+        "Import New,IMP-2\n"
+        "IMPORT NEW,\n"  # duplicate name in this file
+        "Import Other,IMP-2\n"  # duplicate NRA number in this file
+        ",IMP-3\n"  # missing name
+    )
+    resp = api.post(
+        "/api/shooters/bulk-csv",
+        headers=auth_headers,
+        files={"file": ("shooters.csv", csv_body, "text/csv")},
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert (data["created"], data["skipped"], data["errors"]) == (1, 4, 1)
+    details = [r["detail"] for r in data["results"]]
+    assert details[:2] == [
+        "Shooter named 'Import Existing' already exists",
+        "NRA number IMP-1 already used by 'Import Existing'",
+    ]
+    assert [r["status"] for r in data["results"]][2] == "created"
+
+    found = api.get("/api/shooters/search", headers=auth_headers, params={"q": "import new"}).json()
+    assert [s["nra_number"] for s in found] == ["IMP-2"]
+
+
+def test_match_roster_counts(api: TestClient, auth_headers):
+    shooters = [
+        api.post("/api/shooters", headers=auth_headers, json={"name": name}).json()
+        for name in ("Roster Zed", "Roster Able", "Roster Walkin")
+    ]
+    zed, able, walkin = (s["id"] for s in shooters)
+    match_id = api.post(
+        "/api/matches",
+        headers=auth_headers,
+        json={
+            "name": "Roster Counts",
+            "date": datetime(2026, 8, 1).isoformat(),
+            "location": "Test Range",
+            "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+            "aggregate_type": "None",
+        },
+    ).json()["id"]
+
+    added = api.post(
+        f"/api/matches/{match_id}/roster",
+        headers=auth_headers,
+        json={"shooter_ids": [zed, able]},
+    )
+    assert added.status_code == 200, added.text
+    assert [m["shooter"]["name"] for m in added.json()["members"]] == ["Roster Able", "Roster Zed"]
+
+    stages = [{"name": n, "score": 95, "x_count": 1} for n in ("SF", "TF", "RF")]
+    for shooter_id in (zed, walkin):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter_id,
+                "match_id": match_id,
+                "caliber": ".22",
+                "match_type_instance": "NMC1",
+                "stages": stages,
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    roster = api.get(f"/api/matches/{match_id}/roster", headers=auth_headers)
+    assert roster.status_code == 200, roster.text
+    body = roster.json()
+    assert [(m["shooter"]["id"], m["score_count"], m["has_scores"]) for m in body["members"]] == [
+        (able, 0, False),
+        (zed, 1, True),
+    ]
+    assert [(m["shooter"]["id"], m["score_count"]) for m in body["scored_but_not_on_roster"]] == [(walkin, 1)]
+
+    assert api.get("/api/matches/missing/roster", headers=auth_headers).status_code == 404
+
+
+def test_delete_shooter_cleans_match_and_league_rosters(api: TestClient, auth_headers):
+    gone, kept = (
+        api.post("/api/shooters", headers=auth_headers, json={"name": name}).json()["id"]
+        for name in ("Cleanup Gone", "Cleanup Kept")
+    )
+    league_id = api.post(
+        "/api/leagues",
+        headers=auth_headers,
+        json={"name": "Cleanup League", "season": "2026"},
+    ).json()["id"]
+    api.post(f"/api/leagues/{league_id}/roster", headers=auth_headers, json={"shooter_ids": [gone, kept]})
+    match_id = api.post(
+        "/api/matches",
+        headers=auth_headers,
+        json={
+            "name": "Cleanup Match",
+            "date": datetime(2026, 8, 2).isoformat(),
+            "location": "Club",
+            "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+            "aggregate_type": "None",
+        },
+    ).json()["id"]
+    api.post(f"/api/matches/{match_id}/roster", headers=auth_headers, json={"shooter_ids": [gone, kept]})
+    api.post(
+        "/api/scores",
+        headers=auth_headers,
+        json={
+            "shooter_id": gone,
+            "match_id": match_id,
+            "caliber": ".22",
+            "match_type_instance": "NMC1",
+            "stages": [{"name": n, "score": 90, "x_count": 0} for n in ("SF", "TF", "RF")],
+        },
+    )
+
+    assert api.delete(f"/api/shooters/{gone}", headers=auth_headers).status_code == 400
+    resp = api.delete(f"/api/shooters/{gone}", headers=auth_headers, params={"force": "true"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["deleted_scores"] == 1
+
+    league = api.get(f"/api/leagues/{league_id}", headers=auth_headers).json()
+    assert league["roster_shooter_ids"] == [kept]
+    roster = api.get(f"/api/matches/{match_id}/roster", headers=auth_headers).json()
+    assert [m["shooter"]["id"] for m in roster["members"]] == [kept]
+    assert roster["scored_but_not_on_roster"] == []
+
+
+def test_update_match_drops_removed_structure(api: TestClient, auth_headers):
+    shooter_id = api.post("/api/shooters", headers=auth_headers, json={"name": "Structure Diff"}).json()["id"]
+    match_types = [
+        {"type": "NMC", "instance_name": "NMC1", "calibers": [".22", "CF"]},
+        {"type": "NMC", "instance_name": "NMC2", "calibers": [".45"]},
+    ]
+    match_body = {
+        "name": "Structure Diff Match",
+        "date": datetime(2026, 8, 3).isoformat(),
+        "location": "Club",
+        "match_types": match_types,
+        "aggregate_type": "None",
+    }
+    match_id = api.post("/api/matches", headers=auth_headers, json=match_body).json()["id"]
+    stages = [{"name": n, "score": 90, "x_count": 0} for n in ("SF", "TF", "RF")]
+    for instance, caliber in (("NMC1", ".22"), ("NMC1", "CF"), ("NMC2", ".45")):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter_id,
+                "match_id": match_id,
+                "caliber": caliber,
+                "match_type_instance": instance,
+                "stages": stages,
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    unchanged = api.put(f"/api/matches/{match_id}", headers=auth_headers, json=match_body)
+    assert unchanged.status_code == 200, unchanged.text
+    assert unchanged.json()["scores_dropped"] == 0
+
+    # Drop NMC2 entirely and CF from NMC1
+    match_body["match_types"] = [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}]
+    resp = api.put(f"/api/matches/{match_id}", headers=auth_headers, json=match_body)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["scores_dropped"] == 2
+    assert [mt["instance_name"] for mt in resp.json()["match_types"]] == ["NMC1"]
+
+    remaining = api.get("/api/scores", headers=auth_headers, params={"match_id": match_id}).json()
+    assert [(s["match_type_instance"], s["caliber"]) for s in remaining] == [("NMC1", ".22")]
+
+
+def test_update_match_structural_drop_keeps_stats(api: TestClient, auth_headers):
+    shooter_id = api.post("/api/shooters", headers=auth_headers, json={"name": "Structure Stats"}).json()["id"]
+    match_body = {
+        "name": "Structure Stats Match",
+        "date": datetime(2026, 8, 5).isoformat(),
+        "location": "Club",
+        "match_types": [
+            {"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]},
+            {"type": "NMC", "instance_name": "NMC2", "calibers": [".22"]},
+        ],
+        "aggregate_type": "None",
+    }
+    match_id = api.post("/api/matches", headers=auth_headers, json=match_body).json()["id"]
+    for instance, stage_score in (("NMC1", 90), ("NMC2", 75)):
+        resp = api.post(
+            "/api/scores",
+            headers=auth_headers,
+            json={
+                "shooter_id": shooter_id,
+                "match_id": match_id,
+                "caliber": ".22",
+                "match_type_instance": instance,
+                "stages": [{"name": n, "score": stage_score, "x_count": 0} for n in ("SF", "TF", "RF")],
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+    row = api.get(f"/api/shooter-averages/{shooter_id}", headers=auth_headers).json()["caliber_averages"][".22"]
+    assert (row["valid_matches_count"], row["total_score_avg"]) == (2, 247.5)
+
+    match_body["match_types"] = match_body["match_types"][:1]
+    resp = api.put(f"/api/matches/{match_id}", headers=auth_headers, json=match_body)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["scores_dropped"] == 1
+
+    row = api.get(f"/api/shooter-averages/{shooter_id}", headers=auth_headers).json()["caliber_averages"][".22"]
+    assert (row["valid_matches_count"], row["total_score_avg"]) == (1, 270)
+    rebuild = api.post(
+        "/api/admin/shooter-stats/rebuild",
+        headers=auth_headers,
+        params={"shooter_id": shooter_id},
+    )
+    assert rebuild.json()["mismatched"] == 0
+
+
+def test_update_match_type_change_moves_stats(api: TestClient, auth_headers):
+    shooter_id = api.post("/api/shooters", headers=auth_headers, json={"name": "Retype Stats"}).json()["id"]
+    match_body = {
+        "name": "Retype Stats Match",
+        "date": datetime(2026, 8, 6).isoformat(),
+        "location": "Club",
+        "match_types": [{"type": "NMC", "instance_name": "EIC1", "calibers": [".22"]}],
+        "aggregate_type": "None",
+    }
+    match_id = api.post("/api/matches", headers=auth_headers, json=match_body).json()["id"]
+    resp = api.post(
+        "/api/scores",
+        headers=auth_headers,
+        json={
+            "shooter_id": shooter_id,
+            "match_id": match_id,
+            "caliber": ".22",
+            "match_type_instance": "EIC1",
+            "stages": [{"name": n, "score": 90, "x_count": 0} for n in ("SF", "TF", "RF")],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+
+    match_body["match_types"] = [{"type": "600", "instance_name": "EIC1", "calibers": [".22"]}]
+    resp = api.put(f"/api/matches/{match_id}", headers=auth_headers, json=match_body)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["scores_dropped"] == 0
+
+    rebuild = api.post(
+        "/api/admin/shooter-stats/rebuild",
+        headers=auth_headers,
+        params={"shooter_id": shooter_id},
+    )
+    assert rebuild.json()["mismatched"] == 0
+
+
+def test_roster_add_batches_validation_and_new_shooters(api: TestClient, auth_headers):
+    known = api.post("/api/shooters", headers=auth_headers, json={"name": "Batch Known"}).json()["id"]
+    league_id = api.post(
+        "/api/leagues",
+        headers=auth_headers,
+        json={"name": "Batch League", "season": "2026"},
+    ).json()["id"]
+
+    bad = api.post(
+        f"/api/leagues/{league_id}/roster",
+        headers=auth_headers,
+        json={
+            "shooter_ids": [known, "missing-a", "missing-b"],
+            "new_shooters": [{"name": "Batch Never Created"}],
+        },
+    )
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "Shooter ids not found: missing-a, missing-b"
+    found = api.get("/api/shooters/search", headers=auth_headers, params={"q": "batch never"}).json()
+    assert found == []
+
+    resp = api.post(
+        f"/api/leagues/{league_id}/roster",
+        headers=auth_headers,
+        json={
+            "shooter_ids": [known, known],
+            "new_shooters": [{"name": "Batch New One"}, {"name": "Batch New Two", "nra_number": "BN2"}],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    names = [m["name"] for m in resp.json()["members"]]
+    assert names == ["Batch Known", "Batch New One", "Batch New Two"]
+    found = api.get("/api/shooters/search", headers=auth_headers, params={"q": "bn2"}).json()
+    assert [s["name"] for s in found] == ["Batch New Two"]
+
+
+def test_conditional_get_by_revision(api: TestClient, auth_headers):
+    def get(path, etag=None):
+        headers = dict(auth_headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        return api.get(path, headers=headers)
+
+    match_ids = [
+        api.post(
+            "/api/matches",
+            headers=auth_headers,
+            json={
+                "name": f"ETag Match {n}",
+                "date": datetime(2026, 8, 4).isoformat(),
+                "location": "Club",
+                "match_types": [{"type": "NMC", "instance_name": "NMC1", "calibers": [".22"]}],
+                "aggregate_type": "None",
+            },
+        ).json()["id"]
+        for n in (1, 2)
+    ]
+    shooter_id = api.post("/api/shooters", headers=auth_headers, json={"name": "ETag Shooter"}).json()["id"]
+
+    matches = get("/api/matches")
+    assert matches.status_code == 200
+    assert get("/api/matches", matches.headers["etag"]).status_code == 304
+
+    reports = {mid: get(f"/api/match-report/{mid}") for mid in match_ids}
+    for mid, resp in reports.items():
+        assert resp.status_code == 200, resp.text
+        unchanged = get(f"/api/match-report/{mid}", resp.headers["etag"])
+        assert unchanged.status_code == 304
+        assert unchanged.content == b""
+
+    resp = api.post(
+        "/api/scores",
+        headers=auth_headers,
+        json={
+            "shooter_id": shooter_id,
+            "match_id": match_ids[0],
+            "caliber": ".22",
+            "match_type_instance": "NMC1",
+            "stages": [{"name": n, "score": 95, "x_count": 1} for n in ("SF", "TF", "RF")],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+
+    # Only the scored match's report changed
+    changed = get(f"/api/match-report/{match_ids[0]}", reports[match_ids[0]].headers["etag"])
+    assert changed.status_code == 200
+    assert shooter_id in changed.json()["shooters"]
+    assert get(f"/api/match-report/{match_ids[1]}", reports[match_ids[1]].headers["etag"]).status_code == 304
+    assert get("/api/matches", matches.headers["etag"]).status_code == 304
+
+    # Bulletin variants are tagged separately by query string
+    event = f"/api/match-report/{match_ids[0]}/bulletin?caliber=.22&match_type_instance=NMC1&event_scope="
+    total = get(event + "total")
+    slow = get(event + "slow")
+    assert (total.status_code, slow.status_code) == (200, 200), total.text
+    assert total.headers["etag"] != slow.headers["etag"]
+    assert get(event + "total", total.headers["etag"]).status_code == 304
+
+    shooters = get("/api/shooters")
+    api.put(
+        f"/api/shooters/{shooter_id}",
+        headers=auth_headers,
+        json={"name": "ETag Shooter Renamed"},
+    )
+    assert get("/api/shooters", shooters.headers["etag"]).status_code == 200
+    assert get(f"/api/match-report/{match_ids[1]}", reports[match_ids[1]].headers["etag"]).status_code == 200
+
+
+def test_metrics_endpoint(api: TestClient, auth_headers):
+    assert api.get("/api/metrics").status_code == 401
+    api.get("/api/matches", headers=auth_headers)
+    resp = api.get("/api/metrics", headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_requests_total{method="GET",route="/api/matches",status="200"}' in text
+    assert "# TYPE mongodb_commands_per_request histogram" in text
+
+
+def test_startup_backfill_is_recorded(api: TestClient, auth_headers):
+    async def backfilled():
+        # Runs in the background; requests above were served meanwhile
+        await server._backfill_task
+        return await db.meta.find({"id": {"$regex": "^backfill:"}}, {"_id": 0, "id": 1}).to_list(None)
+
+    markers = api.portal.call(backfilled)
+    assert sorted(m["id"] for m in markers) == ["backfill:shooter_stats", "backfill:shooter_trends"]
+
+
+def test_reset_database_restores_derived_indexes(api: TestClient, auth_headers):
+    # Wipes the test data, so this stays last
+    assert api.post("/api/reset-database", headers=auth_headers).json() == {"success": True}
+
+    async def indexes():
+        return {
+            "shooter_stats": await db.shooter_stats.index_information(),
+            "shooter_trends": await db.shooter_trends.index_information(),
+            "matches": await db.matches.index_information(),
+            "leagues": await db.leagues.index_information(),
+            "markers": await db.meta.count_documents({"id": {"$regex": "^backfill:"}}),
+        }
+
+    found = api.portal.call(indexes)
+    assert found["shooter_stats"]["shooter_id_1_caliber_1_match_type_1"]["unique"]
+    assert found["shooter_trends"]["shooter_id_1_caliber_1"]["unique"]
+    assert "roster_shooter_ids_1" in found["matches"]
+    assert "roster_shooter_ids_1" in found["leagues"]
+    assert found["markers"] == 2
@@ -0,0 +1,51 @@
+"""Club-wide averages: exact stage families, null handling, row layout."""
+
+import pytest
+
+from backend.analytics import AVERAGES_COLUMNS, club_averages
+
+
+def _card(shooter_id, caliber, stages, total, x):
+    return {
+        "shooter_id": shooter_id,
+        "caliber": caliber,
+        "stages": [{"name": n, "score": s, "x_count": xc} for n, s, xc in stages],
+        "total_score": total,
+        "total_x_count": x,
+    }
+
+
+DOCS = [
+    # 900 card: SFNMC belongs to the NMC block, not slow fire
+    _card(
+        "s1",
+        ".22",
+        [("SF1", 98, 5), ("SF2", 96, 3), ("SFNMC", 90, 1), ("TF1", 99, 6), ("RF1", None, None)],
+        383,
+        15,
+    ),
+    _card("s1", ".22", [("SF", 94, 2), ("TF", 97, 4), ("RF", 95, None)], 286, 6),
+    _card("s1", "CF", [("SF", 90, 1)], 90, 1),
+    _card("s2", ".22", [("SF", 80, 0)], None, None),  # null total: skipped
+]
+
+
+def test_club_averages_groups_by_shooter_caliber_and_family():
+    rows = club_averages(DOCS, {"s1": "Pat Doe", "s2": "Lee Roe"})
+    assert [(r["shooter_id"], r["caliber"]) for r in rows] == [("s1", ".22"), ("s1", "CF")]
+    row = rows[0]
+    assert list(row) == list(AVERAGES_COLUMNS)
+    assert row["shooter_name"] == "Pat Doe"
+    assert row["cards"] == 2
+    assert row["total_score_avg"] == pytest.approx((383 + 286) / 2)
+    assert row["sf_stage_count"] == 3
+    assert row["sf_score_avg"] == pytest.approx(round((98 + 96 + 94) / 3, 2))
+    assert row["nmc_stage_count"] == 1 and row["nmc_score_avg"] == 90
+    assert row["rf_stage_count"] == 1  # null RF1 not counted
+    assert row["rf_x_count_avg"] == 0
+    cf = rows[1]
+    assert cf["tf_score_avg"] is None and cf["tf_stage_count"] is None
+
+
+def test_club_averages_empty():
+    assert club_averages([], {}) == []
@@ -0,0 +1,71 @@
+"""Classification: qualifying cards, band mapping and proposed changes."""
+
+import numpy as np
+
+from backend.classification import classify, ratings_for_percent
+
+
+def _card(shooter_id, total, caliber=".22", instance="NMC1", stages=None):
+    return {
+        "shooter_id": shooter_id,
+        "match_id": "m1",
+        "match_type_instance": instance,
+        "caliber": caliber,
+        "stages": stages if stages is not None else [{"score": 1}],
+        "total_score": total,
+        "not_shot": total is None,
+    }
+
+
+TYPES = {"NMC1": "NMC", "900_1": "900", "odd": None}
+
+
+def _type_for(doc):
+    return TYPES.get(doc["match_type_instance"])
+
+
+def test_band_lookup_uses_lower_bounds():
+    ratings = ratings_for_percent(np.array([99.0, 95.0, 94.99, 85.0, 80.0, 79.9]))
+    assert list(ratings) == ["HM", "HM", "MA", "EX", "SS", "MK"]
+
+
+def test_classify_proposes_changes_from_qualifying_cards():
+    shooters = [
+        {"id": "a", "name": "Able", "rating": "SS"},
+        {"id": "b", "name": "Baker", "rating": "EX"},
+        {"id": "c", "name": "Charlie", "rating": None},
+    ]
+    docs = [
+        # Able: NMC (max 300) at 90% and 92%, 900 (max 900) at 88%
+        _card("a", 270),
+        _card("a", 276, caliber="CF"),
+        _card("a", 792, instance="900_1"),
+        _card("a", 150, stages=[{"score": 150}, {"score": None}]),  # incomplete
+        _card("a", None),  # not shot
+        _card("a", 10, instance="odd"),  # unknown match type
+        # Baker: consistent with EX
+        _card("b", 258),
+        _card("b", 256),
+        _card("b", 260),
+        # Charlie: too few cards
+        _card("c", 290),
+    ]
+    report = classify(docs, _type_for, shooters)
+
+    able = report["shooters"][0]
+    assert (able["cards"], able["percent"], able["proposed_rating"]) == (3, 90.0, "MA")
+    assert able["calibers"]["CF"] == {"cards": 1, "percent": 92.0, "rating": None}
+    assert report["shooters"][2]["proposed_rating"] is None
+
+    assert report["changes"] == [
+        {
+            "shooter_id": "a",
+            "shooter_name": "Able",
+            "current_rating": "SS",
+            "proposed_rating": "MA",
+            "direction": "up",
+            "cards": 3,
+            "percent": 90.0,
+        }
+    ]
+    assert classify([], _type_for, shooters)["shooters"] == []
@@ -0,0 +1,123 @@
+"""Compression middleware: negotiation, threshold, streaming and skipped types."""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.compression import CompressionMiddleware, CompressionStats, choose_encoding
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PAYLOAD = b'{"shooter": "Pat Doe", "total": 290}' * 200
+
+
+@pytest.fixture()
+def stats():
+    return CompressionStats()
+
+
+@pytest.fixture()
+def client(stats):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, offload_size=4096, stats=stats)
+
+    @app.get("/report/{match_id}")
+    def report(match_id: str):
+        return Response(PAYLOAD, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/export")
+    def export():
+        return StreamingResponse((b"a,b,c\n" * 100 for _ in range(5)), media_type="text/csv")
+
+    @app.get("/excel")
+    def excel():
+        return Response(PAYLOAD, media_type=XLSX)
+
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip", brotli_available=True) == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding("") is None
+
+
+def test_large_json_is_gzipped_and_recorded(client, stats):
+    resp = client.get("/report/m1", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in resp.headers["vary"].lower()
+    assert int(resp.headers["content-length"]) < len(PAYLOAD)
+    assert resp.content == PAYLOAD  # httpx decodes
+
+    (row,) = stats.snapshot()
+    assert (row["route"], row["encoding"], row["responses"]) == ("/report/{match_id}", "gzip", 1)
+    assert row["bytes_in"] == len(PAYLOAD)
+    assert row["ratio"] > 10
+
+
+def test_brotli_when_accepted(client, stats):
+    brotli = pytest.importorskip("brotli")
+    with client.stream("GET", "/report/m1", headers={"Accept-Encoding": "gzip, br"}) as resp:
+        assert resp.headers["content-encoding"] == "br"
+        raw = b"".join(resp.iter_raw())
+    assert brotli.decompress(raw) == PAYLOAD
+    assert stats.snapshot()[0]["encoding"] == "br"
+
+
+def test_small_identity_and_excel_are_untouched(client, stats):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    plain = client.get("/report/m1", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    excel = client.get("/excel", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in excel.headers
+    assert excel.content == PAYLOAD
+    assert stats.snapshot() == []
+
+
+def test_streaming_export_is_compressed_incrementally(client, stats):
+    with client.stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        raw = b"".join(resp.iter_raw())
+    assert gzip.decompress(raw) == b"a,b,c\n" * 500
+    (row,) = stats.snapshot()
+    assert (row["bytes_in"], row["bytes_out"]) == (3000, len(raw))
+
+
+def test_etag_names_the_encoded_representation(stats):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, stats=stats)
+
+    @app.get("/tagged")
+    def tagged():
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": '"rev1"'})
+
+    client = TestClient(app)
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).headers["etag"] == '"rev1-gzip"'
+    assert client.get("/tagged", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"rev1"'
+
+
+def test_not_modified_keeps_the_etag_the_client_sent(stats):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, stats=stats)
+
+    @app.get("/tagged")
+    def tagged():
+        return Response(status_code=304, headers={"ETag": '"rev1"'})
+
+    client = TestClient(app)
+    compressed = client.get("/tagged", headers={"Accept-Encoding": "gzip", "If-None-Match": '"rev1-gzip"'})
+    assert (compressed.status_code, compressed.headers["etag"]) == (304, '"rev1-gzip"')
+    # A small body was never compressed, so its 200 carried the bare tag
+    small = client.get("/tagged", headers={"Accept-Encoding": "gzip", "If-None-Match": '"rev1"'})
+    assert (small.status_code, small.headers["etag"]) == (304, '"rev1"')
@@ -18,9 +18,11 @@ from backend.core import (
     Score,
     ScoreStage,
     calculate_aggregates,
+    calculate_overall_aggregate,
     calculate_score_subtotals,
     calculate_shooter_averages_by_caliber,
     get_match_type_max_score,
+    get_stage_table,
     get_stages_for_match_type,
 )
 
@@ -92,6 +94,17 @@ def test_caliber_and_aggregate_enums():
     assert AggregateType.TWENTY_SEVEN_HUNDRED.value == "2700 (3x900)"
 
 
+def test_stage_table_slots_match_subtotal_mappings():
+    table = get_stage_table(BasicMatchType.NINEHUNDRED)
+    assert table.subtotal_names == ("SF", "NMC", "TF", "RF")
+    for name, stages in table.subtotal_mappings.items():
+        for stage in stages:
+            assert table.subtotal_names[table.slot_by_stage[stage]] == name
+    assert get_stage_table(BasicMatchType.NMC).slot_by_stage == {}
+    with pytest.raises(TypeError):
+        table.slot_by_stage["SF1"] = 3
+
+
 # ---------------------------------------------------------------------------
 # Score subtotals
 # ---------------------------------------------------------------------------
@@ -141,6 +154,18 @@ def test_900_subtotals_sum_entry_stages():
     assert sub["RF"]["score"] == 86 + 87
 
 
+def test_subtotals_from_stage_table_match_dict_config():
+    stages = [(90, 2), (91, 1), (92, 3), (88, 0), (89, 1), (90, 2), (85, 0), (86, 1), (87, 0)]
+    score = _score_with_stages(stages)
+    from_table = calculate_score_subtotals(score, get_stage_table(BasicMatchType.NINEHUNDRED))
+    from_dict = calculate_score_subtotals(
+        score, get_stages_for_match_type(BasicMatchType.NINEHUNDRED)
+    )
+    assert from_table == from_dict
+    assert list(from_table) == ["SF", "NMC", "TF", "RF"]
+    assert calculate_score_subtotals(score, get_stage_table(BasicMatchType.NMC)) == {}
+
+
 def test_subtotals_ignore_null_stage_scores():
     stages = [
         (90, 1),
@@ -307,6 +332,58 @@ def test_aggregates_skip_null_totals():
     assert "1800_.22" not in aggs
 
 
+def test_aggregates_match_instance_names_exactly():
+    """'900_1' must not pick up the 600 card shot under '600_900_1'."""
+    match = _match(
+        AggregateType.EIGHTEEN_HUNDRED_2X900,
+        [
+            MatchTypeInstance(
+                type=BasicMatchType.NINEHUNDRED,
+                instance_name="900_1",
+                calibers=[CaliberType.TWENTYTWO],
+            ),
+            MatchTypeInstance(
+                type=BasicMatchType.SIXHUNDRED,
+                instance_name="600_900_1",
+                calibers=[CaliberType.TWENTYTWO],
+            ),
+        ],
+    )
+    scores = {
+        "900_1_.22": _score_blob("900_1", CaliberType.TWENTYTWO, 850, 10),
+        "600_900_1_.22": _score_blob("600_900_1", CaliberType.TWENTYTWO, 590, 20),
+    }
+    assert calculate_aggregates(scores, match) == {}
+    assert calculate_overall_aggregate(scores, match) is None
+
+
+def test_overall_aggregate_uses_base_type_cards_across_calibers():
+    match = _match(
+        AggregateType.EIGHTEEN_HUNDRED_2X900,
+        [
+            MatchTypeInstance(
+                type=BasicMatchType.NINEHUNDRED,
+                instance_name="900_A",
+                calibers=[CaliberType.TWENTYTWO, CaliberType.CENTERFIRE],
+            ),
+            MatchTypeInstance(
+                type=BasicMatchType.SIXHUNDRED,
+                instance_name="600_A",
+                calibers=[CaliberType.TWENTYTWO],
+            ),
+        ],
+    )
+    scores = {
+        "900_A_.22": _score_blob("900_A", CaliberType.TWENTYTWO, 850, 2),
+        "900_A_CF": _score_blob("900_A", CaliberType.CENTERFIRE, 800, 30),
+        "600_A_.22": _score_blob("600_A", CaliberType.TWENTYTWO, 900, 40),  # not a 900
+    }
+    overall = calculate_overall_aggregate(scores, match)
+    assert overall["score"] == 850 + 800
+    # X count comes from the same two cards, not the two largest X counts
+    assert overall["x_count"] == 2 + 30
+
+
 def test_named_submatch_instance_survives_on_model():
     """Option to name individual sub matches (e.g. '22 EIC')."""
     mt = MatchTypeInstance(
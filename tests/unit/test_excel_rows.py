@@ -0,0 +1,107 @@
+"""Match-report Excel row builders read from the per-shooter score index."""
+
+import os
+from datetime import datetime
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "match_track_excel_unit")
+
+from backend.core import (  # noqa: E402
+    AggregateType,
+    BasicMatchType,
+    CaliberType,
+    Match,
+    MatchTypeInstance,
+    Shooter,
+)
+from backend.server import (  # noqa: E402
+    build_aggregate_row_grouped,
+    build_non_aggregate_row,
+    build_shooter_score_index,
+)
+
+NINE_HUNDRED_STAGES = ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"]
+
+
+def _entry(instance, caliber, stage_scores, *, not_shot=False):
+    stages = [
+        {"name": name, "score": sc, "x_count": 1 if sc is not None else None}
+        for name, sc in zip(NINE_HUNDRED_STAGES, stage_scores)
+    ]
+    valid = [s["score"] for s in stages if s["score"] is not None]
+    return {
+        "score": {
+            "match_type_instance": instance,
+            "caliber": caliber,
+            "total_score": sum(valid) if valid else None,
+            "total_x_count": len(valid) if valid else None,
+            "not_shot": not_shot,
+            "stages": stages,
+        }
+    }
+
+
+def _match(aggregate_type):
+    return Match(
+        name="Test",
+        date=datetime(2026, 7, 1),
+        location="Range",
+        aggregate_type=aggregate_type,
+        match_types=[
+            MatchTypeInstance(
+                type=BasicMatchType.NINEHUNDRED,
+                instance_name=name,
+                calibers=[CaliberType.TWENTYTWO, CaliberType.CENTERFIRE],
+            )
+            for name in ("900_A", "900_B")
+        ],
+    )
+
+
+def _shooter_data():
+    return {
+        "scores": {
+            "900_A_.22": _entry("900_A", CaliberType.TWENTYTWO, [90] * 9),
+            "900_B_.22": _entry("900_B", CaliberType.TWENTYTWO, [95, 95, 80, 80, 80, None, 90, 90, 90]),
+            "900_A_CF": _entry("900_A", CaliberType.CENTERFIRE, [None] * 9, not_shot=True),
+        }
+    }
+
+
+def test_index_buckets_keep_nmc_block_separate():
+    match = _match(AggregateType.EIGHTEEN_HUNDRED_2X900)
+    index = build_shooter_score_index(
+        _shooter_data(), {mt.instance_name: mt.type for mt in match.match_types}
+    )
+    entry = index[("900_B", ".22")]
+    assert entry["buckets"]["SF"] == [190, 2]
+    assert entry["buckets"]["NMC"] == [240, 3]
+    assert entry["buckets"]["TF"] == [90, 1]  # null TF1 counts as 0
+    assert entry["buckets"]["RF"] == [180, 2]
+    assert index[("900_A", "CF")]["not_shot"] is True
+
+
+def test_aggregate_row_sums_per_caliber_columns():
+    match = _match(AggregateType.EIGHTEEN_HUNDRED_2X900)
+    index = build_shooter_score_index(
+        _shooter_data(), {mt.instance_name: mt.type for mt in match.match_types}
+    )
+    row = build_aggregate_row_grouped(
+        Shooter(name="A Shooter"),
+        index,
+        [CaliberType.TWENTYTWO, CaliberType.CENTERFIRE],
+        ["SF", "NMC", "TF", "RF", "900"],
+        BasicMatchType.NINEHUNDRED,
+    )
+    assert row[:2] == ["A Shooter", "1510 (17X)"]
+    assert row[2:7] == ["370 (4X)", "510 (6X)", "270 (3X)", "360 (4X)", "1510 (17X)"]
+    assert row[7:] == ["-"] * 5  # CF only has a not-shot card
+
+
+def test_non_aggregate_row_follows_match_column_order():
+    match = _match(AggregateType.NONE)
+    index = build_shooter_score_index(
+        _shooter_data(), {mt.instance_name: mt.type for mt in match.match_types}
+    )
+    row = build_non_aggregate_row(Shooter(name="A Shooter"), index, match)
+    assert row == ["A Shooter", 755.0, "810 (9X)", "-", "700 (8X)", "-"]
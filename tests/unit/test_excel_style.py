@@ -0,0 +1,58 @@
+"""Excel export styling: shared named styles must keep the same look."""
+
+import io
+
+from openpyxl import Workbook, load_workbook
+
+from backend import excel_style
+
+
+def test_named_styles_registered_once_per_workbook():
+    wb = Workbook()
+    excel_style.register_named_styles(wb)
+    excel_style.register_named_styles(wb)
+    names = list(wb.named_styles)
+    assert names.count(excel_style.STYLE_HEADER) == 1
+    assert set(excel_style.NAMED_STYLE_SPECS) <= set(names)
+
+
+def test_data_row_styles_survive_save():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["1", "12", "Shooter", "298.21  x", "Match Winner"])
+    ws.append(["2", "13", "Other", "297.10  x", ""])
+    excel_style.style_header_row(ws, 1, 5)
+    excel_style.style_data_row(ws, 2, 5, highlight=True)
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    ws2 = load_workbook(buf).active
+
+    header = ws2.cell(row=1, column=1)
+    assert header.font.b is True
+    assert header.fill.start_color.rgb.endswith(excel_style.HEADER_BG)
+
+    name_cell = ws2.cell(row=2, column=3)
+    assert name_cell.alignment.horizontal == "left"
+    assert name_cell.font.b is True
+    assert name_cell.fill.start_color.rgb.endswith(excel_style.GOLD)
+    assert ws2.cell(row=2, column=4).alignment.horizontal == "center"
+
+
+def test_second_workbook_gets_its_own_styles():
+    first, second = Workbook(), Workbook()
+    excel_style.style_data_row(first.active, 1, 3, alt=True)
+    excel_style.style_data_row(second.active, 1, 3, alt=True)
+    for wb in (first, second):
+        buf = io.BytesIO()
+        wb.save(buf)
+        assert wb.active.cell(row=1, column=1).fill.start_color.rgb.endswith(
+            excel_style.ALT_ROW
+        )
+
+
+def test_grid_styles_name_their_font():
+    for bold in (False, True):
+        font = excel_style.NAMED_STYLE_SPECS[excel_style.grid_style_name(bold=bold)].font
+        assert (font.name, font.sz, bool(font.b)) == ("Calibri", 11, bold)
@@ -0,0 +1,106 @@
+"""Columnar result export: one row per (shooter, instance, caliber, stage)."""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pandas as pd
+
+from backend.export import (
+    EXPORT_COLUMNS,
+    csv_header,
+    csv_lines,
+    match_context,
+    ndjson_lines,
+    parquet_bytes,
+    SeasonSummary,
+    score_rows,
+    shooter_context,
+)
+
+MATCH = {
+    "id": "m1",
+    "name": "July Outdoor",
+    "date": datetime(2026, 7, 4),
+    "match_types": [{"type": "NMC", "instance_name": "22 EIC", "calibers": [".22"]}],
+}
+SHOOTER = {"id": "s1", "name": "Pat Doe", "nra_number": "123", "rating": "EX"}
+SCORE = {
+    "shooter_id": "s1",
+    "match_id": "m1",
+    "match_type_instance": "22 EIC",
+    "caliber": ".22",
+    "stages": [
+        {"name": "SF", "score": 98, "x_count": 6},
+        {"name": "TF", "score": 97, "x_count": 4},
+        {"name": "RF", "score": None, "x_count": None},
+    ],
+    "total_score": 195,
+    "total_x_count": 10,
+    "not_shot": False,
+}
+
+
+def _rows():
+    return list(score_rows(match_context(MATCH), shooter_context(SHOOTER), SCORE))
+
+
+def test_one_row_per_stage_with_match_and_shooter_fields():
+    rows = _rows()
+    assert [r["stage"] for r in rows] == ["SF", "TF", "RF"]
+    first = rows[0]
+    assert first["match_date"] == "2026-07-04"
+    assert first["match_type"] == "NMC"
+    assert first["shooter_name"] == "Pat Doe"
+    assert first["division"] == "Civilian"
+    assert (first["stage_score"], first["stage_x_count"]) == (98, 6)
+    assert rows[2]["stage_score"] is None
+
+
+def test_card_without_stages_still_exported():
+    doc = dict(SCORE, stages=[], total_score=None, total_x_count=None, not_shot=True)
+    rows = list(score_rows(match_context(MATCH), shooter_context(None), doc))
+    assert len(rows) == 1
+    assert rows[0]["stage"] is None and rows[0]["not_shot"] is True
+
+
+def test_csv_and_ndjson_encoding_roundtrip():
+    rows = _rows()
+    parsed = list(csv.DictReader(io.StringIO(csv_header() + csv_lines(rows))))
+    assert list(parsed[0].keys()) == list(EXPORT_COLUMNS)
+    assert parsed[1]["stage_score"] == "97"
+    assert parsed[2]["stage_score"] == ""
+
+    lines = ndjson_lines(rows).splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])["caliber"] == ".22"
+
+
+def test_parquet_keeps_nullable_integer_columns():
+    frame = pd.read_parquet(io.BytesIO(parquet_bytes(_rows())))
+    assert list(frame.columns) == list(EXPORT_COLUMNS)
+    assert str(frame["stage_score"].dtype) == "Int64"
+    assert frame["stage_score"].isna().tolist() == [False, False, True]
+
+
+def test_season_summary_rolls_up_per_shooter_and_caliber():
+    season = SeasonSummary()
+    season.add(dict(SCORE, match_id="m1"))
+    season.add(dict(SCORE, match_id="m2", total_score=280, total_x_count=12))
+    season.add(dict(SCORE, match_id="m2", caliber="CF", total_score=250, total_x_count=3))
+    season.add(dict(SCORE, match_id="m3", total_score=None, not_shot=True))
+    season.add(dict(SCORE, shooter_id="s2", match_id="m1", total_score=270))
+
+    rows = season.rows({"s1": "Pat Doe", "s2": "Alex Roe"})
+    assert [(r["shooter_name"], r["caliber"]) for r in rows] == [
+        ("Alex Roe", ".22"),
+        ("Pat Doe", ".22"),
+        ("Pat Doe", "CF"),
+    ]
+    pat_22 = rows[1]
+    assert pat_22["matches"] == 2 and pat_22["cards"] == 2
+    assert pat_22["total_score"] == 195 + 280
+    assert pat_22["total_x_count"] == 22
+    assert pat_22["average"] == 237.5
+    assert pat_22["best"] == 280
@@ -0,0 +1,50 @@
+"""Cold start budget: importing the app must not pull in the heavy report stack."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Loaded on first use (or warmed after startup), never at import
+DEFERRED = ("openpyxl", "numpy", "pandas", "pyarrow", "backend.excel_style", "backend.score_matrix")
+
+# Cumulative microseconds for `import backend.server`; FastAPI / pydantic / motor
+# are most of it. Override on slow machines with IMPORT_TIME_BUDGET_MS.
+BUDGET_US = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500")) * 1000
+
+
+def _importtime() -> dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "match_track_import_time")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.server"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def test_server_import_skips_heavy_modules_and_meets_budget():
+    cumulative = _importtime()
+    assert "backend.server" in cumulative
+
+    loaded = sorted(name for name in DEFERRED if name in cumulative)
+    assert loaded == [], f"imported at startup: {loaded}"
+
+    assert cumulative["backend.server"] <= BUDGET_US, (
+        f"import backend.server took {cumulative['backend.server'] / 1000:.0f} ms "
+        f"(budget {BUDGET_US // 1000} ms)"
+    )
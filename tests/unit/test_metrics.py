@@ -0,0 +1,69 @@
+"""Prometheus metrics: text format, route labels and per-request Mongo tallies."""
+
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.metrics import Histogram, Metrics, MetricsMiddleware, MongoCommandListener, render
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("latency_seconds", "Latency.", (0.1, 1.0))
+    labels = (("route", "/a"),)
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(labels, value)
+    lines = hist.render()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 4.05',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_middleware_labels_by_route_template_and_counts_commands():
+    registry = Metrics()
+    listener = MongoCommandListener(registry)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry, route_app=app)
+
+    @app.get("/matches/{match_id}")
+    async def get_match(match_id: str):
+        # The driver reports from an executor thread with a copy of the context
+        loop = asyncio.get_running_loop()
+        for name in ("find", "aggregate"):
+            event = SimpleNamespace(command_name=name, duration_micros=1500)
+            await loop.run_in_executor(None, contextvars.copy_context().run, listener.started, event)
+            listener.succeeded(event)
+        return {"id": match_id}
+
+    client = TestClient(app)
+    assert client.get("/matches/m1").status_code == 200
+    assert client.get("/matches/m2").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    text = render(registry, compression=[])
+    assert 'http_requests_total{method="GET",route="/matches/{match_id}",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_requests_in_flight{method="GET",route="/matches/{match_id}"} 0' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/matches/{match_id}"} 2' in text
+    assert 'mongodb_commands_total{command="find"} 2' in text
+    assert 'mongodb_commands_per_request_bucket{route="/matches/{match_id}",le="2"} 2' in text
+    assert 'mongodb_commands_per_request_sum{route="/matches/{match_id}"} 4' in text
+    assert 'mongodb_command_duration_seconds_count{command="aggregate"} 2' in text
+
+
+def test_render_includes_compression_totals():
+    text = render(
+        Metrics(),
+        compression=[
+            {"route": "/r", "encoding": "gzip", "bytes_in": 1000, "bytes_out": 100, "cpu_seconds": 0.002}
+        ],
+    )
+    assert 'http_compression_input_bytes_total{route="/r",encoding="gzip"} 1000' in text
+    assert 'http_compression_cpu_seconds_total{route="/r",encoding="gzip"} 0.002' in text
@@ -0,0 +1,31 @@
+"""orjson report responses must encode like FastAPI's jsonable_encoder."""
+
+import json
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.core import BasicMatchType, CaliberType, Match, MatchTypeInstance, Shooter
+from backend.responses import ORJSONReportResponse
+
+
+def test_orjson_render_matches_jsonable_encoder():
+    match = Match(
+        name="July Outdoor",
+        date=datetime(2026, 7, 4, 9, 30, 0, 125000),
+        location="Range",
+        match_types=[
+            MatchTypeInstance(
+                type=BasicMatchType.NMC, instance_name="22 EIC", calibers=[CaliberType.TWENTYTWO]
+            )
+        ],
+    )
+    content = {
+        "match": match,
+        "shooters": {"s1": {"shooter": Shooter(name="Pat Doe", rating="EX"), "scores": {}}},
+        # Enum keys, as in the shooter report's by_caliber averages
+        "by_caliber": {CaliberType.TWENTYTWO: {BasicMatchType.NMC: {"avg": 291.5}}},
+        "none": None,
+    }
+    body = ORJSONReportResponse(content).body
+    assert json.loads(body) == jsonable_encoder(content)
@@ -0,0 +1,34 @@
+"""Revision ETags: stable until a counter moves, reset on a new epoch."""
+
+from backend.revisions import DataRevisions, if_none_match
+
+
+def test_etag_changes_only_with_its_counters():
+    revisions = DataRevisions()
+    report = revisions.etag(["match:m1", "shooters"])
+    assert report.startswith('"') and report.endswith('"')
+    assert revisions.etag(["match:m1", "shooters"]) == report
+
+    revisions.bump("match:m2")
+    assert revisions.etag(["match:m1", "shooters"]) == report
+    revisions.bump("match:m1")
+    assert revisions.etag(["match:m1", "shooters"]) != report
+
+    assert revisions.etag(["matches"], variant="a=1") != revisions.etag(["matches"], variant="a=2")
+
+
+def test_reset_starts_a_new_epoch():
+    revisions = DataRevisions()
+    before = revisions.etag(["matches"])
+    revisions.reset()
+    assert revisions.etag(["matches"]) != before
+
+
+def test_if_none_match():
+    etag = '"abc123"'
+    assert if_none_match('"abc123"', etag)
+    assert if_none_match('W/"abc123"', etag)
+    assert if_none_match('"zzz", "abc123-gzip"', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match('"abc124"', etag)
+    assert not if_none_match(None, etag)
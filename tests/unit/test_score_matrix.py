@@ -0,0 +1,154 @@
+"""MatchScoreMatrix must agree with the per-document bulletin/aggregate/subtotal paths."""
+
+from datetime import datetime
+
+import pytest
+
+from backend.bulletin import event_score_from_score_doc
+from backend.core import (
+    AGGREGATE_SPECS,
+    AggregateType,
+    BasicMatchType,
+    CaliberType,
+    Match,
+    MatchTypeInstance,
+    Score,
+    calculate_aggregates,
+    calculate_score_subtotals,
+    get_stage_table,
+)
+from backend.score_matrix import MatchScoreMatrix
+
+NINE = ["SF1", "SF2", "SFNMC", "TFNMC", "RFNMC", "TF1", "TF2", "RF1", "RF2"]
+
+MATCH = Match(
+    name="Test",
+    date=datetime(2026, 7, 1),
+    location="Range",
+    aggregate_type=AggregateType.EIGHTEEN_HUNDRED_2X900,
+    match_types=[
+        MatchTypeInstance(
+            type=BasicMatchType.NINEHUNDRED,
+            instance_name="900_A",
+            calibers=[CaliberType.TWENTYTWO, CaliberType.CENTERFIRE],
+        ),
+        MatchTypeInstance(
+            type=BasicMatchType.NINEHUNDRED,
+            instance_name="900_B",
+            calibers=[CaliberType.TWENTYTWO],
+        ),
+        MatchTypeInstance(
+            type=BasicMatchType.NMC, instance_name="22 EIC", calibers=[CaliberType.TWENTYTWO]
+        ),
+    ],
+)
+
+
+def _nine(shooter_id, instance, caliber, base, x=1, **overrides):
+    stages = [{"name": n, "score": base - i, "x_count": x} for i, n in enumerate(NINE)]
+    doc = {
+        "shooter_id": shooter_id,
+        "match_type_instance": instance,
+        "caliber": caliber,
+        "stages": stages,
+        "total_score": sum(s["score"] for s in stages),
+        "total_x_count": x * len(stages),
+        "not_shot": False,
+    }
+    doc.update(overrides)
+    return doc
+
+
+DOCS = [
+    _nine("s1", "900_A", ".22", 99, 3),
+    _nine("s1", "900_B", ".22", 97, 2),
+    _nine("s1", "900_A", "CF", 95, 1),
+    _nine("s2", "900_A", ".22", 98, 4),
+    _nine("s2", "900_B", ".22", 0, 0, not_shot=True, stages=[], total_score=None),
+    {
+        "shooter_id": "s2",
+        "match_type_instance": "22 EIC",
+        "caliber": ".22",
+        "stages": [
+            {"name": "SF", "score": 95, "x_count": 3},
+            {"name": "TF", "score": 97, "x_count": 5},
+            {"name": "RF", "score": None, "x_count": None},
+        ],
+        "total_score": 192,
+        "total_x_count": 8,
+    },
+]
+
+
+@pytest.fixture
+def matrix():
+    return MatchScoreMatrix.from_documents(DOCS, MATCH)
+
+
+@pytest.mark.parametrize("scope", ["slow", "timed", "rapid", "nmc", "total"])
+@pytest.mark.parametrize("card", [("900_A", ".22"), ("900_B", ".22"), ("22 EIC", ".22")])
+def test_event_scores_match_score_doc_path(matrix, scope, card):
+    expected = []
+    for doc in DOCS:
+        if (doc["match_type_instance"], doc["caliber"]) != card:
+            continue
+        sc, xc = event_score_from_score_doc(doc, scope)
+        if sc is not None:
+            expected.append((doc["shooter_id"], sc, xc))
+    assert sorted(matrix.event_scores(scope, *card)) == sorted(expected)
+
+
+def test_aggregate_totals_skip_not_shot_cards(matrix):
+    grand = dict((sid, (sc, xc)) for sid, sc, xc in matrix.aggregate_totals())
+    assert grand["s2"] == (DOCS[3]["total_score"] + 192, DOCS[3]["total_x_count"] + 8)
+    cf = matrix.aggregate_totals("CF")
+    assert cf == [("s1", DOCS[2]["total_score"], DOCS[2]["total_x_count"])]
+
+
+def test_aggregates_match_calculate_aggregates(matrix):
+    by_shooter = matrix.aggregates(AGGREGATE_SPECS[MATCH.aggregate_type])
+    for sid in ("s1", "s2"):
+        blobs = {
+            f"{d['match_type_instance']}_{d['caliber']}": {"score": d}
+            for d in DOCS
+            if d["shooter_id"] == sid
+        }
+        assert by_shooter[sid] == calculate_aggregates(blobs, MATCH)
+    assert by_shooter["s1"]["1800_.22"]["score"] == DOCS[0]["total_score"] + DOCS[1]["total_score"]
+    assert by_shooter["s2"] == {}
+
+
+def test_subtotals_match_core(matrix):
+    subtotals = matrix.subtotals(("900_A", ".22"))
+    table = get_stage_table(BasicMatchType.NINEHUNDRED)
+    for doc in (DOCS[0], DOCS[3]):
+        expected = calculate_score_subtotals(Score(match_id="m", **doc), table)
+        assert subtotals[doc["shooter_id"]] == expected
+    assert matrix.subtotals(("22 EIC", ".22")) == {}
+
+
+def test_stage_totals_equal_stored_totals(matrix):
+    score, x, _ = matrix.stage_totals()
+    mask = matrix.has_total
+    assert (score[mask] == matrix.total[mask]).all()
+    assert (x[mask] == matrix.total_x[mask]).all()
+
+
+def test_unnamed_scored_stage_is_skipped():
+    doc = _nine("s1", "900_A", ".22", 99)
+    doc["stages"] = doc["stages"] + [{"name": None, "score": 50, "x_count": 1}, {"score": 50}]
+    matrix = MatchScoreMatrix.from_documents([doc], MATCH)
+    score, _, _ = matrix.stage_totals()
+    assert score[0, matrix.card_index[("900_A", ".22")]] == sum(99 - i for i in range(9))
+
+
+def test_matrix_is_compact():
+    docs = [
+        _nine(f"s{i}", inst, cal, 99)
+        for i in range(200)
+        for inst, cal in (("900_A", ".22"), ("900_A", "CF"), ("900_B", ".22"))
+    ]
+    matrix = MatchScoreMatrix.from_documents(docs, MATCH)
+    assert matrix.score.dtype.name == "int16"
+    # 200 shooters x 4 cards x 12 stages, int16 score + X plus masks
+    assert matrix.nbytes < 60_000
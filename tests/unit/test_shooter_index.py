@@ -0,0 +1,45 @@
+"""Shooter typeahead index: prefix / token-prefix matching and maintenance."""
+
+from backend.shooter_index import ShooterIndex, tokenize
+
+SHOOTERS = [
+    {"id": "1", "name": "John Smith", "nra_number": "A123456", "competitor_number": 17},
+    {"id": "2", "name": "Smithers, Jane Q", "nra_number": None},
+    {"id": "3", "name": "Sam O'Brien", "nra_number": "998877"},
+    {"id": "4", "name": "Ann Johnson", "competitor_number": 171},
+]
+
+
+def _ids(results):
+    return [doc["id"] for doc in results]
+
+
+def test_tokenize_casefolds_and_drops_apostrophes():
+    assert tokenize("O'Brien, SAM") == ["obrien", "sam"]
+    assert tokenize(None) == []
+
+
+def test_prefix_and_token_prefix_matching():
+    index = ShooterIndex.from_documents(SHOOTERS)
+    # Last-name matches come first, in last-name order; first names after
+    assert _ids(index.search("smi")) == ["1", "2"]
+    assert _ids(index.search("jo")) == ["4", "1"]
+    assert _ids(index.search("j smi")) == ["1", "2"]
+    assert _ids(index.search("obr")) == ["3"]
+    assert _ids(index.search("a12")) == ["1"]
+    assert _ids(index.search("17")) == ["1", "4"]
+    assert _ids(index.search("smith q")) == ["2"]
+    assert index.search("zz") == [] and index.search("  ") == []
+    assert _ids(index.search("s", limit=1)) == ["1"]
+
+
+def test_upsert_and_remove_keep_index_current():
+    index = ShooterIndex.from_documents(SHOOTERS)
+    index.upsert({"id": "1", "name": "John Smyth"})
+    index.upsert({"id": "5", "name": "Zed Smith"})
+    assert _ids(index.search("smith")) == ["5", "2"]
+    assert _ids(index.search("smy")) == ["1"]
+    index.remove("2")
+    index.remove("missing")
+    assert _ids(index.search("smi")) == ["5"]
+    assert len(index) == 4
@@ -0,0 +1,60 @@
+"""shooter_stats running sums must reproduce the scan-every-score averages."""
+
+from backend.core import Score, calculate_shooter_averages_by_caliber
+from backend.shooter_stats import accumulate, caliber_averages, card_delta, key_filter
+
+
+def _doc(instance, caliber, stages, match_id="m1"):
+    scores = [s for _, s, _ in stages if s is not None]
+    xs = [x for _, _, x in stages if x is not None]
+    return {
+        "shooter_id": "s1",
+        "match_id": match_id,
+        "match_type_instance": instance,
+        "caliber": caliber,
+        "stages": [{"name": n, "score": s, "x_count": x} for n, s, x in stages],
+        "total_score": sum(scores) if scores else None,
+        "total_x_count": sum(xs) if xs else None,
+        "not_shot": not scores,
+    }
+
+
+DOCS = [
+    _doc("NMC1", ".22", [("SF", 95, 3), ("TF", 97, 4), ("RF", None, 1)]),
+    _doc("900_1", ".22", [("SF1", 96, 2), ("SFNMC", 94, 1), ("TF1", 98, 5), ("RF2", 90, 0)]),
+    _doc("NMC1", "CF", [("SF", None, None), ("TF", None, None)]),  # not shot
+    _doc("22 EIC", ".22", [("SF", 92, 1), ("TF", 93, 2), ("RF", 91, 3)], match_id="m2"),
+]
+TYPES = {("m1", "NMC1"): "NMC", ("m1", "900_1"): "900", ("m2", "22 EIC"): "NMC"}
+
+
+def _type_for(doc):
+    return TYPES.get((doc["match_id"], doc["match_type_instance"]))
+
+
+def _stored(deltas):
+    """Materialize $inc deltas the way Mongo would (dotted paths -> nested)."""
+    docs = []
+    for key, delta in deltas.items():
+        doc = key_filter(key)
+        for path, value in delta.items():
+            node = doc
+            *parents, leaf = path.split(".")
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = node.get(leaf, 0) + value
+        docs.append(doc)
+    return docs
+
+
+def test_caliber_averages_match_core_calculation():
+    stats = _stored(accumulate(DOCS, _type_for))
+    expected = calculate_shooter_averages_by_caliber([Score(**d) for d in DOCS])
+    assert caliber_averages(stats) == expected
+
+
+def test_removing_a_card_cancels_its_delta():
+    add = card_delta(DOCS[1])
+    remove = card_delta(DOCS[1], sign=-1)
+    assert {p: add[p] + remove[p] for p in add} == dict.fromkeys(add, 0)
+    assert card_delta(DOCS[2]) == {"entries": 1}  # not shot: recorded, no sums
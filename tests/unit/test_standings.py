@@ -0,0 +1,72 @@
+"""League standings: best N of M, X tie-break, idempotent incremental updates."""
+
+from backend.standings import LeagueStandings
+
+
+def _score(score_id, shooter_id, match_id, total, x=0, caliber=".22"):
+    return {
+        "id": score_id,
+        "shooter_id": shooter_id,
+        "match_id": match_id,
+        "caliber": caliber,
+        "total_score": total,
+        "total_x_count": x,
+        "not_shot": total is None,
+    }
+
+
+DOCS = [
+    # Able: 280 / 270 / 250 across three matches
+    _score("a1", "able", "m1", 280, 5),
+    _score("a2", "able", "m2", 270, 4),
+    _score("a3", "able", "m3", 250, 1),
+    # Baker: two cards in m1 sum to the match total, 260 in m2
+    _score("b1", "baker", "m1", 140, 3),
+    _score("b2", "baker", "m1", 140, 3),
+    _score("b3", "baker", "m2", 270, 5),
+    _score("b4", "baker", "m3", None),  # not shot
+    _score("c1", "charlie", "m1", 290, 9, caliber="CF"),
+    _score("x1", "able", "other", 300, 10),  # not a league match
+]
+
+
+def _state():
+    return LeagueStandings.from_documents(DOCS, revision=3, match_ids=["m1", "m2", "m3"])
+
+
+def test_best_n_with_x_tie_break():
+    ranked = _state().rank(best=2)
+    rows = ranked[".22"]
+    # Both 550; Baker wins on X (11 vs 9)
+    assert [(r["shooter_id"], r["total"], r["x_count"], r["rank"]) for r in rows] == [
+        ("baker", 550, 11, 1),
+        ("able", 550, 9, 2),
+    ]
+    assert [m["counted"] for m in rows[1]["match_totals"]] == [True, True, False]
+    assert list(ranked) == [".22", "CF"]
+
+    everything = _state().rank()[".22"]
+    assert [(r["shooter_id"], r["total"]) for r in everything] == [("able", 800), ("baker", 550)]
+
+
+def test_members_filter_and_shared_rank():
+    state = LeagueStandings.from_documents(
+        [_score("a", "able", "m1", 280, 5), _score("b", "baker", "m1", 280, 5)], 0, ["m1"]
+    )
+    assert [r["rank"] for r in state.rank()[".22"]] == [1, 1]
+    assert [r["shooter_id"] for r in state.rank(members={"baker"})[".22"]] == ["baker"]
+
+
+def test_incremental_updates_match_a_rebuild_and_are_idempotent():
+    state = _state()
+    state.rank(best=2)  # populate the ranking cache
+    changed = _score("a3", "able", "m3", 299, 8)
+    for _ in range(2):
+        state.apply_score(changed)
+        state.remove_score("b2")
+    state.apply_score(_score("a2", "able", "other", 270, 4))  # moved out of the league
+
+    docs = [d for d in DOCS if d["id"] not in ("a3", "b2", "a2")] + [changed]
+    rebuilt = LeagueStandings.from_documents(docs, 3, ["m1", "m2", "m3"])
+    assert state.rank(best=2) == rebuilt.rank(best=2)
+    assert state.rank(best=2)[".22"][0]["total"] == 579
@@ -0,0 +1,78 @@
+"""Trend buffers: bounded, date-ordered, and summarized per window."""
+
+from datetime import datetime, timedelta
+
+from backend.trends import (
+    TREND_BUFFER_SIZE,
+    build_trend_docs,
+    latest_entries,
+    shooter_trends,
+    trend_entry,
+)
+
+
+def _doc(score_id, match_id, total, caliber=".22", stages=None):
+    return {
+        "id": score_id,
+        "shooter_id": "s1",
+        "match_id": match_id,
+        "caliber": caliber,
+        "stages": stages or [],
+        "total_score": total,
+        "total_x_count": 1 if total is not None else None,
+        "not_shot": total is None,
+    }
+
+
+def test_trend_entry_sums_stage_families_by_exact_name():
+    doc = _doc(
+        "a",
+        "m1",
+        380,
+        stages=[
+            {"name": "SF1", "score": 95, "x_count": 2},
+            {"name": "SF2", "score": 94, "x_count": 1},
+            {"name": "SFNMC", "score": 96, "x_count": 3},
+            {"name": "RF", "score": None, "x_count": None},
+        ],
+    )
+    entry = trend_entry(doc, datetime(2026, 1, 1))
+    assert entry["stages"] == {"SF": 189, "NMC": 96}
+    assert (entry["total"], entry["x"]) == (380, 1)
+    assert trend_entry(_doc("b", "m1", None), datetime(2026, 1, 1)) is None
+
+
+def test_buffer_keeps_latest_cards_in_date_order():
+    start = datetime(2025, 1, 1)
+    entries = [
+        trend_entry(_doc(f"s{i}", f"m{i}", 200 + i), start + timedelta(days=i))
+        for i in reversed(range(TREND_BUFFER_SIZE + 5))
+    ]
+    kept = latest_entries(entries)
+    assert len(kept) == TREND_BUFFER_SIZE
+    assert kept[0]["score_id"] == "s5"
+    assert [e["date"] for e in kept] == sorted(e["date"] for e in kept)
+
+
+def test_window_summaries_per_caliber():
+    now = datetime(2026, 6, 1)
+    dates = {
+        "old": now - timedelta(days=500),
+        "m1": now - timedelta(days=60),
+        "m2": now - timedelta(days=30),
+    }
+    docs = [
+        _doc("a", "old", 250),
+        _doc("b", "m1", 270),
+        _doc("c", "m2", 280),
+        _doc("d", "m2", 290, caliber="CF"),
+        _doc("e", "m2", None),  # not shot
+    ]
+    trends = shooter_trends(build_trend_docs(docs, dates), window=2, now=now)
+
+    last_n = trends[".22"]["last_n"]
+    assert (last_n["count"], last_n["mean"], last_n["best"]) == (2, 275, 280)
+    assert last_n["std"] == 7.07
+    assert trends[".22"]["last_months"]["count"] == 2
+    assert [p["total"] for p in trends[".22"]["series"]] == [250, 270, 280]
+    assert trends["CF"]["last_n"]["std"] is None  # single card
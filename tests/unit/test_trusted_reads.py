@@ -0,0 +1,45 @@
+"""Batch read helpers must produce the same models as per-document parsing."""
+
+import os
+from datetime import datetime
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "match_track_reads_unit")
+
+from backend.core import CaliberType, Division  # noqa: E402
+from backend.server import Score, Shooter, load_scores, load_shooters  # noqa: E402
+
+
+def test_load_scores_matches_per_document_models():
+    docs = [
+        {
+            "_id": "abc",
+            "id": f"sc{i}",
+            "shooter_id": "s1",
+            "match_id": "m1",
+            "caliber": ".22",
+            "match_type_instance": "22 EIC",
+            "stages": [{"name": "SF", "score": 95, "x_count": 3}, {"name": "TF", "score": None}],
+            "total_score": 95,
+            "total_x_count": 3,
+            "created_at": datetime(2026, 7, 1),
+        }
+        for i in range(3)
+    ]
+    loaded = load_scores(docs)
+    assert loaded == [Score(**doc) for doc in docs]
+    assert loaded[0].caliber is CaliberType.TWENTYTWO
+    assert loaded[0].stages[1].score is None
+
+
+def test_load_shooters_fills_legacy_fields_and_skips_bad_docs():
+    docs = [
+        {"id": "s1", "name": "Pat Doe"},
+        {"id": "s2"},  # missing name
+        {"id": "s3", "name": "Lee Roe", "division": "Police"},
+    ]
+    loaded = load_shooters(docs)
+    assert [s.id for s in loaded] == ["s1", "s3"]
+    assert isinstance(loaded[0], Shooter)
+    assert loaded[0].division is Division.CIVILIAN
+    assert loaded[1].division is Division.POLICE